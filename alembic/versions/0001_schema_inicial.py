@@ -0,0 +1,136 @@
+"""schema inicial (tabelas que o create_all criava antes das migrations)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Banco já existente, criado pelo antigo create_all:
+    alembic stamp 0001 && alembic upgrade head
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "empresas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("cnpj", sa.String(), nullable=True),
+        sa.Column("ativo", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_empresas_id", "empresas", ["id"])
+    op.create_index("ix_empresas_nome", "empresas", ["nome"], unique=True)
+
+    op.create_table(
+        "usuarios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("cpf", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("celular", sa.String(), nullable=True),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(["empresa_id"], ["empresas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_usuarios_id", "usuarios", ["id"])
+    op.create_index("ix_usuarios_cpf", "usuarios", ["cpf"], unique=True)
+    op.create_index("ix_usuarios_email", "usuarios", ["email"], unique=True)
+
+    op.create_table(
+        "funcionarios_autorizados",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("cpf", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("ativo", sa.Boolean(), nullable=True),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("usuario_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["empresa_id"], ["empresas.id"]),
+        sa.ForeignKeyConstraint(["usuario_id"], ["usuarios.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_funcionarios_autorizados_id", "funcionarios_autorizados", ["id"])
+    op.create_index("ix_funcionarios_autorizados_cpf", "funcionarios_autorizados", ["cpf"])
+
+    op.create_table(
+        "financeiro_categorias",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("tipo", sa.String(), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(["empresa_id"], ["empresas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_financeiro_categorias_id", "financeiro_categorias", ["id"])
+    op.create_index("ix_financeiro_categorias_empresa_id", "financeiro_categorias", ["empresa_id"])
+    op.create_index("ix_financeiro_categorias_nome", "financeiro_categorias", ["nome"])
+    op.create_index("ix_financeiro_categorias_tipo", "financeiro_categorias", ["tipo"])
+
+    op.create_table(
+        "financeiro_lancamentos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("tipo", sa.String(), nullable=False),
+        sa.Column("categoria_id", sa.Integer(), nullable=True),
+        sa.Column("descricao", sa.String(), nullable=False),
+        sa.Column("observacao", sa.Text(), nullable=True),
+        sa.Column("valor", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("data_lancamento", sa.Date(), nullable=False),
+        sa.Column("data_vencimento", sa.Date(), nullable=True),
+        sa.Column("data_pagamento", sa.Date(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("forma_pagamento", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["categoria_id"], ["financeiro_categorias.id"]),
+        sa.ForeignKeyConstraint(["empresa_id"], ["empresas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_financeiro_lancamentos_id", "financeiro_lancamentos", ["id"])
+    op.create_index("ix_financeiro_lancamentos_empresa_id", "financeiro_lancamentos", ["empresa_id"])
+    op.create_index("ix_financeiro_lancamentos_tipo", "financeiro_lancamentos", ["tipo"])
+    op.create_index("ix_financeiro_lancamentos_categoria_id", "financeiro_lancamentos", ["categoria_id"])
+    op.create_index("ix_financeiro_lancamentos_data_lancamento", "financeiro_lancamentos", ["data_lancamento"])
+    op.create_index("ix_financeiro_lancamentos_data_vencimento", "financeiro_lancamentos", ["data_vencimento"])
+    op.create_index("ix_financeiro_lancamentos_data_pagamento", "financeiro_lancamentos", ["data_pagamento"])
+    op.create_index("ix_financeiro_lancamentos_status", "financeiro_lancamentos", ["status"])
+
+    op.create_table(
+        "financeiro_dados_pagamento",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("tipo_servico", sa.String(), nullable=False),
+        sa.Column("forma", sa.String(), nullable=False),
+        sa.Column("pix_chave", sa.String(), nullable=True),
+        sa.Column("banco", sa.String(), nullable=True),
+        sa.Column("agencia", sa.String(), nullable=True),
+        sa.Column("conta", sa.String(), nullable=True),
+        sa.Column("tipo_conta", sa.String(), nullable=True),
+        sa.Column("ativo", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(["empresa_id"], ["empresas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_financeiro_dados_pagamento_id", "financeiro_dados_pagamento", ["id"])
+    op.create_index("ix_financeiro_dados_pagamento_empresa_id", "financeiro_dados_pagamento", ["empresa_id"])
+    op.create_index("ix_financeiro_dados_pagamento_nome", "financeiro_dados_pagamento", ["nome"])
+    op.create_index("ix_financeiro_dados_pagamento_tipo_servico", "financeiro_dados_pagamento", ["tipo_servico"])
+    op.create_index("ix_financeiro_dados_pagamento_forma", "financeiro_dados_pagamento", ["forma"])
+
+
+def downgrade() -> None:
+    op.drop_table("financeiro_dados_pagamento")
+    op.drop_table("financeiro_lancamentos")
+    op.drop_table("financeiro_categorias")
+    op.drop_table("funcionarios_autorizados")
+    op.drop_table("usuarios")
+    op.drop_table("empresas")
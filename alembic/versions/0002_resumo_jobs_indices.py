@@ -0,0 +1,110 @@
+"""resumo financeiro mensal, jobs de importação e índices empresa+período
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _ano_mes(coluna: str) -> str:
+    if op.get_bind().dialect.name == "postgresql":
+        return f"to_char({coluna}, 'YYYY-MM')"
+    return f"strftime('%Y-%m', {coluna})"
+
+
+def _popular_resumo() -> None:
+    """Preenche o rollup a partir dos lançamentos que já existem."""
+    comp = _ano_mes("data_lancamento")
+    caixa = _ano_mes("data_pagamento")
+    op.execute(
+        f"""
+        INSERT INTO financeiro_resumo_mensal
+            (empresa_id, ano_mes, tipo, status, total_competencia, qtd_competencia, total_caixa)
+        SELECT empresa_id, {comp}, tipo, status, SUM(valor), COUNT(*), 0
+        FROM financeiro_lancamentos
+        WHERE data_lancamento IS NOT NULL
+        GROUP BY empresa_id, {comp}, tipo, status
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO financeiro_resumo_mensal
+            (empresa_id, ano_mes, tipo, status, total_competencia, qtd_competencia, total_caixa)
+        SELECT empresa_id, {caixa}, tipo, 'PAGO', 0, 0, SUM(valor)
+        FROM financeiro_lancamentos
+        WHERE status = 'PAGO' AND data_pagamento IS NOT NULL
+        GROUP BY empresa_id, {caixa}, tipo
+        ON CONFLICT (empresa_id, ano_mes, tipo, status)
+        DO UPDATE SET total_caixa = excluded.total_caixa
+        """
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "financeiro_resumo_mensal",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("ano_mes", sa.String(length=7), nullable=False),
+        sa.Column("tipo", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("total_competencia", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("qtd_competencia", sa.Integer(), nullable=False),
+        sa.Column("total_caixa", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["empresa_id"], ["empresas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("empresa_id", "ano_mes", "tipo", "status", name="uq_financeiro_resumo_mensal"),
+    )
+    op.create_index("ix_financeiro_resumo_mensal_id", "financeiro_resumo_mensal", ["id"])
+    _popular_resumo()
+
+    op.create_table(
+        "importacao_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("arquivo_nome", sa.String(), nullable=False),
+        sa.Column("arquivo_path", sa.String(), nullable=False),
+        sa.Column("ultima_linha", sa.Integer(), nullable=False),
+        sa.Column("linhas_processadas", sa.Integer(), nullable=False),
+        sa.Column("empresas_criadas", sa.Integer(), nullable=False),
+        sa.Column("empresas_atualizadas", sa.Integer(), nullable=False),
+        sa.Column("funcionarios_criados", sa.Integer(), nullable=False),
+        sa.Column("funcionarios_atualizados", sa.Integer(), nullable=False),
+        sa.Column("erros", sa.Text(), nullable=True),
+        sa.Column("erros_total", sa.Integer(), nullable=False),
+        sa.Column("mensagem", sa.String(), nullable=True),
+        sa.Column("criado_em", sa.DateTime(), nullable=False),
+        sa.Column("heartbeat_em", sa.DateTime(), nullable=True),
+        sa.Column("concluido_em", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_importacao_jobs_id", "importacao_jobs", ["id"])
+    op.create_index("ix_importacao_jobs_status", "importacao_jobs", ["status"])
+
+    op.create_index(
+        "ix_financeiro_lancamentos_empresa_data",
+        "financeiro_lancamentos",
+        ["empresa_id", "data_lancamento", "id"],
+        postgresql_include=["tipo", "status", "valor"],
+    )
+    op.create_index(
+        "ix_financeiro_lancamentos_empresa_status_pagto",
+        "financeiro_lancamentos",
+        ["empresa_id", "status", "data_pagamento"],
+        postgresql_include=["tipo", "valor"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_financeiro_lancamentos_empresa_status_pagto", table_name="financeiro_lancamentos")
+    op.drop_index("ix_financeiro_lancamentos_empresa_data", table_name="financeiro_lancamentos")
+    op.drop_table("importacao_jobs")
+    op.drop_table("financeiro_resumo_mensal")
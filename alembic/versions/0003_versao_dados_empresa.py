@@ -0,0 +1,25 @@
+"""versão dos dados financeiros por empresa (cache HTTP do painel)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("empresas", sa.Column("versao_dados", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("empresas", sa.Column("dados_alterados_em", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("empresas") as batch_op:
+        batch_op.drop_column("dados_alterados_em")
+        batch_op.drop_column("versao_dados")
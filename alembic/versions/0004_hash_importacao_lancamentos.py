@@ -0,0 +1,30 @@
+"""hash de importação de extrato nos lançamentos (deduplicação)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("financeiro_lancamentos", sa.Column("hash_importacao", sa.String(length=32), nullable=True))
+    op.create_index(
+        "ix_financeiro_lancamentos_empresa_hash",
+        "financeiro_lancamentos",
+        ["empresa_id", "hash_importacao"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_financeiro_lancamentos_empresa_hash", table_name="financeiro_lancamentos")
+    with op.batch_alter_table("financeiro_lancamentos") as batch_op:
+        batch_op.drop_column("hash_importacao")
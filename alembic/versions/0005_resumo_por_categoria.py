@@ -0,0 +1,87 @@
+"""categoria no resumo financeiro mensal (análise por categoria)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def _ano_mes(coluna: str) -> str:
+    if op.get_bind().dialect.name == "postgresql":
+        return f"to_char({coluna}, 'YYYY-MM')"
+    return f"strftime('%Y-%m', {coluna})"
+
+
+def _criar_resumo(chave: list[str]) -> None:
+    colunas = [
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("ano_mes", sa.String(length=7), nullable=False),
+        sa.Column("tipo", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+    ]
+    if "categoria_id" in chave:
+        colunas.append(sa.Column("categoria_id", sa.Integer(), nullable=False))
+    op.create_table(
+        "financeiro_resumo_mensal",
+        *colunas,
+        sa.Column("total_competencia", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("qtd_competencia", sa.Integer(), nullable=False),
+        sa.Column("total_caixa", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["empresa_id"], ["empresas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(*chave, name="uq_financeiro_resumo_mensal"),
+    )
+    op.create_index("ix_financeiro_resumo_mensal_id", "financeiro_resumo_mensal", ["id"])
+
+
+def _popular_resumo(por_categoria: bool) -> None:
+    """Preenche o rollup a partir dos lançamentos (mesmo cálculo da 0002, mais a categoria)."""
+    comp = _ano_mes("data_lancamento")
+    caixa = _ano_mes("data_pagamento")
+    cat_col = ", categoria_id" if por_categoria else ""
+    cat_val = ", COALESCE(categoria_id, 0)" if por_categoria else ""
+    op.execute(
+        f"""
+        INSERT INTO financeiro_resumo_mensal
+            (empresa_id, ano_mes, tipo, status{cat_col}, total_competencia, qtd_competencia, total_caixa)
+        SELECT empresa_id, {comp}, tipo, status{cat_val}, SUM(valor), COUNT(*), 0
+        FROM financeiro_lancamentos
+        WHERE data_lancamento IS NOT NULL
+        GROUP BY empresa_id, {comp}, tipo, status{cat_val}
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO financeiro_resumo_mensal
+            (empresa_id, ano_mes, tipo, status{cat_col}, total_competencia, qtd_competencia, total_caixa)
+        SELECT empresa_id, {caixa}, tipo, 'PAGO'{cat_val}, 0, 0, SUM(valor)
+        FROM financeiro_lancamentos
+        WHERE status = 'PAGO' AND data_pagamento IS NOT NULL
+        GROUP BY empresa_id, {caixa}, tipo{cat_val}
+        ON CONFLICT (empresa_id, ano_mes, tipo, status{cat_col})
+        DO UPDATE SET total_caixa = excluded.total_caixa
+        """
+    )
+
+
+# o resumo é derivado dos lançamentos: recriar a tabela com a chave nova
+# e recalcular é mais simples (e igual nos dois bancos) que migrar as linhas
+def upgrade() -> None:
+    op.drop_table("financeiro_resumo_mensal")
+    _criar_resumo(["empresa_id", "ano_mes", "tipo", "status", "categoria_id"])
+    _popular_resumo(por_categoria=True)
+
+
+def downgrade() -> None:
+    op.drop_table("financeiro_resumo_mensal")
+    _criar_resumo(["empresa_id", "ano_mes", "tipo", "status"])
+    _popular_resumo(por_categoria=False)
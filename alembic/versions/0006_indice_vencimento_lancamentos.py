@@ -0,0 +1,26 @@
+"""índice empresa+status+vencimento nos lançamentos (projeção de caixa)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_financeiro_lancamentos_empresa_status_venc",
+        "financeiro_lancamentos",
+        ["empresa_id", "status", "data_vencimento"],
+        postgresql_include=["tipo", "valor"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_financeiro_lancamentos_empresa_status_venc", table_name="financeiro_lancamentos")
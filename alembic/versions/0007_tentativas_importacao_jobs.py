@@ -0,0 +1,26 @@
+"""tentativas nos jobs de importação (limite de retomadas)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "importacao_jobs",
+        sa.Column("tentativas", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("importacao_jobs") as batch_op:
+        batch_op.drop_column("tentativas")
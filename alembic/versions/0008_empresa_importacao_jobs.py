@@ -0,0 +1,31 @@
+"""empresa dona do job de importação
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+# jobs antigos ficam sem empresa (NULL): não aparecem para nenhum usuário
+def upgrade() -> None:
+    with op.batch_alter_table("importacao_jobs") as batch_op:
+        batch_op.add_column(sa.Column("empresa_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_importacao_jobs_empresa_id", "empresas", ["empresa_id"], ["id"]
+        )
+        batch_op.create_index("ix_importacao_jobs_empresa_id", ["empresa_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("importacao_jobs") as batch_op:
+        batch_op.drop_index("ix_importacao_jobs_empresa_id")
+        batch_op.drop_constraint("fk_importacao_jobs_empresa_id", type_="foreignkey")
+        batch_op.drop_column("empresa_id")
@@ -0,0 +1,51 @@
+"""resumo: linhas de categorias já excluídas passam para categoria 0
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+_ORFAS = """
+    categoria_id <> 0
+    AND NOT EXISTS (SELECT 1 FROM financeiro_categorias c WHERE c.id = r.categoria_id)
+"""
+
+
+# categorias excluídas antes da 0009 deixaram o resumo com o id antigo
+# (os lançamentos já estão com categoria NULL): soma na categoria 0
+def upgrade() -> None:
+    op.execute(
+        f"""
+        UPDATE empresas SET versao_dados = versao_dados + 1
+        WHERE id IN (SELECT empresa_id FROM financeiro_resumo_mensal r WHERE {_ORFAS})
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO financeiro_resumo_mensal
+            (empresa_id, ano_mes, tipo, status, categoria_id, total_competencia, qtd_competencia, total_caixa)
+        SELECT empresa_id, ano_mes, tipo, status, 0,
+               SUM(total_competencia), SUM(qtd_competencia), SUM(total_caixa)
+        FROM financeiro_resumo_mensal r
+        WHERE {_ORFAS}
+        GROUP BY empresa_id, ano_mes, tipo, status
+        ON CONFLICT (empresa_id, ano_mes, tipo, status, categoria_id) DO UPDATE SET
+            total_competencia = financeiro_resumo_mensal.total_competencia + excluded.total_competencia,
+            qtd_competencia = financeiro_resumo_mensal.qtd_competencia + excluded.qtd_competencia,
+            total_caixa = financeiro_resumo_mensal.total_caixa + excluded.total_caixa
+        """
+    )
+    op.execute(f"DELETE FROM financeiro_resumo_mensal AS r WHERE {_ORFAS}")
+
+
+def downgrade() -> None:
+    # só corrige dados: nada a desfazer
+    pass
@@ -0,0 +1,49 @@
+"""funcionários autorizados únicos por (empresa_id, cpf)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+# duplicatas (importações simultâneas antes do índice): fica a de menor id,
+# que era a usada pela importação; o vínculo com usuário passa para ela
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE funcionarios_autorizados
+        SET usuario_id = (
+            SELECT MIN(d.usuario_id) FROM funcionarios_autorizados d
+            WHERE d.empresa_id = funcionarios_autorizados.empresa_id
+              AND d.cpf = funcionarios_autorizados.cpf
+        )
+        WHERE usuario_id IS NULL
+          AND id IN (
+            SELECT MIN(id) FROM funcionarios_autorizados
+            GROUP BY empresa_id, cpf HAVING COUNT(*) > 1
+          )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM funcionarios_autorizados
+        WHERE id NOT IN (SELECT MIN(id) FROM funcionarios_autorizados GROUP BY empresa_id, cpf)
+        """
+    )
+    op.create_index(
+        "uq_funcionarios_autorizados_empresa_cpf",
+        "funcionarios_autorizados",
+        ["empresa_id", "cpf"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_funcionarios_autorizados_empresa_cpf", table_name="funcionarios_autorizados")
@@ -0,0 +1,71 @@
+# app/build_static.py
+"""
+Build dos estáticos (passo do deploy, junto com `alembic upgrade head`):
+
+    python -m app.build_static
+
+Para cada arquivo de app/static/ (fora dist/):
+- copia para app/static/dist/ com o hash do conteúdo no nome
+  (css/style.css -> dist/css/style.3f2a9c1b0d.css), servido com cache
+  de um ano;
+- grava ao lado as variantes .br (se o pacote brotli estiver instalado)
+  e .gz, em compressão máxima, para texto (css, js, svg...);
+- registra o hash em dist/manifest.json, lido por static_url().
+
+Cópias de builds anteriores não são apagadas: páginas já abertas (ou um
+worker ainda na versão anterior) continuam achando o arquivo antigo.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+from app.core.estaticos import DIRETORIO, DIRETORIO_DIST, MANIFESTO, hash_conteudo, nome_com_hash
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRIMIVEIS = {".css", ".js", ".mjs", ".svg", ".json", ".txt", ".html", ".xml", ".map"}
+
+
+def _gravar(destino: Path, dados: bytes) -> None:
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    destino.write_bytes(dados)
+
+
+def build(origem: str = DIRETORIO) -> dict[str, str]:
+    raiz = Path(origem)
+    dist = Path(DIRETORIO_DIST).resolve()
+    manifesto: dict[str, str] = {}
+
+    for arq in sorted(raiz.rglob("*")):
+        if not arq.is_file() or dist in arq.resolve().parents:
+            continue
+        caminho = arq.relative_to(raiz).as_posix()
+        dados = arq.read_bytes()
+        h = hash_conteudo(dados)
+        destino = raiz / nome_com_hash(caminho, h)
+        _gravar(destino, dados)
+
+        if arq.suffix.lower() in COMPRIMIVEIS:
+            gz = gzip.compress(dados, compresslevel=9, mtime=0)
+            if len(gz) < len(dados):
+                _gravar(destino.with_name(destino.name + ".gz"), gz)
+            if brotli is not None:
+                br = brotli.compress(dados, quality=11)
+                if len(br) < len(dados):
+                    _gravar(destino.with_name(destino.name + ".br"), br)
+
+        manifesto[caminho] = h
+
+    _gravar(Path(MANIFESTO), json.dumps(manifesto, indent=2, sort_keys=True).encode("utf-8"))
+    return manifesto
+
+
+if __name__ == "__main__":
+    m = build()
+    print(f"✅ {len(m)} arquivo(s) estático(s) em {os.path.relpath(DIRETORIO_DIST)} (manifest.json)")
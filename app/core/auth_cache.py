@@ -0,0 +1,143 @@
+# app/core/auth_cache.py
+"""
+Cache em processo (TTL + LRU) dos usuários autenticados.
+
+As dependências de autenticação (API e painel) consultam o cache pelo
+"sub" do token antes de ir ao banco; navegação no painel com o cache
+quente não faz nenhuma query de autenticação.
+
+Usuário com ativo=False é recusado pelas duas dependências (401 na API,
+redirect para o login no painel), venha do cache ou do banco.
+
+Invalidação:
+- automática quando um Usuario é alterado/excluído via ORM (após o commit);
+- manual com `auth_cache.invalidar_usuario(user_id)` para UPDATE em lote.
+Em deploy com vários workers cada processo tem o seu cache; o TTL limita
+por quanto tempo outro worker pode ver dados antigos.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models import Usuario
+
+
+@dataclass(frozen=True)
+class UsuarioAutenticado:
+    """Dados do usuário logado (leve, sem sessão do banco)."""
+
+    id: int
+    empresa_id: int
+    ativo: bool
+    nome: str
+    cpf: str
+    email: str
+    celular: Optional[str] = None
+
+    @classmethod
+    def from_model(cls, user: Usuario) -> "UsuarioAutenticado":
+        return cls(
+            id=user.id,
+            empresa_id=user.empresa_id,
+            ativo=bool(user.ativo),
+            nome=user.nome,
+            cpf=user.cpf,
+            email=user.email,
+            celular=user.celular,
+        )
+
+
+class AuthCache:
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, UsuarioAutenticado]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+
+    def get(self, key: str) -> Optional[UsuarioAutenticado]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: str, user: UsuarioAutenticado) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, user)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidar_usuario(self, user_id: int) -> None:
+        # as chaves são o "sub" do token (id ou e-mail): procura pelo valor
+        with self._lock:
+            keys = [k for k, (_, u) in self._data.items() if u.id == user_id]
+            for k in keys:
+                del self._data[k]
+            self.invalidacoes += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "tamanho": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "invalidacoes": self.invalidacoes,
+            }
+
+
+auth_cache = AuthCache(
+    maxsize=settings.AUTH_CACHE_MAXSIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+# =========================================================
+# INVALIDAÇÃO AUTOMÁTICA (ORM)
+# =========================================================
+_PENDENTES = "auth_cache_invalidar"
+
+
+@event.listens_for(Usuario, "after_update")
+@event.listens_for(Usuario, "after_delete")
+def _marcar_usuario_alterado(mapper, connection, target):
+    db = object_session(target)
+    if db is not None:
+        db.info.setdefault(_PENDENTES, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_apos_commit(db):
+    for user_id in db.info.pop(_PENDENTES, ()):
+        auth_cache.invalidar_usuario(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendentes(db):
+    db.info.pop(_PENDENTES, None)
@@ -0,0 +1,62 @@
+# app/core/compressao.py
+"""
+Compressão das respostas (Brotli ou gzip, conforme o Accept-Encoding).
+
+Respostas menores que COMPRESSAO_MIN_BYTES vão sem compressão, e as que
+já têm Content-Encoding (estáticos pré-comprimidos, ver
+app/core/estaticos.py) passam direto. Brotli é opcional: sem o pacote
+`brotli` instalado, só gzip.
+"""
+from __future__ import annotations
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            # streaming: cada pedaço sai assim que chega
+            return self.compressor.process(body) + self.compressor.flush()
+        return self.compressor.process(body) + self.compressor.finish()
+
+
+def aceita_codificacao(accept_encoding: str, codificacao: str) -> bool:
+    for item in accept_encoding.split(","):
+        nome, _, params = item.strip().partition(";")
+        if nome.strip().lower() == codificacao:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class CompressaoMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+        self.minimum_size = settings.COMPRESSAO_MIN_BYTES
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        if brotli is not None and aceita_codificacao(accept, "br"):
+            responder = BrotliResponder(self.app, self.minimum_size, settings.BROTLI_QUALIDADE)
+        elif aceita_codificacao(accept, "gzip"):
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=settings.GZIP_NIVEL)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -6,6 +6,74 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Dual Saúde"
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
 
+    # Pool de conexões do banco (por worker/processo)
+    DB_POOL_SIZE: int = 5                  # conexões mantidas abertas
+    DB_MAX_OVERFLOW: int = 10              # conexões extras em pico (fechadas ao devolver)
+    DB_POOL_TIMEOUT: float = 30            # segundos esperando conexão livre antes do erro
+    DB_POOL_RECYCLE: int = 1800            # reabre conexões mais velhas que isso (-1 = nunca)
+    DB_POOL_PRE_PING: bool = False         # True = SELECT 1 a cada checkout (1 round trip a mais)
+
+    # Réplica de leitura (DATABASE_READ_URL, opcional)
+    DB_READ_STICKY_SECONDS: int = 5        # após gravar, o cliente lê do primário por esse tempo
+    DB_READ_MAX_LAG_SECONDS: float = 5     # réplica mais atrasada que isso é ignorada
+    DB_READ_LAG_CHECK_SECONDS: float = 2   # intervalo entre checagens do atraso (por worker)
+
+    # SQLite (instalações pequenas): PRAGMAs aplicados em toda conexão
+    SQLITE_JOURNAL_MODE: str = "WAL"       # leitores não bloqueiam o escritor (e vice-versa)
+    SQLITE_SYNCHRONOUS: str = "NORMAL"     # seguro com WAL; fsync só no checkpoint
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000     # espera pelo lock de escrita antes de "database is locked"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # cache de páginas por conexão
+
+    # Importação de planilhas (jobs em background)
+    IMPORT_CHUNK_SIZE: int = 1000          # linhas gravadas por bloco/commit
+    IMPORT_WORKERS: int = 2                # threads do pool de importação (1 conexão cada)
+    IMPORT_UPLOAD_DIR: str = "uploads/importacao"
+    IMPORT_JOB_LEASE_SECONDS: int = 120    # job sem heartbeat há mais tempo é retomado
+    IMPORT_JOB_MAX_TENTATIVAS: int = 3     # depois disso o job falho vira ERRO (não é retomado)
+    IMPORT_MAX_ERROS: int = 500            # erros por linha guardados no job
+
+    # Cache de usuários autenticados (por worker)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAXSIZE: int = 10000
+
+    # Hash de senhas (bcrypt) em pool de processos
+    BCRYPT_ROUNDS: int = 12                # custo; hashes com outro custo são refeitos no login
+    PASSWORD_HASH_WORKERS: int = 2         # 0 = no próprio processo
+    PASSWORD_HASH_MAX_PENDING: int = 16    # acima disso responde 503
+
+    # Templates do painel (Jinja2)
+    TEMPLATES_AUTO_RELOAD: bool = False    # True em desenvolvimento (relê o .html alterado)
+    TEMPLATES_BYTECODE_DIR: str = ".cache/jinja"  # compilados em disco ("" = desliga)
+    TEMPLATES_FRAGMENT_MAXSIZE: int = 2000 # fragmentos {% cache %} guardados (por worker)
+
+    # Compressão das respostas (Brotli se instalado, senão gzip)
+    COMPRESSAO_MIN_BYTES: int = 1000       # respostas menores vão sem compressão
+    GZIP_NIVEL: int = 6                    # 1 (rápido) a 9 (menor)
+    BROTLI_QUALIDADE: int = 5              # 0 a 11; respostas dinâmicas: 4-6
+
+    # API em lote (/api/financeiro/lancamentos:batch)
+    API_LOTE_MAX_OPERACOES: int = 500      # operações por requisição
+
+    # Exportação (CSV/XLSX em streaming)
+    EXPORT_YIELD_PER: int = 1000           # linhas buscadas por vez no cursor do banco
+
+    # Análise por categoria (relatórios)
+    ANALISE_TOP_N: int = 5                 # categorias no top receitas/despesas
+    ANALISE_MESES: int = 12                # meses da série (incluindo o mês do relatório)
+    ANALISE_CACHE_MAXSIZE: int = 1000      # (empresa, mês) guardados (por worker)
+
+    # Projeção de caixa (/api/financeiro/projecao)
+    PROJECAO_MESES_PADRAO: int = 3
+    PROJECAO_MESES_MAX: int = 24
+
+    # /monitoramento: "Authorization: Bearer <token>"; vazio = endpoints desligados (404)
+    MONITORAMENTO_TOKEN: str = ""
+
+    # Lista de lançamentos (paginação por cursor)
+    LANCAMENTOS_PAGE_SIZE: int = 50
+    LANCAMENTOS_PAGE_SIZE_MAX: int = 200
+
     model_config = SettingsConfigDict(
         case_sensitive=True,
         env_file=".env",          # permite usar variáveis de ambiente
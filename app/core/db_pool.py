@@ -0,0 +1,150 @@
+# app/core/db_pool.py
+"""
+Telemetria do pool de conexões do SQLAlchemy.
+
+`PoolMedido` (e `PoolMedidoAsync`, do engine assíncrono) é o QueuePool
+padrão medindo quanto tempo cada checkout
+esperou por uma conexão livre (histograma em ms + timeouts). Somado ao
+estado do pool (em uso / ociosas / overflow) dá para dimensionar
+DB_POOL_SIZE e DB_MAX_OVERFLOW por worker: espera alta com o overflow
+no máximo = pool pequeno demais para a concorrência do worker.
+
+Os números são deste processo; com vários workers cada um tem os seus
+pools (o banco vê até workers × 2 × (pool_size + max_overflow) conexões:
+um pool do engine síncrono e um do assíncrono;
+mais o da réplica de leitura, se DATABASE_READ_URL estiver configurada).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class HistogramaEspera:
+    LIMITES_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._zerar()
+
+    def _zerar(self) -> None:
+        self.contagens = [0] * (len(self.LIMITES_MS) + 1)
+        self.total = 0
+        self.soma_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._zerar()
+
+    def registrar(self, ms: float, timeout: bool = False) -> None:
+        with self._lock:
+            self.contagens[bisect_left(self.LIMITES_MS, ms)] += 1
+            self.total += 1
+            self.soma_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            if timeout:
+                self.timeouts += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            faixas = {f"<={lim}ms": c for lim, c in zip(self.LIMITES_MS, self.contagens)}
+            faixas[f">{self.LIMITES_MS[-1]}ms"] = self.contagens[-1]
+            return {
+                "checkouts": self.total,
+                "media_ms": round(self.soma_ms / self.total, 3) if self.total else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "timeouts": self.timeouts,
+                "histograma": faixas,
+            }
+
+
+class ContadoresPool:
+    def __init__(self):
+        self.conexoes_abertas = 0      # conexões novas com o banco (connect)
+        self.conexoes_invalidadas = 0  # descartadas por erro/desconexão
+
+
+def _checkout_medido(pool, do_get):
+    inicio = time.perf_counter()
+    try:
+        conn = do_get()
+    except PoolTimeoutError:
+        pool.espera.registrar((time.perf_counter() - inicio) * 1000, timeout=True)
+        raise
+    pool.espera.registrar((time.perf_counter() - inicio) * 1000)
+    return conn
+
+
+# Séries como atributo de classe (e não da instância): engine.dispose()
+# recria o pool e não zera a telemetria.
+class PoolMedido(QueuePool):
+    """QueuePool que registra o tempo de espera de cada checkout."""
+
+    espera = HistogramaEspera()
+    contadores = ContadoresPool()
+
+    def _do_get(self):
+        return _checkout_medido(self, super()._do_get)
+
+
+class PoolMedidoAsync(AsyncAdaptedQueuePool):
+    """Mesmo que PoolMedido, para o engine assíncrono."""
+
+    espera = HistogramaEspera()
+    contadores = ContadoresPool()
+
+    def _do_get(self):
+        return _checkout_medido(self, super()._do_get)
+
+
+class PoolMedidoReplica(PoolMedidoAsync):
+    """Pool do engine de leitura (DATABASE_READ_URL), com séries próprias."""
+
+    espera = HistogramaEspera()
+    contadores = ContadoresPool()
+
+
+def instalar_telemetria(engine: Engine) -> None:
+    """Contadores de conexões abertas/invalidadas (engine síncrono ou `async_engine.sync_engine`)."""
+    contadores = getattr(type(engine.pool), "contadores", None)
+    if contadores is None:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_conn, record):
+        contadores.conexoes_abertas += 1
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_conn, record, exc):
+        contadores.conexoes_invalidadas += 1
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    dados = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        dados.update(
+            pool_size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout_s=pool.timeout(),
+            recycle_s=pool._recycle,
+            pre_ping=pool._pre_ping,
+            em_uso=pool.checkedout(),
+            ociosas=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, (PoolMedido, PoolMedidoAsync)):
+        dados.update(
+            conexoes_abertas=pool.contadores.conexoes_abertas,
+            conexoes_invalidadas=pool.contadores.conexoes_invalidadas,
+            espera_checkout=pool.espera.stats(),
+        )
+    return dados
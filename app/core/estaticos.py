@@ -0,0 +1,112 @@
+# app/core/estaticos.py
+"""
+Arquivos de /static com cache longo e variantes pré-comprimidas.
+
+`static_url("css/style.css")` (global dos templates) devolve uma URL que
+muda junto com o conteúdo:
+- com o build (`python -m app.build_static`): a cópia com hash no nome,
+  `/static/dist/css/style.3f2a9c1b0d.css`;
+- sem build (ou build desatualizado): `/static/css/style.css?v=3f2a9c1b0d`.
+Mudou o arquivo, muda a URL; então a URL versionada pode ficar em cache
+por um ano (`immutable`). Pedidos sem versão revalidam (ETag/Last-Modified
+do StaticFiles).
+
+Se existir `arquivo.br` / `arquivo.gz` ao lado do arquivo pedido (o build
+gera para dist/), ele é servido direto com Content-Encoding, sem
+comprimir a cada requisição.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from mimetypes import guess_type
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from app.core.compressao import aceita_codificacao
+
+DIRETORIO = "app/static"
+DIRETORIO_DIST = os.path.join(DIRETORIO, "dist")
+MANIFESTO = os.path.join(DIRETORIO_DIST, "manifest.json")
+CACHE_LONGO = "public, max-age=31536000, immutable"
+
+# preferência: Brotli (menor), depois gzip
+_VARIANTES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def hash_conteudo(dados: bytes) -> str:
+    return hashlib.sha256(dados).hexdigest()[:10]
+
+
+def nome_com_hash(caminho: str, h: str) -> str:
+    """css/style.css -> dist/css/style.<hash>.css"""
+    raiz, ext = os.path.splitext(caminho)
+    return f"dist/{raiz}.{h}{ext}"
+
+
+@lru_cache(maxsize=None)
+def _hash_arquivo(caminho: str) -> str | None:
+    try:
+        with open(os.path.join(DIRETORIO, caminho), "rb") as f:
+            return hash_conteudo(f.read())
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _manifesto() -> dict[str, str]:
+    try:
+        with open(MANIFESTO, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def static_url(caminho: str) -> str:
+    caminho = caminho.lstrip("/")
+    v = _hash_arquivo(caminho)
+    if v is None:
+        return f"/static/{caminho}"
+    if _manifesto().get(caminho) == v:
+        return f"/static/{nome_com_hash(caminho, v)}"
+    return f"/static/{caminho}?v={v}"
+
+
+class StaticVersionado(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        full_path = str(full_path)
+        request_headers = Headers(scope=scope)
+        accept = request_headers.get("accept-encoding", "")
+
+        response = None
+        tem_variante = False
+        for codificacao, sufixo in _VARIANTES:
+            variante = full_path + sufixo
+            if not os.path.isfile(variante):
+                continue
+            tem_variante = True
+            if aceita_codificacao(accept, codificacao):
+                response = FileResponse(
+                    variante,
+                    status_code=status_code,
+                    stat_result=os.stat(variante),
+                    media_type=guess_type(full_path)[0] or "application/octet-stream",
+                    headers={"Content-Encoding": codificacao},
+                )
+                if self.is_not_modified(response.headers, request_headers):
+                    response = NotModifiedResponse(response.headers)
+                break
+        if response is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+
+        if tem_variante:
+            response.headers["Vary"] = "Accept-Encoding"
+        if full_path.startswith(os.path.realpath(DIRETORIO_DIST)) or b"v=" in scope.get("query_string", b""):
+            response.headers["Cache-Control"] = CACHE_LONGO
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,55 @@
+# app/core/http_cache.py
+"""
+GET condicional (ETag / Last-Modified) para páginas do painel.
+
+A rota monta a ETag com o que define o conteúdo (empresa, versão dos
+dados, período, assinatura dos templates) e chama `nao_modificado()`
+antes de consultar/renderizar: se o navegador já tem essa versão,
+responde 304 sem corpo. `Cache-Control: private, no-cache` faz o
+navegador guardar a página, mas sempre revalidar.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def etag(*partes) -> str:
+    return 'W/"%s"' % hashlib.blake2b(repr(partes).encode(), digest_size=12).hexdigest()
+
+
+def cabecalhos(tag: str, modificado_em: datetime | None) -> dict[str, str]:
+    h = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if modificado_em is not None:
+        h["Last-Modified"] = format_datetime(modificado_em.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+    return h
+
+
+def _sem_fraca(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def nao_modificado(request: Request, tag: str, modificado_em: datetime | None) -> Response | None:
+    """304 se o cliente já tem esta versão; None para seguir com a página."""
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+        if inm.strip() == "*" or _sem_fraca(tag) in {_sem_fraca(t) for t in inm.split(",")}:
+            return Response(status_code=304, headers=cabecalhos(tag, modificado_em))
+        return None
+
+    ims = request.headers.get("if-modified-since")
+    if ims and modificado_em is not None:
+        try:
+            desde = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return None
+        if desde.tzinfo is None:
+            desde = desde.replace(tzinfo=timezone.utc)
+        if modificado_em.replace(tzinfo=timezone.utc, microsecond=0) <= desde:
+            return Response(status_code=304, headers=cabecalhos(tag, modificado_em))
+    return None
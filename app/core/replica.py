@@ -0,0 +1,133 @@
+# app/core/replica.py
+"""
+Roteamento das leituras para a réplica (DATABASE_READ_URL).
+
+Rotas só de leitura (dashboard, listagens, relatórios, /api/me) usam
+`get_async_read_db`; as rotas que gravam seguem no primário. A réplica
+é assíncrona, então há duas proteções contra dado velho:
+
+- escrita recente: quem acabou de gravar recebe um cookie e, por
+  DB_READ_STICKY_SECONDS, lê do primário (vê o que acabou de salvar);
+- atraso da réplica: checado a cada DB_READ_LAG_CHECK_SECONDS (por
+  worker). Acima de DB_READ_MAX_LAG_SECONDS, ou com a réplica fora do
+  ar, as leituras voltam para o primário até ela alcançar.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COOKIE_ESCRITA_RECENTE = "ds_escrita"
+_ESCREVEU = "escreveu_no_primario"  # chave em request.state
+
+# Sem WAL novo para aplicar a réplica está em dia, mesmo que a última
+# transação replicada seja antiga (primário ocioso).
+_SQL_ATRASO = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+def marcar_escrita(estado) -> None:
+    """Chamado no commit de uma escrita da requisição (ver fila_escrita_async)."""
+    if estado is not None:
+        setattr(estado, _ESCREVEU, True)
+
+
+def escrita_recente(request) -> bool:
+    return COOKIE_ESCRITA_RECENTE in request.cookies
+
+
+class MonitorAtraso:
+    """
+    Atraso da réplica, consultado no máximo a cada `intervalo` segundos.
+    No SQLite (sem replicação) só confere se a réplica abre.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_atraso: float, intervalo: float):
+        self.engine = engine
+        self.max_atraso = max_atraso
+        self.intervalo = intervalo
+        self.atraso: float | None = None
+        self.disponivel = True
+        self.checagens = 0
+        self.leituras_replica = 0
+        self.leituras_primario = 0
+        self._checado_em = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def _checar(self) -> None:
+        try:
+            async with self.engine.connect() as conn:
+                if self.engine.dialect.name == "postgresql":
+                    self.atraso = float(await conn.scalar(_SQL_ATRASO) or 0)
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    self.atraso = 0.0
+            self.disponivel = True
+        except Exception:
+            if self.disponivel:
+                logger.warning("Réplica de leitura indisponível; lendo do primário", exc_info=True)
+            self.atraso, self.disponivel = None, False
+
+    async def aceitavel(self) -> bool:
+        if time.monotonic() - self._checado_em >= self.intervalo:
+            async with self._lock:
+                # outra requisição pode ter checado enquanto esta esperava
+                if time.monotonic() - self._checado_em >= self.intervalo:
+                    await self._checar()
+                    self.checagens += 1
+                    self._checado_em = time.monotonic()
+        return self.disponivel and self.atraso is not None and self.atraso <= self.max_atraso
+
+    def stats(self) -> dict:
+        return {
+            "disponivel": self.disponivel,
+            "atraso_s": round(self.atraso, 3) if self.atraso is not None else None,
+            "max_atraso_s": self.max_atraso,
+            "checagens": self.checagens,
+            "leituras_replica": self.leituras_replica,
+            "leituras_primario": self.leituras_primario,
+        }
+
+
+class EscritaRecenteMiddleware:
+    """
+    Middleware ASGI: se a requisição gravou no primário, responde com o
+    cookie de escrita recente (vale DB_READ_STICKY_SECONDS).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = (
+            f"{COOKIE_ESCRITA_RECENTE}=1; Max-Age={int(settings.DB_READ_STICKY_SECONDS)}; "
+            "Path=/; HttpOnly; SameSite=lax"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = scope.setdefault("state", {})
+
+        async def send_com_cookie(message):
+            if message["type"] == "http.response.start" and estado.get(_ESCREVEU):
+                MutableHeaders(scope=message).append("set-cookie", self.cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_com_cookie)
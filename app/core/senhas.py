@@ -0,0 +1,118 @@
+# app/core/senhas.py
+"""
+Hash e verificação de senhas (bcrypt) num pool de processos dedicado.
+
+bcrypt custa centenas de ms de CPU por chamada; rodando no processo do app
+ele disputa o GIL com todas as outras requisições. Aqui o trabalho vai
+para PASSWORD_HASH_WORKERS processos separados e no máximo
+PASSWORD_HASH_MAX_PENDING operações ficam em andamento/na fila: acima
+disso a requisição recebe 503 na hora em vez de travar o servidor.
+
+PASSWORD_HASH_WORKERS=0 executa no próprio processo (dev/scripts).
+
+O custo do bcrypt vem de BCRYPT_ROUNDS. Hashes gravados com outro custo
+(ou esquema obsoleto) são refeitos no próximo login bem-sucedido, em
+background, sem job de migração em massa.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+def precisa_rehash(hashed_password: str) -> bool:
+    """True se o hash usa custo/esquema diferente do configurado (barato: só lê o cabeçalho)."""
+    return pwd_context.needs_update(hashed_password)
+
+
+# Funções executadas nos processos do pool (precisam ser picklable)
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class SenhaPool:
+    def __init__(self, workers: int, max_pendentes: int):
+        self.workers = workers
+        self.max_pendentes = max_pendentes
+        self._slots = threading.BoundedSemaphore(max_pendentes)
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self.rejeitadas = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # criado só no primeiro uso (não na importação do módulo)
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self.rejeitadas += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado. Tente novamente em instantes.",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            fut = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        return self._submit(fn, *args).result()
+
+    async def _run_async(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        # aguarda o processo do pool sem ocupar thread nem travar o event loop
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(_verify, plain_password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(_hash, password)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run_async(_verify, plain_password, hashed_password)
+
+    def encerrar(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+senha_pool = SenhaPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pendentes=settings.PASSWORD_HASH_MAX_PENDING,
+)
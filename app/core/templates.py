@@ -0,0 +1,157 @@
+# app/core/templates.py
+"""
+Camada de templates do painel (Jinja2).
+
+- Bytecode cache em disco (TEMPLATES_BYTECODE_DIR): o template compilado
+  é reaproveitado entre workers e restarts; a chave inclui o checksum do
+  .html, então editar o template invalida sozinho.
+- auto_reload desligado por padrão (produção): sem stat() do arquivo a
+  cada render. Em desenvolvimento: TEMPLATES_AUTO_RELOAD=true.
+- `aquecer()` compila todos os templates na subida, fora da primeira
+  requisição de cada worker.
+- `assinatura()`: hash dos templates e de /static, parte da ETag das
+  páginas (deploy com template novo não devolve 304 da página antiga).
+- `{% cache "nome", chave... %}...{% endcache %}`: cache de fragmento
+  (LRU por worker). A chave deve conter os próprios dados do fragmento
+  (ex.: as categorias da empresa, já consultadas pela rota): muda o dado,
+  muda a chave, sem invalidação manual. Só renderização é economizada.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, nodes
+from jinja2.ext import Extension
+from starlette.templating import Jinja2Templates
+
+from app.core.config import settings
+from app.core.estaticos import DIRETORIO as DIRETORIO_ESTATICOS, static_url
+
+
+class CacheFragmentos:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            html = self._data.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key: tuple, html: str) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = html
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "tamanho": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+fragmentos = CacheFragmentos(maxsize=settings.TEMPLATES_FRAGMENT_MAXSIZE)
+
+
+def _congelar(valor):
+    if isinstance(valor, list):
+        return tuple(valor)
+    return valor
+
+
+class CacheFragmentoExtension(Extension):
+    """Tag `{% cache %}`; a chave inclui o template e a linha da tag."""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        chave = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            chave.append(parser.parse_expression())
+        corpo = parser.parse_statements(("name:endcache",), drop_needle=True)
+        origem = nodes.Const(f"{parser.name}:{lineno}")
+        return nodes.CallBlock(
+            self.call_method("_renderizar", [origem, nodes.List(chave)]), [], [], corpo
+        ).set_lineno(lineno)
+
+    def _renderizar(self, origem: str, chave: list, caller) -> str:
+        try:
+            key = (origem, *(_congelar(v) for v in chave))
+            hash(key)
+        except TypeError:
+            # chave não hashable: renderiza sem cache
+            return caller()
+        html = fragmentos.get(key)
+        if html is None:
+            html = caller()
+            fragmentos.set(key, html)
+        return html
+
+
+def criar_templates(diretorio: str = "app/templates") -> Jinja2Templates:
+    bytecode_cache = None
+    if settings.TEMPLATES_BYTECODE_DIR:
+        os.makedirs(settings.TEMPLATES_BYTECODE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(settings.TEMPLATES_BYTECODE_DIR)
+
+    env = Environment(
+        loader=FileSystemLoader(diretorio),
+        autoescape=True,
+        auto_reload=settings.TEMPLATES_AUTO_RELOAD,
+        bytecode_cache=bytecode_cache,
+        extensions=[CacheFragmentoExtension],
+    )
+    env.globals["static_url"] = static_url
+    templates = Jinja2Templates(env=env)
+    templates.diretorio = diretorio
+    return templates
+
+
+_assinatura: str | None = None
+
+
+def assinatura(templates: Jinja2Templates) -> str:
+    """Hash do conteúdo dos templates e estáticos (recalculado a cada chamada com auto_reload)."""
+    global _assinatura
+    if _assinatura is None or templates.env.auto_reload:
+        h = hashlib.blake2b(digest_size=8)
+        for raiz in (templates.diretorio, DIRETORIO_ESTATICOS):
+            for p in sorted(Path(raiz).rglob("*")):
+                if p.is_file():
+                    h.update(p.read_bytes())
+        _assinatura = h.hexdigest()
+    return _assinatura
+
+
+def aquecer(templates: Jinja2Templates) -> int:
+    """Compila (ou lê do bytecode cache) todos os templates; devolve quantos."""
+    nomes = templates.env.list_templates(extensions=["html"])
+    for nome in nomes:
+        templates.env.get_template(nome)
+    return len(nomes)
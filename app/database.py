@@ -1,38 +1,81 @@
 # app/database.py
 import os
+import re
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+import anyio
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dual_saude.db")
+from app.core.config import settings
+from app.core.db_pool import PoolMedido, PoolMedidoAsync, PoolMedidoReplica, instalar_telemetria
+from app.core.replica import MonitorAtraso, escrita_recente, marcar_escrita
+
+
+def _normalizar_url(url: str) -> str:
+    # Força psycopg v3 no PostgreSQL (Render / Python 3.13)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+psycopg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return url
+
+
+def _url_async(url: str) -> str:
+    # Engine assíncrono: psycopg3 já tem driver async; no SQLite usa aiosqlite
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+DATABASE_URL = _normalizar_url(os.getenv("DATABASE_URL", "sqlite:///./dual_saude.db"))
+ASYNC_DATABASE_URL = _url_async(DATABASE_URL)
+
+# Réplica de leitura (opcional); sem ela tudo vai para o primário
+DATABASE_READ_URL = _normalizar_url(os.getenv("DATABASE_READ_URL") or "") or None
+
+# migrations (alembic.ini na raiz do projeto)
+ALEMBIC_DIR = str(Path(__file__).resolve().parent.parent / "alembic")
 
-# Força psycopg v3 no PostgreSQL (Render / Python 3.13)
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace(
-        "postgres://",
-        "postgresql+psycopg://",
-        1,
-    )
-elif DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace(
-        "postgresql://",
-        "postgresql+psycopg://",
-        1,
-    )
 
 class Base(DeclarativeBase):
     pass
 
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
 # connect_args só é necessário no SQLite
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+
+# Pool dimensionado por Settings (ver app/core/db_pool.py para a telemetria).
+# Sem pre-ping, conexões mortas são evitadas pelo recycle e, se o banco cair,
+# o primeiro erro de desconexão invalida o pool inteiro.
+def _pool_args(poolclass) -> dict:
+    if ":memory:" in DATABASE_URL:
+        return {}
+    return dict(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
 
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
-    pool_pre_ping=True,
     future=True,
+    **_pool_args(PoolMedido),
 )
+instalar_telemetria(engine)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -41,6 +84,104 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+# Rotas async (/auth, /api, financeiro): a espera pelo banco não ocupa
+# thread do threadpool do Starlette. Jobs, scripts e Alembic seguem no
+# engine síncrono.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **_pool_args(PoolMedidoAsync),
+)
+instalar_telemetria(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Leituras de dashboard/listagens/relatórios (ver app/core/replica.py)
+async_read_engine = None
+AsyncReadSessionLocal = None
+monitor_replica = None
+if DATABASE_READ_URL:
+    async_read_engine = create_async_engine(
+        _url_async(DATABASE_READ_URL),
+        connect_args={"check_same_thread": False} if DATABASE_READ_URL.startswith("sqlite") else {},
+        **_pool_args(PoolMedidoReplica),
+    )
+    instalar_telemetria(async_read_engine.sync_engine)
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=async_read_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    monitor_replica = MonitorAtraso(
+        async_read_engine,
+        max_atraso=settings.DB_READ_MAX_LAG_SECONDS,
+        intervalo=settings.DB_READ_LAG_CHECK_SECONDS,
+    )
+
+# =========================================================
+# SQLITE EM PRODUÇÃO (WAL + PRAGMAs + um escritor por vez)
+# =========================================================
+def _sqlite_pragmas(dbapi_conn, connection_record):
+    cur = dbapi_conn.cursor()
+    cur.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cur.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cur.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cur.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cur.close()
+
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+if async_read_engine is not None and async_read_engine.dialect.name == "sqlite":
+    event.listen(async_read_engine.sync_engine, "connect", _sqlite_pragmas)
+
+# SQLite aceita um escritor por vez. Em vez de disputar o lock do arquivo
+# (busy_timeout tenta em intervalos de até 100 ms, sem ordem, e um job de
+# importação pode deixar uma escrita do painel esperando até o timeout),
+# as escritas do processo passam por um lock único, compartilhado entre as
+# threads de importação e as rotas async.
+#
+# O driver só abre a transação no primeiro INSERT/UPDATE/DELETE (SELECTs
+# não seguram snapshot), então o trecho protegido é só o DML + commit.
+_lock_escrita = threading.Lock()
+
+
+@contextmanager
+def fila_escrita(db: Session):
+    """Trecho de escrita (DML até o commit) serializado no SQLite."""
+    if not IS_SQLITE:
+        yield
+        return
+    db.connection()  # conexão antes do lock: quem tem o lock nunca espera o pool
+    with _lock_escrita:
+        yield
+
+
+@asynccontextmanager
+async def fila_escrita_async(db: AsyncSession):
+    """
+    Mesmo que fila_escrita, para AsyncSession (espera numa thread, sem
+    travar o event loop). Também marca a requisição como "escreveu", para
+    as próximas leituras do cliente irem ao primário.
+    """
+    if IS_SQLITE:
+        await db.connection()
+        # shield: cancelada no meio da espera, a thread ainda pegaria o lock sem soltar
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(_lock_escrita.acquire)
+        try:
+            yield
+        finally:
+            _lock_escrita.release()
+    else:
+        yield
+    marcar_escrita(db.info.get("request_state"))
+
 
 def get_db():
     db = SessionLocal()
@@ -48,3 +189,88 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        db.info["request_state"] = request.state
+        yield db
+
+
+async def get_async_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Sessão para rotas só de leitura: réplica quando configurada e em dia;
+    primário (a mesma sessão de get_async_db) sem réplica, logo depois de
+    uma escrita do cliente ou com a réplica atrasada/fora do ar.
+    A sessão do primário não abre conexão enquanto não for usada.
+    """
+    if AsyncReadSessionLocal is None:
+        yield db
+        return
+    if escrita_recente(request) or not await monitor_replica.aceitavel():
+        monitor_replica.leituras_primario += 1
+        yield db
+        return
+    monitor_replica.leituras_replica += 1
+    async with AsyncReadSessionLocal() as leitura:
+        yield leitura
+
+
+@contextmanager
+def session_scope():
+    """Sessão própria para código fora de requisição (jobs, threads, scripts)."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def dialect_insert(db: Session, table):
+    """
+    insert() específico do dialeto em uso (PostgreSQL ou SQLite), que expõe
+    on_conflict_do_nothing / on_conflict_do_update para upserts em lote.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+class SchemaDesatualizado(RuntimeError):
+    pass
+
+
+_REVISAO = re.compile(r"^(down_revision|revision)\s*=\s*(.+)$", re.M)
+
+
+def heads_migrations(diretorio: str = ALEMBIC_DIR) -> set[str]:
+    """
+    Head(s) das migrations lendo `revision`/`down_revision` dos arquivos,
+    sem importar o runtime do Alembic (que pesa na subida de cada worker).
+    """
+    revisoes: set[str] = set()
+    anteriores: set[str] = set()
+    for arq in Path(diretorio, "versions").glob("*.py"):
+        for nome, valor in _REVISAO.findall(arq.read_text(encoding="utf-8")):
+            ids = set(re.findall(r"['\"]([^'\"]+)['\"]", valor))
+            (revisoes if nome == "revision" else anteriores).update(ids)
+    return revisoes - anteriores
+
+
+def verificar_schema(bind=engine) -> None:
+    """
+    Checagem barata na subida: compara a revisão gravada em alembic_version
+    com o head das migrations (1 SELECT, sem introspecção do catálogo).
+    As migrations rodam num passo separado do deploy: `alembic upgrade head`.
+    """
+    esperado = heads_migrations()
+    with bind.connect() as conn:
+        try:
+            atual = set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+        except DBAPIError:
+            atual = set()
+    if atual != esperado:
+        raise SchemaDesatualizado(
+            f"Banco na revisão {sorted(atual) or 'nenhuma'}, código espera {sorted(esperado)}. "
+            "Rode: alembic upgrade head"
+        )
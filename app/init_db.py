@@ -1,11 +1,11 @@
-from database import Base, engine
-import models  # importa para registrar Empresa, FuncionarioAutorizado, Usuario
+from alembic import command
+from alembic.config import Config
 
 
 def init_db():
-    print("📦 Criando tabelas no banco dual_saude.db ...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tabelas criadas com sucesso.")
+    print("📦 Aplicando migrations no banco (alembic upgrade head) ...")
+    command.upgrade(Config("alembic.ini"), "head")
+    print("✅ Banco atualizado.")
 
 
 if __name__ == "__main__":
@@ -1,22 +1,49 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 
-from app.database import Base, engine
-from app.routers import auth, api, demo_setup, web
+from app.core.compressao import CompressaoMiddleware
+from app.core.estaticos import StaticVersionado
+from app.core.replica import EscritaRecenteMiddleware
+from app.core.senhas import senha_pool
+from app.core.templates import aquecer, criar_templates
+from app.database import async_engine, async_read_engine, verificar_schema
+from app.routers import auth, api, api_financeiro, demo_setup, monitoramento, web
 from app.routers.web_financeiro import router as web_financeiro_router
 from app.routers.web_auth import router as web_auth_router
+from app.routers.web_importacao import router as web_importacao_router
+from app.services import importacao_jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # schema é criado/alterado por `alembic upgrade head` (passo do deploy);
+    # aqui só confere a revisão
+    verificar_schema()
+    # templates compilados antes da primeira requisição do worker
+    aquecer(app.state.templates)
+    # jobs de importação interrompidos por restart continuam do último bloco
+    importacao_jobs.retomar_jobs()
+    yield
+    importacao_jobs.encerrar()
+    senha_pool.encerrar()
+    await async_engine.dispose()
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
 
-# (Dev) Em produção, o ideal é Alembic migrations.
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Dual Saúde API",
     version="0.1.0",
     description="Backend da aplicação Dual Saúde",
+    lifespan=lifespan,
 )
 
+# quem acabou de gravar lê do primário por alguns segundos (ver app/core/replica.py)
+if async_read_engine is not None:
+    app.add_middleware(EscritaRecenteMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -25,9 +52,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Brotli/gzip acima de COMPRESSAO_MIN_BYTES (ver app/core/compressao.py)
+app.add_middleware(CompressaoMiddleware)
+
 # Static e Templates (Painel Web)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-app.state.templates = Jinja2Templates(directory="app/templates")
+# URLs geradas por static_url() levam o hash do conteúdo: cache de 1 ano.
+# `python -m app.build_static` gera as cópias com hash e as variantes .br/.gz
+app.mount("/static", StaticVersionado(directory="app/static"), name="static")
+app.state.templates = criar_templates("app/templates")
 
 
 @app.get("/")
@@ -40,7 +72,9 @@ def read_root():
 # =========================
 app.include_router(auth.router)
 app.include_router(api.router)
+app.include_router(api_financeiro.router)
 app.include_router(demo_setup.router)
+app.include_router(monitoramento.router)
 
 # =========================
 # Web (Painel)
@@ -48,3 +82,4 @@ app.include_router(demo_setup.router)
 app.include_router(web_auth_router)        # /painel/login  /painel/logout
 app.include_router(web.router)             # /painel
 app.include_router(web_financeiro_router)  # /painel/financeiro...
+app.include_router(web_importacao_router)  # /painel/importacao
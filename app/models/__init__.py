@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -13,6 +13,10 @@ class Empresa(Base):
     cnpj = Column(String, nullable=True)
     ativo = Column(Boolean, default=True)
 
+    # incrementada a cada escrita no financeiro (ETag/Last-Modified do painel)
+    versao_dados = Column(Integer, nullable=False, default=0, server_default="0")
+    dados_alterados_em = Column(DateTime, nullable=True)
+
     funcionarios = relationship(
         "FuncionarioAutorizado",
         back_populates="empresa",
@@ -28,7 +32,11 @@ class Empresa(Base):
 
 class FuncionarioAutorizado(Base):
     __tablename__ = "funcionarios_autorizados"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # chave do upsert da importação (ON CONFLICT)
+        Index("uq_funcionarios_autorizados_empresa_cpf", "empresa_id", "cpf", unique=True),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, nullable=False)
@@ -69,6 +77,7 @@ class Usuario(Base):
 # ============================================================
 # ✅ IMPORTA OS MODELS DO FINANCEIRO (REGISTRA NO ORM)
 # ============================================================
-from app.models.financeiro import CategoriaFinanceira, LancamentoFinanceiro  # noqa: E402,F401
+from app.models.financeiro import CategoriaFinanceira, LancamentoFinanceiro, ResumoFinanceiroMensal  # noqa: E402,F401
 from app.models.financeiro import PagamentoDestino  # noqa: F401
 
+from app.models.importacao import ImportacaoJob  # noqa: E402,F401
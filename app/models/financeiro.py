@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Date, Numeric, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Date, Numeric, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -19,6 +19,35 @@ class CategoriaFinanceira(Base):
 
 class LancamentoFinanceiro(Base):
     __tablename__ = "financeiro_lancamentos"
+    __table_args__ = (
+        # Toda consulta filtra empresa + período. No PostgreSQL os índices
+        # cobrem as colunas agregadas (index-only scan nos totais).
+
+        # lista (keyset data_lancamento, id) e DRE/competência
+        Index(
+            "ix_financeiro_lancamentos_empresa_data",
+            "empresa_id", "data_lancamento", "id",
+            postgresql_include=["tipo", "status", "valor"],
+        ),
+        # fluxo de caixa (status PAGO + data_pagamento)
+        Index(
+            "ix_financeiro_lancamentos_empresa_status_pagto",
+            "empresa_id", "status", "data_pagamento",
+            postgresql_include=["tipo", "valor"],
+        ),
+        # projeção de caixa (status PENDENTE + data_vencimento)
+        Index(
+            "ix_financeiro_lancamentos_empresa_status_venc",
+            "empresa_id", "status", "data_vencimento",
+            postgresql_include=["tipo", "valor"],
+        ),
+        # importação de extratos: a mesma transação não entra duas vezes
+        Index(
+            "ix_financeiro_lancamentos_empresa_hash",
+            "empresa_id", "hash_importacao",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=False, index=True)
@@ -38,10 +67,40 @@ class LancamentoFinanceiro(Base):
     status = Column(String, nullable=False, default="PENDENTE", index=True)  # "PENDENTE" | "PAGO"
     forma_pagamento = Column(String, nullable=True)  # "PIX", "Cartão", "Boleto", etc.
 
+    # só em lançamentos vindos de extrato (OFX/CSV); ver services/importacao_extrato.py
+    hash_importacao = Column(String(32), nullable=True)
+
     empresa = relationship("Empresa")
     categoria = relationship("CategoriaFinanceira", back_populates="lancamentos")
 
 
+# ============================================================
+# RESUMO MENSAL (ROLLUP) — mantido a cada escrita em lançamentos
+# ============================================================
+class ResumoFinanceiroMensal(Base):
+    __tablename__ = "financeiro_resumo_mensal"
+    __table_args__ = (
+        UniqueConstraint(
+            "empresa_id", "ano_mes", "tipo", "status", "categoria_id", name="uq_financeiro_resumo_mensal"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=False)
+
+    ano_mes = Column(String(7), nullable=False)  # "YYYY-MM"
+    tipo = Column(String, nullable=False)  # "RECEITA" | "DESPESA"
+    status = Column(String, nullable=False)  # "PENDENTE" | "PAGO"
+    categoria_id = Column(Integer, nullable=False, default=0)  # 0 = sem categoria
+
+    # competência: lançamentos com data_lancamento no mês
+    total_competencia = Column(Numeric(14, 2), nullable=False, default=0)
+    qtd_competencia = Column(Integer, nullable=False, default=0)
+
+    # caixa: lançamentos PAGOS com data_pagamento no mês (só status "PAGO")
+    total_caixa = Column(Numeric(14, 2), nullable=False, default=0)
+
+
 # ============================================================
 # NOVO: DADOS DE PAGAMENTO (PIX OU CONTA BANCÁRIA)
 # ============================================================
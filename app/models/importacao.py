@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+
+from app.database import Base
+
+
+# ============================================================
+# JOBS DE IMPORTAÇÃO (PLANILHA DE EMPRESAS / FUNCIONÁRIOS)
+# ============================================================
+class ImportacaoJob(Base):
+    __tablename__ = "importacao_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # empresa do usuário que enviou a planilha: só ela vê o job
+    empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=True, index=True)
+
+    # "PENDENTE" | "PROCESSANDO" | "CONCLUIDO" | "ERRO"
+    status = Column(String, nullable=False, default="PENDENTE", index=True)
+
+    arquivo_nome = Column(String, nullable=False)
+    arquivo_path = Column(String, nullable=False)  # cópia do upload em IMPORT_UPLOAD_DIR
+
+    # Progresso: commitado junto com cada bloco, permite retomar do ponto exato
+    ultima_linha = Column(Integer, nullable=False, default=1)  # última linha da planilha já gravada
+    linhas_processadas = Column(Integer, nullable=False, default=0)
+
+    empresas_criadas = Column(Integer, nullable=False, default=0)
+    empresas_atualizadas = Column(Integer, nullable=False, default=0)
+    funcionarios_criados = Column(Integer, nullable=False, default=0)
+    funcionarios_atualizados = Column(Integer, nullable=False, default=0)
+
+    erros = Column(Text, nullable=True)  # JSON: lista (limitada) de erros por linha
+    erros_total = Column(Integer, nullable=False, default=0)
+    mensagem = Column(String, nullable=True)  # erro que interrompeu o job
+    tentativas = Column(Integer, nullable=False, default=0)  # vezes que um worker assumiu o job
+
+    criado_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+    heartbeat_em = Column(DateTime, nullable=True)  # atualizado a cada bloco
+    concluido_em = Column(DateTime, nullable=True)
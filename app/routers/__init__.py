@@ -1,4 +1,5 @@
 # app/routers/__init__.py
 from . import auth
 from . import api
+from . import api_financeiro
 from . import demo_setup
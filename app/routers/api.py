@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import Empresa, FuncionarioAutorizado, Usuario
+from app.database import fila_escrita_async, get_async_db
+from app.core.auth_cache import UsuarioAutenticado
+from app.models import Empresa, FuncionarioAutorizado
 from app import schemas
 from app.routers.auth import get_current_user  # pega usuário logado via token JWT
 
@@ -11,12 +13,12 @@ router = APIRouter(prefix="/api", tags=["API"])
 
 
 @router.get("/hello")
-def hello():
+async def hello():
     return {"message": "API Dual Saúde online"}
 
 
 @router.post("/setup-demo")
-def setup_demo(db: Session = Depends(get_db)):
+async def setup_demo(db: AsyncSession = Depends(get_async_db)):
     """
     Cria dados de demonstração para testes:
 
@@ -26,27 +28,28 @@ def setup_demo(db: Session = Depends(get_db)):
 
     # Empresa demo
     empresa_nome = "Empresa Demo Dual Saúde"
-    empresa = db.query(Empresa).filter(Empresa.nome == empresa_nome).first()
+    empresa = await db.scalar(select(Empresa).where(Empresa.nome == empresa_nome).limit(1))
     if not empresa:
         empresa = Empresa(
             nome=empresa_nome,
             cnpj="00.000.000/0001-00",
             ativo=True,
         )
-        db.add(empresa)
-        db.commit()
-        db.refresh(empresa)
+        async with fila_escrita_async(db):
+            db.add(empresa)
+            await db.commit()
+        await db.refresh(empresa)
 
     # Funcionário autorizado demo
     cpf_demo = "12345678900"
     email_demo = "colaborador.demo@empresa.com"
-    funcionario = (
-        db.query(FuncionarioAutorizado)
-        .filter(
+    funcionario = await db.scalar(
+        select(FuncionarioAutorizado)
+        .where(
             FuncionarioAutorizado.empresa_id == empresa.id,
             FuncionarioAutorizado.cpf == cpf_demo,
         )
-        .first()
+        .limit(1)
     )
     if not funcionario:
         funcionario = FuncionarioAutorizado(
@@ -56,9 +59,10 @@ def setup_demo(db: Session = Depends(get_db)):
             ativo=True,
             empresa_id=empresa.id,
         )
-        db.add(funcionario)
-        db.commit()
-        db.refresh(funcionario)
+        async with fila_escrita_async(db):
+            db.add(funcionario)
+            await db.commit()
+        await db.refresh(funcionario)
 
     return {
         "message": "Dados de demonstração criados/atualizados com sucesso.",
@@ -78,5 +82,5 @@ def setup_demo(db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=schemas.UsuarioRead)
-def get_me(current_user: Usuario = Depends(get_current_user)):
+async def get_me(current_user: UsuarioAutenticado = Depends(get_current_user)):
     return current_user
@@ -0,0 +1,69 @@
+# app/routers/api_financeiro.py
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core.auth_cache import UsuarioAutenticado
+from app.core.config import settings
+from app.database import fila_escrita_async, get_async_db, get_async_read_db
+from app.routers.auth import get_current_user  # pega usuário logado via token JWT
+from app.services import lancamentos_lote
+from app.services.financeiro_projecao import projecao
+
+router = APIRouter(prefix="/api/financeiro", tags=["API - Financeiro"])
+
+
+@router.post("/lancamentos:batch", response_model=schemas.ResultadoLote)
+async def lancamentos_batch(
+    lote: schemas.LoteLancamentos,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
+):
+    """
+    Até API_LOTE_MAX_OPERACOES operações em uma requisição e uma transação:
+
+        {"operacoes": [
+            {"op": "criar", "ref": "app-1", "dados": {"tipo": "RECEITA", "descricao": "...",
+                                                      "valor": "120.50", "data_lancamento": "2026-10-01"}},
+            {"op": "alterar", "id": 10, "dados": {"valor": "99.90"}},
+            {"op": "marcar_pago", "id": 11},
+            {"op": "excluir", "id": 12}
+         ],
+         "atomico": false}
+
+    Resposta com um resultado por operação, na ordem (id criado ou erro).
+    Operações inválidas (id inexistente, categoria de outra empresa) não
+    impedem as demais, a menos que `atomico` seja true: aí nada é gravado
+    e a resposta é 422.
+    """
+    async with fila_escrita_async(db):
+        resultado = await db.run_sync(lancamentos_lote.aplicar, current_user.empresa_id, lote)
+        if resultado.aplicado:
+            await db.commit()
+        else:
+            await db.rollback()
+
+    if not resultado.aplicado:
+        response.status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    return resultado
+
+
+@router.get("/projecao", response_model=schemas.ProjecaoCaixa)
+async def projecao_caixa(
+    meses: int = Query(settings.PROJECAO_MESES_PADRAO, ge=1, le=settings.PROJECAO_MESES_MAX),
+    granularidade: Literal["dia", "semana"] = "dia",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
+):
+    """
+    Saldo de caixa previsto de hoje até daqui a `meses` meses: saldo atual
+    (pagos) mais receitas/despesas pendentes pelo vencimento, por dia ou
+    por semana (a partir da segunda-feira). Cada ponto traz o saldo
+    acumulado ao fim do período; `menor_saldo` mostra quando o caixa fica
+    mais baixo.
+    """
+    return await db.run_sync(projecao, current_user.empresa_id, date.today(), meses, granularidade)
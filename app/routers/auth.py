@@ -1,14 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.core.auth_cache import UsuarioAutenticado, auth_cache
+from app.core.senhas import precisa_rehash, senha_pool
+from app.database import AsyncSessionLocal, fila_escrita_async, get_async_db, get_async_read_db
 from app import models, schemas
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -21,7 +23,6 @@ SECRET_KEY = "CHANGE_ME_SUPER_SECRET"  # mover para env depois
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 12  # 12 horas
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 # =========================================================
@@ -38,13 +39,39 @@ def _norm_spaces(s: Optional[str]) -> str:
     return " ".join((s or "").strip().split())
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    # roda no pool de processos (HTTP 503 se o pool estiver saturado)
+    return await senha_pool.verify_async(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     # bcrypt aceita até 72 chars
-    return pwd_context.hash(password[:72])
+    return await senha_pool.hash_async(password[:72])
+
+
+async def rehash_password(user_id: int, old_hash: str, plain_password: str) -> None:
+    """
+    Regrava o hash com o custo atual (BCRYPT_ROUNDS). Roda como background
+    task, depois da resposta do login. Só grava se o hash não mudou nesse
+    meio-tempo; com o pool saturado, tenta de novo no próximo login.
+    """
+    try:
+        new_hash = await get_password_hash(plain_password)
+    except HTTPException:
+        return
+
+    async with AsyncSessionLocal() as db, fila_escrita_async(db):
+        await db.execute(
+            update(models.Usuario)
+            .where(models.Usuario.id == user_id, models.Usuario.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        await db.commit()
+
+
+def schedule_rehash(background_tasks: BackgroundTasks, user, plain_password: str) -> None:
+    if precisa_rehash(user.hashed_password):
+        background_tasks.add_task(rehash_password, user.id, user.hashed_password, plain_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -56,22 +83,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_user_by_email(db: Session, email: str):
-    return (
-        db.query(models.Usuario)
-        .filter(models.Usuario.email == email)
-        .first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(
+        select(models.Usuario)
+        .where(models.Usuario.email == email)
+        .limit(1)
     )
 
 # =========================================================
 # AUTH CORE
 # =========================================================
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user_by_email(db, email)
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    # encerra a transação de leitura: a conexão volta ao pool durante o bcrypt
+    await db.commit()
+    if not await verify_password(password, user.hashed_password):
         return None
     if not user.ativo:
         return None
@@ -82,9 +111,9 @@ def authenticate_user(db: Session, email: str, password: str):
 # =========================================================
 
 @router.post("/register", response_model=schemas.UsuarioRead)
-def register_user(
+async def register_user(
     payload: schemas.UsuarioCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     cpf = _digits_only(payload.cpf)
     celular = _digits_only(payload.celular)
@@ -97,19 +126,24 @@ def register_user(
         )
 
     # CPF único
-    if db.query(models.Usuario).filter(models.Usuario.cpf == cpf).first():
+    if await db.scalar(select(models.Usuario.id).where(models.Usuario.cpf == cpf).limit(1)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="CPF já cadastrado. Faça login.",
         )
 
     # E-mail único
-    if db.query(models.Usuario).filter(models.Usuario.email == email).first():
+    if await db.scalar(select(models.Usuario.id).where(models.Usuario.email == email).limit(1)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="E-mail já cadastrado. Faça login.",
         )
 
+    # validações baratas primeiro; encerra a transação de leitura para a
+    # conexão voltar ao pool durante o bcrypt
+    await db.commit()
+    hashed_password = await get_password_hash(payload.senha)
+
     try:
         user = models.Usuario(
             nome=_norm_spaces(payload.nome),
@@ -117,17 +151,18 @@ def register_user(
             email=email,
             celular=celular,
             empresa_id=1,  # empresa técnica padrão (demo/app)
-            hashed_password=get_password_hash(payload.senha),
+            hashed_password=hashed_password,
             ativo=True,
         )
 
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        async with fila_escrita_async(db):
+            db.add(user)
+            await db.commit()
+        await db.refresh(user)
         return user
 
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         print("INTEGRITY ERROR /auth/register:", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -135,7 +170,7 @@ def register_user(
         )
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print("ERROR /auth/register:", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -147,14 +182,15 @@ def register_user(
 # =========================================================
 
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     email = (form_data.username or "").strip().lower()
     password = form_data.password
 
-    user = authenticate_user(db, email, password)
+    user = await authenticate_user(db, email, password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -162,6 +198,8 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    schedule_rehash(background_tasks, user, password)
+
     access_token = create_access_token(
         data={"sub": str(user.id)}
     )
@@ -175,10 +213,11 @@ def login(
 # CURRENT USER (JWT)
 # =========================================================
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
+    db: AsyncSession = Depends(get_async_read_db),
+    primario: AsyncSession = Depends(get_async_db),
+) -> UsuarioAutenticado:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido ou expirado.",
@@ -193,19 +232,31 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = (
-        db.query(models.Usuario)
-        .filter(models.Usuario.id == int(user_id))
-        .first()
-    )
-    if not user:
-        raise credentials_exception
+    cache_key = f"id:{user_id}"
+    principal = auth_cache.get(cache_key)
+    if principal is None:
+        user = await db.get(models.Usuario, int(user_id))
+        if not user and db is not primario:
+            # cadastro recente ainda não replicado
+            user = await primario.get(models.Usuario, int(user_id))
+        if not user:
+            raise credentials_exception
 
-    return user
+        principal = UsuarioAutenticado.from_model(user)
+        auth_cache.set(cache_key, principal)
+
+    # desativado depois de emitir o token (a desativação invalida o cache)
+    if not principal.ativo:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Usuário inativo.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
 
 
 @router.get("/me", response_model=schemas.UsuarioRead)
-def read_users_me(
-    current_user: models.Usuario = Depends(get_current_user),
+async def read_users_me(
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
     return current_user
@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import fila_escrita, get_db
 from app.models import Empresa, FuncionarioAutorizado
 
 
@@ -28,8 +28,9 @@ def setup_demo(db: Session = Depends(get_db)):
 
     if not empresa:
         empresa = Empresa(nome=EMPRESA_NOME)
-        db.add(empresa)
-        db.commit()
+        with fila_escrita(db):
+            db.add(empresa)
+            db.commit()
         db.refresh(empresa)
 
     # ============================
@@ -54,8 +55,9 @@ def setup_demo(db: Session = Depends(get_db)):
             email=EMAIL_DEMO,
             empresa_id=empresa.id,
         )
-        db.add(func)
-        db.commit()
+        with fila_escrita(db):
+            db.add(func)
+            db.commit()
         db.refresh(func)
 
     return {
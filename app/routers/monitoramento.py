@@ -0,0 +1,84 @@
+# app/routers/monitoramento.py
+
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.core.auth_cache import auth_cache
+from app.core.config import settings
+from app.core.db_pool import pool_stats
+from app.core.senhas import senha_pool
+from app.core.templates import fragmentos
+from app.database import async_engine, async_read_engine, engine, monitor_replica
+from app.services.financeiro_analise import cache_analise
+
+
+def exigir_token_monitoramento(request: Request) -> None:
+    """Token compartilhado (MONITORAMENTO_TOKEN) no header Authorization: Bearer."""
+    esperado = settings.MONITORAMENTO_TOKEN
+    if not esperado:
+        # sem token configurado os endpoints não existem
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    esquema, _, token = request.headers.get("Authorization", "").partition(" ")
+    if esquema.lower() != "bearer" or not secrets.compare_digest(token.encode(), esperado.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="Token de monitoramento inválido.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(
+    prefix="/monitoramento",
+    tags=["Monitoramento"],
+    dependencies=[Depends(exigir_token_monitoramento)],
+)
+
+
+@router.get("/auth-cache")
+def auth_cache_stats():
+    """Hits/misses do cache de usuários autenticados (deste worker)."""
+    return auth_cache.stats()
+
+
+@router.get("/senhas")
+def senhas_stats():
+    """Pool de hash de senhas: tamanho, limite de fila e requisições rejeitadas (503)."""
+    return {
+        "workers": senha_pool.workers,
+        "max_pendentes": senha_pool.max_pendentes,
+        "rejeitadas": senha_pool.rejeitadas,
+    }
+
+
+@router.get("/templates")
+def templates_stats():
+    """Cache de fragmentos ({% cache %}) dos templates (deste worker)."""
+    return fragmentos.stats()
+
+
+@router.get("/analise")
+def analise_stats():
+    """Cache da análise por categoria dos relatórios (deste worker)."""
+    return cache_analise.stats()
+
+
+@router.get("/db-pool")
+def db_pool_stats():
+    """Pools de conexões deste worker: em uso/ociosas/overflow e histograma de espera no checkout."""
+    dados = {
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine),
+    }
+    if async_read_engine is not None:
+        dados["leitura"] = pool_stats(async_read_engine.sync_engine)
+    return dados
+
+
+@router.get("/replica")
+def replica_stats():
+    """Réplica de leitura: atraso da última checagem e leituras roteadas para réplica/primário."""
+    if monitor_replica is None:
+        return {"configurada": False}
+    return {"configurada": True, **monitor_replica.stats()}
@@ -1,10 +1,12 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, Form, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.core.auth_cache import UsuarioAutenticado, auth_cache
+from app.database import get_async_db, get_async_read_db
 from app.models import Usuario
 
 # Importa as configs/token do seu auth.py (sem alterar a API)
@@ -14,6 +16,7 @@ from app.routers.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     verify_password,
     create_access_token,
+    schedule_rehash,
 )
 
 router = APIRouter(tags=["Web - Auth"])
@@ -25,6 +28,11 @@ def _redir(url: str) -> RedirectResponse:
     return RedirectResponse(url=url, status_code=303)
 
 
+def _para_login() -> HTTPException:
+    # dependência não pode devolver resposta: a exceção vira o 303 para o login
+    return HTTPException(status_code=303, headers={"Location": "/painel/login"})
+
+
 @router.get("/painel/login", response_class=HTMLResponse)
 def painel_login_get(request: Request):
     templates = request.app.state.templates
@@ -35,19 +43,24 @@ def painel_login_get(request: Request):
 
 
 @router.post("/painel/login")
-def painel_login_post(
+async def painel_login_post(
     request: Request,
+    background_tasks: BackgroundTasks,
     email: str = Form(...),
     senha: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     email = (email or "").strip().lower()
     senha = senha or ""
 
-    user = db.query(Usuario).filter(Usuario.email == email).first()
-    if not user or not verify_password(senha, user.hashed_password):
+    user = await db.scalar(select(Usuario).where(Usuario.email == email).limit(1))
+    # encerra a transação de leitura: a conexão volta ao pool durante o bcrypt
+    await db.commit()
+    if not user or not await verify_password(senha, user.hashed_password):
         return _redir("/painel/login?err=1")
 
+    schedule_rehash(background_tasks, user, senha)
+
     expire_minutes = int(ACCESS_TOKEN_EXPIRE_MINUTES or 720)
     access_token = create_access_token(
         data={"sub": user.email},
@@ -76,14 +89,15 @@ def painel_logout():
 # =========================
 # Dependency para páginas WEB (cookie)
 # =========================
-def get_current_user_web(
+async def get_current_user_web(
     request: Request,
-    db: Session = Depends(get_db),
-) -> Usuario:
+    db: AsyncSession = Depends(get_async_read_db),
+    primario: AsyncSession = Depends(get_async_db),
+) -> UsuarioAutenticado:
     token = request.cookies.get(COOKIE_NAME)
     if not token:
         # sem cookie -> manda pro login do painel
-        raise RedirectResponse(url="/painel/login", status_code=303)
+        raise _para_login()
 
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -91,10 +105,23 @@ def get_current_user_web(
         if not email:
             raise ValueError("Token sem sub")
     except (JWTError, Exception):
-        raise RedirectResponse(url="/painel/login", status_code=303)
-
-    user = db.query(Usuario).filter(Usuario.email == email).first()
-    if not user:
-        raise RedirectResponse(url="/painel/login", status_code=303)
-
-    return user
+        raise _para_login()
+
+    cache_key = f"email:{email}"
+    principal = auth_cache.get(cache_key)
+    if principal is None:
+        consulta = select(Usuario).where(Usuario.email == email).limit(1)
+        user = await db.scalar(consulta)
+        if not user and db is not primario:
+            # cadastro recente ainda não replicado
+            user = await primario.scalar(consulta)
+        if not user:
+            raise _para_login()
+
+        principal = UsuarioAutenticado.from_model(user)
+        auth_cache.set(cache_key, principal)
+
+    # desativado depois do login (a desativação invalida o cache)
+    if not principal.ativo:
+        raise _para_login()
+    return principal
@@ -1,14 +1,29 @@
+import os
 from datetime import date, datetime
 from calendar import monthrange
-
-from fastapi import APIRouter, Request, Depends, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-
-from app.database import get_db
-from app.models import Usuario
+from typing import Literal
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Request, Depends, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import http_cache
+from app.core.config import settings
+from app.core.replica import marcar_escrita
+from app.core.templates import assinatura
+from app.database import fila_escrita_async, get_async_db, get_async_read_db
+from app.core.auth_cache import UsuarioAutenticado
 from app.models.financeiro import CategoriaFinanceira, LancamentoFinanceiro
+from app.services import financeiro_resumo as resumo_fin
+from app.services import financeiro_exportacao as exportacao
+from app.services import versao_dados
+from app.services.financeiro_agregacao import quantidade_mes, totais_periodo, totais_por_mes
+from app.services.financeiro_analise import analise_categorias
+from app.services.importacao import salvar_upload
+from app.services.importacao_extrato import EXTENSOES, ExtratoInvalido, importar_extrato
 
 # Import compatível: se o projeto usa PagamentoDestino no __init__.py,
 # este alias existe no financeiro.py (PagamentoDestino = DadosPagamento)
@@ -40,11 +55,15 @@ def _month_bounds(y: int, m: int) -> tuple[date, date]:
     return start, end
 
 
-def _money(v) -> float:
+def _parse_cursor(cursor: str | None) -> tuple[date, int] | None:
+    # "YYYY-MM-DD_id" do último item da página anterior
+    if not cursor:
+        return None
     try:
-        return float(v or 0)
+        d, lanc_id = cursor.split("_")
+        return (date.fromisoformat(d), int(lanc_id))
     except Exception:
-        return 0.0
+        return None
 
 
 def _redir(url: str) -> RedirectResponse:
@@ -55,85 +74,113 @@ def _nav_ctx(current: str, ym: str) -> dict:
     return {"fin_current": current, "ym": ym}
 
 
+# Listagens: só as colunas que os templates usam, em Rows leves (sem
+# identity map, sem observacao, sem relationship para carregar depois;
+# na sessão async um lazy load no template nem funcionaria).
+_COLUNAS_LANCAMENTO = (
+    LancamentoFinanceiro.id,
+    LancamentoFinanceiro.data_lancamento,
+    LancamentoFinanceiro.descricao,
+    LancamentoFinanceiro.tipo,
+    LancamentoFinanceiro.status,
+    LancamentoFinanceiro.valor,
+    CategoriaFinanceira.nome.label("categoria_nome"),
+)
+
+
+def _select_lancamentos():
+    return select(*_COLUNAS_LANCAMENTO).outerjoin(
+        CategoriaFinanceira, CategoriaFinanceira.id == LancamentoFinanceiro.categoria_id
+    )
+
+
+def _select_pagina(filtro: list, pos: tuple[date, int] | None, size: int):
+    """Página da lista: keyset em (data_lancamento, id) DESC, na ordem do índice empresa+data."""
+    if pos:
+        d, lanc_id = pos
+        filtro = [
+            *filtro,
+            or_(
+                LancamentoFinanceiro.data_lancamento < d,
+                and_(LancamentoFinanceiro.data_lancamento == d, LancamentoFinanceiro.id < lanc_id),
+            ),
+        ]
+    return (
+        _select_lancamentos()
+        .where(*filtro)
+        .order_by(LancamentoFinanceiro.data_lancamento.desc(), LancamentoFinanceiro.id.desc())
+        .limit(size + 1)
+    )
+
+
+def _select_categorias(empresa_id: int):
+    return (
+        select(CategoriaFinanceira.id, CategoriaFinanceira.nome, CategoriaFinanceira.tipo)
+        .where(CategoriaFinanceira.empresa_id == empresa_id)
+        .order_by(CategoriaFinanceira.tipo, CategoriaFinanceira.nome)
+    )
+
+
 @router.get("/painel/financeiro", response_class=HTMLResponse)
-def financeiro_dashboard(
+async def financeiro_dashboard(
     request: Request,
     ym: str | None = None,
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
     templates = request.app.state.templates
 
     y, m = _parse_ym(ym)
     start, end = _month_bounds(y, m)
 
-    base_q = (
-        db.query(LancamentoFinanceiro)
-        .filter(LancamentoFinanceiro.empresa_id == user.empresa_id)
-        .filter(LancamentoFinanceiro.data_lancamento >= start)
-        .filter(LancamentoFinanceiro.data_lancamento <= end)
-    )
-
-    totais = (
-        db.query(
-            func.coalesce(
-                func.sum(case((LancamentoFinanceiro.tipo == "RECEITA", LancamentoFinanceiro.valor), else_=0)),
-                0,
-            ).label("receitas"),
-            func.coalesce(
-                func.sum(case((LancamentoFinanceiro.tipo == "DESPESA", LancamentoFinanceiro.valor), else_=0)),
-                0,
-            ).label("despesas"),
-            func.coalesce(
-                func.sum(case((LancamentoFinanceiro.status == "PENDENTE", LancamentoFinanceiro.valor), else_=0)),
-                0,
-            ).label("pendentes"),
+    versao = await db.run_sync(versao_dados.obter, user.empresa_id)
+    tag = http_cache.etag("dashboard", user.empresa_id, versao.versao, y, m, assinatura(templates))
+    nao_mudou = http_cache.nao_modificado(request, tag, versao.alterado_em)
+    if nao_mudou is not None:
+        return nao_mudou
+
+    # serviços de agregação usam Session síncrona: run_sync na mesma conexão
+    totais = await db.run_sync(totais_periodo, user.empresa_id, start, end)
+
+    ultimos = (
+        await db.execute(
+            _select_lancamentos()
+            .where(
+                LancamentoFinanceiro.empresa_id == user.empresa_id,
+                LancamentoFinanceiro.data_lancamento >= start,
+                LancamentoFinanceiro.data_lancamento <= end,
+            )
+            .order_by(LancamentoFinanceiro.data_lancamento.desc())
+            .limit(8)
         )
-        .filter(
-            LancamentoFinanceiro.empresa_id == user.empresa_id,
-            LancamentoFinanceiro.data_lancamento >= start,
-            LancamentoFinanceiro.data_lancamento <= end,
-        )
-        .first()
-    )
-
-    receitas = _money(totais.receitas)
-    despesas = _money(totais.despesas)
-    saldo = receitas - despesas
-    pendentes = _money(totais.pendentes)
-
-    ultimos = base_q.order_by(LancamentoFinanceiro.data_lancamento.desc()).limit(8).all()
+    ).all()
 
     return templates.TemplateResponse(
         "financeiro/dashboard.html",
         {
             "request": request,
             "title": "Financeiro",
-            "receitas": receitas,
-            "despesas": despesas,
-            "saldo": saldo,
-            "pendentes": pendentes,
+            "receitas": totais.receitas,
+            "despesas": totais.despesas,
+            "saldo": totais.resultado,
+            "pendentes": totais.pendentes,
             "ultimos": ultimos,
             "periodo_label": f"{m:02d}/{y}",
             **_nav_ctx("dashboard", f"{y}-{m:02d}"),
         },
+        headers=http_cache.cabecalhos(tag, versao.alterado_em),
     )
 
 
 @router.get("/painel/financeiro/categorias", response_class=HTMLResponse)
-def categorias_listar(
+async def categorias_listar(
     request: Request,
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
     templates = request.app.state.templates
 
-    categorias = (
-        db.query(CategoriaFinanceira)
-        .filter(CategoriaFinanceira.empresa_id == user.empresa_id)
-        .order_by(CategoriaFinanceira.tipo, CategoriaFinanceira.nome)
-        .all()
-    )
+    categorias = (await db.execute(_select_categorias(user.empresa_id))).all()
 
     return templates.TemplateResponse(
         "financeiro/categorias.html",
@@ -147,11 +194,11 @@ def categorias_listar(
 
 
 @router.post("/painel/financeiro/categorias/criar")
-def categorias_criar(
+async def categorias_criar(
     nome: str = Form(...),
     tipo: str = Form(...),
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
     nome = (nome or "").strip()
     tipo = (tipo or "").strip().upper()
@@ -159,77 +206,126 @@ def categorias_criar(
     if tipo not in ("RECEITA", "DESPESA"):
         return _redir("/painel/financeiro/categorias")
 
-    exists = (
-        db.query(CategoriaFinanceira)
-        .filter(
+    exists = await db.scalar(
+        select(CategoriaFinanceira.id)
+        .where(
             CategoriaFinanceira.empresa_id == user.empresa_id,
             CategoriaFinanceira.tipo == tipo,
             func.lower(CategoriaFinanceira.nome) == nome.lower(),
         )
-        .first()
+        .limit(1)
     )
 
     if not exists and nome:
-        db.add(CategoriaFinanceira(nome=nome, tipo=tipo, empresa_id=user.empresa_id))
-        db.commit()
+        async with fila_escrita_async(db):
+            db.add(CategoriaFinanceira(nome=nome, tipo=tipo, empresa_id=user.empresa_id))
+            await db.run_sync(versao_dados.incrementar, user.empresa_id)
+            await db.commit()
 
     return _redir("/painel/financeiro/categorias")
 
 
 @router.get("/painel/financeiro/categorias/excluir/{categoria_id}")
-def categorias_excluir(
+async def categorias_excluir(
     categoria_id: int,
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
-    cat = (
-        db.query(CategoriaFinanceira)
-        .filter(CategoriaFinanceira.id == categoria_id, CategoriaFinanceira.empresa_id == user.empresa_id)
-        .first()
+    cat = await db.scalar(
+        select(CategoriaFinanceira)
+        .where(CategoriaFinanceira.id == categoria_id, CategoriaFinanceira.empresa_id == user.empresa_id)
     )
     if cat:
-        db.delete(cat)
-        db.commit()
+        async with fila_escrita_async(db):
+            # lançamentos ficam sem categoria; o resumo acompanha (categoria 0)
+            await db.run_sync(resumo_fin.registrar_exclusao_categoria, user.empresa_id, cat.id)
+            await db.delete(cat)
+            await db.commit()
     return _redir("/painel/financeiro/categorias")
 
 
 @router.get("/painel/financeiro/lancamentos", response_class=HTMLResponse)
-def lancamentos_listar(
+async def lancamentos_listar(
     request: Request,
     ym: str | None = None,
     status: str | None = None,
     tipo: str | None = None,
     categoria_id: int | None = None,
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    busca: str | None = None,
+    cursor: str | None = None,
+    page_size: int | None = None,
+    importados: int | None = None,
+    duplicados: int | None = None,
+    ignorados: int | None = None,
+    imp_erro: str | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
+    """
+    Lista paginada por cursor (keyset em data_lancamento DESC, id DESC):
+    cada página custa o mesmo, independente do volume do mês.
+    """
     templates = request.app.state.templates
 
     y, m = _parse_ym(ym)
     start, end = _month_bounds(y, m)
-
-    q = (
-        db.query(LancamentoFinanceiro)
-        .filter(LancamentoFinanceiro.empresa_id == user.empresa_id)
-        .filter(LancamentoFinanceiro.data_lancamento >= start)
-        .filter(LancamentoFinanceiro.data_lancamento <= end)
-    )
-
-    if status in ("PENDENTE", "PAGO"):
-        q = q.filter(LancamentoFinanceiro.status == status)
-    if tipo in ("RECEITA", "DESPESA"):
-        q = q.filter(LancamentoFinanceiro.tipo == tipo)
+    size = min(max(page_size or settings.LANCAMENTOS_PAGE_SIZE, 1), settings.LANCAMENTOS_PAGE_SIZE_MAX)
+    busca = (busca or "").strip()
+
+    filtro = [
+        LancamentoFinanceiro.empresa_id == user.empresa_id,
+        LancamentoFinanceiro.data_lancamento >= start,
+        LancamentoFinanceiro.data_lancamento <= end,
+    ]
+
+    status = status if status in ("PENDENTE", "PAGO") else None
+    tipo = tipo if tipo in ("RECEITA", "DESPESA") else None
+    if status:
+        filtro.append(LancamentoFinanceiro.status == status)
+    if tipo:
+        filtro.append(LancamentoFinanceiro.tipo == tipo)
     if categoria_id:
-        q = q.filter(LancamentoFinanceiro.categoria_id == categoria_id)
+        filtro.append(LancamentoFinanceiro.categoria_id == categoria_id)
+    if busca:
+        filtro.append(LancamentoFinanceiro.descricao.icontains(busca, autoescape=True))
 
-    lancamentos = q.order_by(LancamentoFinanceiro.data_lancamento.desc()).all()
-
-    categorias = (
-        db.query(CategoriaFinanceira)
-        .filter(CategoriaFinanceira.empresa_id == user.empresa_id)
-        .order_by(CategoriaFinanceira.tipo, CategoriaFinanceira.nome)
-        .all()
-    )
+    # total: do resumo mensal quando os filtros permitem, senão COUNT(*)
+    if categoria_id or busca:
+        total = await db.scalar(select(func.count()).select_from(LancamentoFinanceiro).where(*filtro))
+    else:
+        total = await db.run_sync(quantidade_mes, user.empresa_id, start, tipo=tipo, status=status)
+
+    pos = _parse_cursor(cursor)
+    rows = (await db.execute(_select_pagina(filtro, pos, size))).all()
+    lancamentos = rows[:size]
+
+    filtros = {
+        "ym": f"{y}-{m:02d}",
+        "status": status or "",
+        "tipo": tipo or "",
+        "categoria_id": categoria_id or "",
+        "busca": busca,
+        "page_size": page_size or "",
+    }
+    filtros = {k: v for k, v in filtros.items() if v}
+    base_url = "/painel/financeiro/lancamentos?" + urlencode(filtros)
+
+    next_url = None
+    if len(rows) > size:
+        ultimo = lancamentos[-1]
+        next_url = base_url + "&" + urlencode({"cursor": f"{ultimo.data_lancamento.isoformat()}_{ultimo.id}"})
+
+    categorias = (await db.execute(_select_categorias(user.empresa_id))).all()
+
+    # resultado da importação de extrato (redirect de lancamentos_importar)
+    importacao = None
+    if imp_erro or importados is not None:
+        importacao = {
+            "erro": imp_erro,
+            "importados": importados or 0,
+            "duplicados": duplicados or 0,
+            "ignorados": ignorados or 0,
+        }
 
     return templates.TemplateResponse(
         "financeiro/lancamentos.html",
@@ -238,16 +334,21 @@ def lancamentos_listar(
             "title": "Lançamentos",
             "lancamentos": lancamentos,
             "categorias": categorias,
+            "total": total,
+            "next_url": next_url,
+            "first_url": base_url if pos else None,
             "f_status": status or "",
             "f_tipo": tipo or "",
             "f_categoria_id": categoria_id or "",
+            "f_busca": busca,
+            "importacao": importacao,
             **_nav_ctx("lancamentos", f"{y}-{m:02d}"),
         },
     )
 
 
 @router.post("/painel/financeiro/lancamentos/criar")
-def lancamentos_criar(
+async def lancamentos_criar(
     tipo: str = Form(...),
     categoria_id: int | None = Form(None),
     descricao: str = Form(...),
@@ -259,8 +360,8 @@ def lancamentos_criar(
     data_pagamento: str | None = Form(None),
     observacao: str | None = Form(None),
     ym: str | None = Form(None),
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
     tipo = (tipo or "").upper().strip()
     status = (status or "PENDENTE").upper().strip()
@@ -294,116 +395,131 @@ def lancamentos_criar(
         observacao=(observacao or "").strip() or None,
     )
 
-    db.add(lanc)
-    db.commit()
+    async with fila_escrita_async(db):
+        db.add(lanc)
+        await db.run_sync(resumo_fin.registrar_criacao, lanc)
+        await db.commit()
 
     y, m = _parse_ym(ym)
     return _redir(f"/painel/financeiro/lancamentos?ym={y}-{m:02d}")
 
 
+@router.post("/painel/financeiro/lancamentos/importar")
+async def lancamentos_importar(
+    request: Request,
+    arquivo: UploadFile = File(...),
+    ym: str | None = Form(None),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
+):
+    """
+    Extrato bancário (.ofx ou .csv) -> lançamentos PAGOS, gravados em
+    blocos (ver app/services/importacao_extrato.py). Transações que já
+    foram importadas antes são puladas.
+    """
+    y, m = _parse_ym(ym)
+    destino = f"/painel/financeiro/lancamentos?ym={y}-{m:02d}&"
+
+    nome = arquivo.filename or ""
+    if not nome.lower().endswith(EXTENSOES):
+        return _redir(destino + urlencode({"imp_erro": "Envie um extrato .ofx ou .csv."}))
+
+    # leitura e gravação numa thread com sessão própria: um extrato grande
+    # não prende o event loop nem uma conexão async
+    path = await run_in_threadpool(
+        salvar_upload, arquivo.file, settings.IMPORT_UPLOAD_DIR, os.path.splitext(nome)[1].lower()
+    )
+    try:
+        stats = await run_in_threadpool(importar_extrato, path, nome, user.empresa_id)
+    except ExtratoInvalido as e:
+        return _redir(destino + urlencode({"imp_erro": str(e)}))
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    if stats["importados"]:
+        marcar_escrita(request.state)
+
+    return _redir(
+        destino
+        + urlencode(
+            {
+                "importados": stats["importados"],
+                "duplicados": stats["duplicados"],
+                "ignorados": stats["erros_total"],
+            }
+        )
+    )
+
+
 @router.get("/painel/financeiro/lancamentos/excluir/{lanc_id}")
-def lancamentos_excluir(
+async def lancamentos_excluir(
     lanc_id: int,
     ym: str | None = None,
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
-    lanc = (
-        db.query(LancamentoFinanceiro)
-        .filter(LancamentoFinanceiro.id == lanc_id, LancamentoFinanceiro.empresa_id == user.empresa_id)
-        .first()
+    lanc = await db.scalar(
+        select(LancamentoFinanceiro)
+        .where(LancamentoFinanceiro.id == lanc_id, LancamentoFinanceiro.empresa_id == user.empresa_id)
     )
     if lanc:
-        db.delete(lanc)
-        db.commit()
+        async with fila_escrita_async(db):
+            await db.run_sync(resumo_fin.registrar_exclusao, lanc)
+            await db.delete(lanc)
+            await db.commit()
 
     y, m = _parse_ym(ym)
     return _redir(f"/painel/financeiro/lancamentos?ym={y}-{m:02d}")
 
 
 @router.get("/painel/financeiro/lancamentos/marcar-pago/{lanc_id}")
-def lancamentos_marcar_pago(
+async def lancamentos_marcar_pago(
     lanc_id: int,
     ym: str | None = None,
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
-    lanc = (
-        db.query(LancamentoFinanceiro)
-        .filter(LancamentoFinanceiro.id == lanc_id, LancamentoFinanceiro.empresa_id == user.empresa_id)
-        .first()
+    lanc = await db.scalar(
+        select(LancamentoFinanceiro)
+        .where(LancamentoFinanceiro.id == lanc_id, LancamentoFinanceiro.empresa_id == user.empresa_id)
     )
     if lanc:
+        antes = resumo_fin.estado(lanc)
         lanc.status = "PAGO"
         if not lanc.data_pagamento:
             lanc.data_pagamento = date.today()
-        db.commit()
+        async with fila_escrita_async(db):
+            await db.run_sync(resumo_fin.registrar_alteracao, antes, lanc)
+            await db.commit()
 
     y, m = _parse_ym(ym)
     return _redir(f"/painel/financeiro/lancamentos?ym={y}-{m:02d}")
 
 
 @router.get("/painel/financeiro/relatorios", response_class=HTMLResponse)
-def financeiro_relatorios(
+async def financeiro_relatorios(
     request: Request,
     ym: str | None = None,
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
     templates = request.app.state.templates
 
     y, m = _parse_ym(ym)
     start, end = _month_bounds(y, m)
 
-    rows = (
-        db.query(
-            LancamentoFinanceiro.tipo,
-            func.coalesce(func.sum(LancamentoFinanceiro.valor), 0).label("total"),
-        )
-        .filter(
-            LancamentoFinanceiro.empresa_id == user.empresa_id,
-            LancamentoFinanceiro.data_lancamento >= start,
-            LancamentoFinanceiro.data_lancamento <= end,
-        )
-        .group_by(LancamentoFinanceiro.tipo)
-        .all()
-    )
+    versao = await db.run_sync(versao_dados.obter, user.empresa_id)
+    tag = http_cache.etag("relatorios", user.empresa_id, versao.versao, y, m, assinatura(templates))
+    nao_mudou = http_cache.nao_modificado(request, tag, versao.alterado_em)
+    if nao_mudou is not None:
+        return nao_mudou
 
-    receitas = 0.0
-    despesas = 0.0
-    for r in rows:
-        if r.tipo == "RECEITA":
-            receitas = _money(r.total)
-        elif r.tipo == "DESPESA":
-            despesas = _money(r.total)
-
-    resultado = receitas - despesas
-
-    fluxo = (
-        db.query(
-            LancamentoFinanceiro.tipo,
-            func.coalesce(func.sum(LancamentoFinanceiro.valor), 0).label("total"),
-        )
-        .filter(
-            LancamentoFinanceiro.empresa_id == user.empresa_id,
-            LancamentoFinanceiro.status == "PAGO",
-            LancamentoFinanceiro.data_pagamento.isnot(None),
-            LancamentoFinanceiro.data_pagamento >= start,
-            LancamentoFinanceiro.data_pagamento <= end,
-        )
-        .group_by(LancamentoFinanceiro.tipo)
-        .all()
-    )
-
-    caixa_in = 0.0
-    caixa_out = 0.0
-    for f in fluxo:
-        if f.tipo == "RECEITA":
-            caixa_in = _money(f.total)
-        elif f.tipo == "DESPESA":
-            caixa_out = _money(f.total)
-
-    caixa_liquido = caixa_in - caixa_out
+    # DRE (competência) + fluxo de caixa (pagos no mês) em uma consulta
+    totais = await db.run_sync(totais_periodo, user.empresa_id, start, end)
+    # por categoria + série dos últimos meses: uma consulta, em cache até a próxima escrita
+    analise = await db.run_sync(analise_categorias, user.empresa_id, start, versao.versao)
 
     return templates.TemplateResponse(
         "financeiro/relatorios.html",
@@ -411,25 +527,94 @@ def financeiro_relatorios(
             "request": request,
             "title": "Relatórios",
             "periodo_label": f"{m:02d}/{y}",
-            "dre_receitas": receitas,
-            "dre_despesas": despesas,
-            "dre_resultado": resultado,
-            "caixa_in": caixa_in,
-            "caixa_out": caixa_out,
-            "caixa_liquido": caixa_liquido,
+            "dre_receitas": totais.receitas,
+            "dre_despesas": totais.despesas,
+            "dre_resultado": totais.resultado,
+            "caixa_in": totais.caixa_in,
+            "caixa_out": totais.caixa_out,
+            "caixa_liquido": totais.caixa_liquido,
+            "analise": analise,
+            "export_inicio": start.isoformat(),
+            "export_fim": end.isoformat(),
             **_nav_ctx("relatorios", f"{y}-{m:02d}"),
         },
+        headers=http_cache.cabecalhos(tag, versao.alterado_em),
+    )
+
+
+# ============================================================
+# EXPORTAÇÃO (CSV / XLSX em streaming)
+# ============================================================
+def _periodo_exportacao(inicio: date | None, fim: date | None) -> tuple[date, date]:
+    # sem datas: mês atual; datas invertidas são trocadas
+    if inicio is None or fim is None:
+        start, end = _month_bounds(*_parse_ym(None))
+        inicio, fim = inicio or start, fim or end
+    return (inicio, fim) if inicio <= fim else (fim, inicio)
+
+
+def _download(conteudo, formato: str, nome: str, inicio: date, fim: date) -> StreamingResponse:
+    return StreamingResponse(
+        conteudo,
+        media_type=exportacao.MEDIA_TYPES[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="{nome}_{inicio:%Y%m%d}_{fim:%Y%m%d}.{formato}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.get("/painel/financeiro/exportar/lancamentos")
+async def exportar_lancamentos(
+    inicio: date | None = None,
+    fim: date | None = None,
+    formato: Literal["csv", "xlsx"] = "csv",
+    tipo: Literal["RECEITA", "DESPESA"] | None = None,
+    status: Literal["PENDENTE", "PAGO"] | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
+):
+    inicio, fim = _periodo_exportacao(inicio, fim)
+    stmt = exportacao.select_lancamentos(user.empresa_id, inicio, fim, tipo, status)
+
+    # a sessão fica aberta até o último byte (dependência com yield)
+    conteudo = exportacao.stream(
+        formato,
+        "Lançamentos",
+        exportacao.CABECALHO_LANCAMENTOS,
+        exportacao.blocos(db, stmt),
     )
+    return _download(conteudo, formato, "lancamentos", inicio, fim)
+
+
+@router.get("/painel/financeiro/exportar/relatorio")
+async def exportar_relatorio(
+    inicio: date | None = None,
+    fim: date | None = None,
+    formato: Literal["csv", "xlsx"] = "csv",
+    db: AsyncSession = Depends(get_async_read_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
+):
+    inicio, fim = _periodo_exportacao(inicio, fim)
+
+    # DRE + fluxo de caixa mês a mês: uma linha por mês, vem quase toda do resumo
+    meses = await db.run_sync(totais_por_mes, user.empresa_id, inicio, fim)
+
+    async def linhas():
+        yield exportacao.linhas_relatorio(meses)
+
+    conteudo = exportacao.stream(formato, "DRE e Fluxo de Caixa", exportacao.CABECALHO_RELATORIO, linhas())
+    return _download(conteudo, formato, "relatorio", inicio, fim)
 
 
 # ============================================================
 # DADOS DE PAGAMENTO
 # ============================================================
 @router.get("/painel/financeiro/pagamentos", response_class=HTMLResponse)
-def pagamentos_listar(
+async def pagamentos_listar(
     request: Request,
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
     templates = request.app.state.templates
 
@@ -443,11 +628,21 @@ def pagamentos_listar(
         )
 
     pagamentos = (
-        db.query(DadosPagamento)
-        .filter(DadosPagamento.empresa_id == user.empresa_id)
-        .order_by(DadosPagamento.nome.asc())
-        .all()
-    )
+        await db.execute(
+            select(
+                DadosPagamento.nome,
+                DadosPagamento.tipo_servico,
+                DadosPagamento.forma,
+                DadosPagamento.pix_chave,
+                DadosPagamento.banco,
+                DadosPagamento.agencia,
+                DadosPagamento.conta,
+                DadosPagamento.tipo_conta,
+            )
+            .where(DadosPagamento.empresa_id == user.empresa_id)
+            .order_by(DadosPagamento.nome.asc())
+        )
+    ).all()
 
     return templates.TemplateResponse(
         "financeiro/pagamentos.html",
@@ -462,7 +657,7 @@ def pagamentos_listar(
 
 
 @router.post("/painel/financeiro/pagamentos/criar")
-def pagamentos_criar(
+async def pagamentos_criar(
     nome: str = Form(...),
     tipo_servico: str = Form(...),
     forma: str = Form(...),  # PIX | CONTA
@@ -471,8 +666,8 @@ def pagamentos_criar(
     agencia: str | None = Form(None),
     conta: str | None = Form(None),
     tipo_conta: str | None = Form(None),
-    db: Session = Depends(get_db),
-    user: Usuario = Depends(get_current_user_web),
+    db: AsyncSession = Depends(get_async_db),
+    user: UsuarioAutenticado = Depends(get_current_user_web),
 ):
     if DadosPagamento is None:
         return _redir("/painel/financeiro/pagamentos")
@@ -507,7 +702,8 @@ def pagamentos_criar(
         tipo_conta=tcta,
     )
 
-    db.add(pagamento)
-    db.commit()
+    async with fila_escrita_async(db):
+        db.add(pagamento)
+        await db.commit()
 
     return _redir("/painel/financeiro/pagamentos")
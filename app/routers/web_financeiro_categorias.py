@@ -6,6 +6,7 @@ from app.database import get_db
 from app.routers.auth import get_current_user
 from app.models import Usuario
 from app.models.financeiro import CategoriaFinanceira
+from app.services.financeiro_resumo import registrar_exclusao_categoria
 
 # ============================================================
 # IMPORT OPCIONAL (NÃO QUEBRA SE O MODEL AINDA NÃO EXISTIR)
@@ -83,6 +84,7 @@ def excluir_categoria(
     )
 
     if categoria:
+        registrar_exclusao_categoria(db, user.empresa_id, categoria.id)
         db.delete(categoria)
         db.commit()
 
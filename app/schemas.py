@@ -1,5 +1,10 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr
+from datetime import date
+from decimal import Decimal
+from typing import Annotated, List, Literal, Optional, Union
+
+from pydantic import BaseModel, EmailStr, Field
+
+from app.core.config import settings
 
 
 # ==========================
@@ -41,3 +46,115 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     user_id: Optional[int] = None
+
+
+# ==========================
+# Financeiro (API em lote)
+# ==========================
+TipoLancamento = Literal["RECEITA", "DESPESA"]
+StatusLancamento = Literal["PENDENTE", "PAGO"]
+Valor = Annotated[Decimal, Field(ge=0, max_digits=12, decimal_places=2)]
+
+
+class LancamentoCreate(BaseModel):
+    tipo: TipoLancamento
+    categoria_id: Optional[int] = None
+    descricao: str = Field(min_length=1)
+    valor: Valor
+    data_lancamento: date
+    data_vencimento: Optional[date] = None
+    data_pagamento: Optional[date] = None
+    status: StatusLancamento = "PENDENTE"
+    forma_pagamento: Optional[str] = None
+    observacao: Optional[str] = None
+
+
+class LancamentoUpdate(BaseModel):
+    # campo omitido = não altera; nos obrigatórios do lançamento, null é recusado
+    tipo: TipoLancamento = None
+    categoria_id: Optional[int] = None
+    descricao: str = Field(None, min_length=1)
+    valor: Valor = None
+    data_lancamento: date = None
+    data_vencimento: Optional[date] = None
+    data_pagamento: Optional[date] = None
+    status: StatusLancamento = None
+    forma_pagamento: Optional[str] = None
+    observacao: Optional[str] = None
+
+
+class OperacaoCriar(BaseModel):
+    op: Literal["criar"]
+    ref: Optional[str] = None  # identificador do cliente, devolvido no resultado
+    dados: LancamentoCreate
+
+
+class OperacaoAlterar(BaseModel):
+    op: Literal["alterar"]
+    ref: Optional[str] = None
+    id: int
+    dados: LancamentoUpdate
+
+
+class OperacaoMarcarPago(BaseModel):
+    op: Literal["marcar_pago"]
+    ref: Optional[str] = None
+    id: int
+    data_pagamento: Optional[date] = None  # padrão: a que já existe, senão hoje
+
+
+class OperacaoExcluir(BaseModel):
+    op: Literal["excluir"]
+    ref: Optional[str] = None
+    id: int
+
+
+OperacaoLancamento = Annotated[
+    Union[OperacaoCriar, OperacaoAlterar, OperacaoMarcarPago, OperacaoExcluir],
+    Field(discriminator="op"),
+]
+
+
+class LoteLancamentos(BaseModel):
+    operacoes: List[OperacaoLancamento] = Field(min_length=1, max_length=settings.API_LOTE_MAX_OPERACOES)
+    # True: qualquer operação inválida cancela o lote inteiro
+    atomico: bool = False
+
+
+class ResultadoOperacao(BaseModel):
+    indice: int
+    op: str
+    ref: Optional[str] = None
+    ok: bool
+    id: Optional[int] = None
+    erro: Optional[str] = None
+
+
+class ResultadoLote(BaseModel):
+    aplicado: bool
+    sucesso: int
+    falhas: int
+    resultados: List[ResultadoOperacao]
+
+
+# ==========================
+# Projeção de caixa
+# ==========================
+class PontoProjecao(BaseModel):
+    data: date  # dia, ou segunda-feira da semana
+    entradas: Decimal  # receitas pendentes com vencimento no período
+    saidas: Decimal  # despesas pendentes com vencimento no período
+    quantidade: int
+    saldo: Decimal  # saldo previsto ao fim do período
+
+
+class ProjecaoCaixa(BaseModel):
+    granularidade: Literal["dia", "semana"]
+    inicio: date
+    fim: date
+    saldo_atual: Decimal  # lançamentos pagos (receitas - despesas)
+    saldo_final: Decimal
+    menor_saldo: Decimal
+    menor_saldo_em: Optional[date] = None
+    # só períodos com vencimento; pendentes já vencidos entram no primeiro
+    pontos: List[PontoProjecao]
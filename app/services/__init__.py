@@ -0,0 +1,2 @@
+# app/services/__init__.py
+# regras de negócio compartilhadas entre os routers
@@ -0,0 +1,174 @@
+# app/services/financeiro_agregacao.py
+"""
+Totais financeiros de um período (DRE por competência + fluxo de caixa).
+
+Usado por dashboard e relatórios. Uma única ida ao banco por período:
+- período de meses inteiros: soma das linhas de financeiro_resumo_mensal;
+- período arbitrário: uma agregação condicional sobre os lançamentos cuja
+  data_lancamento OU data_pagamento cai no período.
+`totais_por_mes` (exportação do relatório) quebra um intervalo qualquer
+em meses com no máximo três consultas.
+Valores em Decimal (sem passar por float).
+"""
+from __future__ import annotations
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.financeiro import LancamentoFinanceiro, ResumoFinanceiroMensal
+from app.services.financeiro_resumo import ano_mes
+
+ZERO = Decimal("0.00")
+
+
+@dataclass(frozen=True)
+class TotaisPeriodo:
+    receitas: Decimal = ZERO    # competência
+    despesas: Decimal = ZERO    # competência
+    pendentes: Decimal = ZERO   # competência, status PENDENTE
+    caixa_in: Decimal = ZERO    # pagos no período (data_pagamento)
+    caixa_out: Decimal = ZERO   # pagos no período (data_pagamento)
+
+    @property
+    def resultado(self) -> Decimal:
+        return self.receitas - self.despesas
+
+    @property
+    def caixa_liquido(self) -> Decimal:
+        return self.caixa_in - self.caixa_out
+
+
+def _dec(v) -> Decimal:
+    return Decimal(str(v or 0)).quantize(ZERO)
+
+
+def _sum_if(cond, col):
+    return func.coalesce(func.sum(case((cond, col), else_=0)), 0)
+
+
+def _meses_inteiros(inicio: date, fim: date) -> bool:
+    return inicio.day == 1 and fim.day == monthrange(fim.year, fim.month)[1]
+
+
+def totais_lancamentos(db: Session, empresa_id: int, inicio: date, fim: date) -> TotaisPeriodo:
+    """Agregação direta nos lançamentos (qualquer intervalo de datas), em um SELECT."""
+    L = LancamentoFinanceiro
+    na_competencia = and_(L.data_lancamento >= inicio, L.data_lancamento <= fim)
+    no_caixa = and_(L.status == "PAGO", L.data_pagamento >= inicio, L.data_pagamento <= fim)
+
+    r = db.execute(
+        select(
+            _sum_if(and_(na_competencia, L.tipo == "RECEITA"), L.valor).label("receitas"),
+            _sum_if(and_(na_competencia, L.tipo == "DESPESA"), L.valor).label("despesas"),
+            _sum_if(and_(na_competencia, L.status == "PENDENTE"), L.valor).label("pendentes"),
+            _sum_if(and_(no_caixa, L.tipo == "RECEITA"), L.valor).label("caixa_in"),
+            _sum_if(and_(no_caixa, L.tipo == "DESPESA"), L.valor).label("caixa_out"),
+        ).where(
+            L.empresa_id == empresa_id,
+            or_(na_competencia, no_caixa),
+        )
+    ).one()
+
+    return TotaisPeriodo(**{k: _dec(v) for k, v in r._mapping.items()})
+
+
+def totais_resumo(db: Session, empresa_id: int, inicio: date, fim: date) -> TotaisPeriodo:
+    """Soma do resumo mensal para os meses de `inicio` a `fim` (inclusive)."""
+    R = ResumoFinanceiroMensal
+    r = db.execute(
+        select(
+            _sum_if(R.tipo == "RECEITA", R.total_competencia).label("receitas"),
+            _sum_if(R.tipo == "DESPESA", R.total_competencia).label("despesas"),
+            _sum_if(R.status == "PENDENTE", R.total_competencia).label("pendentes"),
+            _sum_if(R.tipo == "RECEITA", R.total_caixa).label("caixa_in"),
+            _sum_if(R.tipo == "DESPESA", R.total_caixa).label("caixa_out"),
+        ).where(
+            R.empresa_id == empresa_id,
+            R.ano_mes >= ano_mes(inicio),
+            R.ano_mes <= ano_mes(fim),
+        )
+    ).one()
+
+    return TotaisPeriodo(**{k: _dec(v) for k, v in r._mapping.items()})
+
+
+def totais_periodo(db: Session, empresa_id: int, inicio: date, fim: date) -> TotaisPeriodo:
+    if _meses_inteiros(inicio, fim):
+        return totais_resumo(db, empresa_id, inicio, fim)
+    return totais_lancamentos(db, empresa_id, inicio, fim)
+
+
+def _totais_por_ano_mes(db: Session, empresa_id: int, inicio: date, fim: date) -> dict[str, TotaisPeriodo]:
+    """Uma consulta: resumo mensal agrupado por mês, de `inicio` a `fim`."""
+    R = ResumoFinanceiroMensal
+    rows = db.execute(
+        select(
+            R.ano_mes,
+            _sum_if(R.tipo == "RECEITA", R.total_competencia).label("receitas"),
+            _sum_if(R.tipo == "DESPESA", R.total_competencia).label("despesas"),
+            _sum_if(R.status == "PENDENTE", R.total_competencia).label("pendentes"),
+            _sum_if(R.tipo == "RECEITA", R.total_caixa).label("caixa_in"),
+            _sum_if(R.tipo == "DESPESA", R.total_caixa).label("caixa_out"),
+        )
+        .where(
+            R.empresa_id == empresa_id,
+            R.ano_mes >= ano_mes(inicio),
+            R.ano_mes <= ano_mes(fim),
+        )
+        .group_by(R.ano_mes)
+    ).all()
+    return {
+        r.ano_mes: TotaisPeriodo(**{k: _dec(v) for k, v in r._mapping.items() if k != "ano_mes"})
+        for r in rows
+    }
+
+
+def totais_por_mes(db: Session, empresa_id: int, inicio: date, fim: date) -> list[tuple[str, TotaisPeriodo]]:
+    """
+    [(ano_mes, totais)] de cada mês entre `inicio` e `fim`, em ordem. O
+    primeiro e o último mês são cortados nas datas pedidas (agregados nos
+    lançamentos); os do meio vêm do resumo, todos em uma consulta.
+    """
+    meses = []
+    d = inicio
+    while d <= fim:
+        ultimo_dia = date(d.year, d.month, monthrange(d.year, d.month)[1])
+        meses.append((d, min(ultimo_dia, fim)))
+        d = ultimo_dia + timedelta(days=1)
+
+    inteiros = [(a, b) for a, b in meses if _meses_inteiros(a, b)]
+    resumo = _totais_por_ano_mes(db, empresa_id, inteiros[0][0], inteiros[-1][1]) if inteiros else {}
+
+    resultado = []
+    for a, b in meses:
+        if _meses_inteiros(a, b):
+            totais = resumo.get(ano_mes(a), TotaisPeriodo())
+        else:
+            totais = totais_lancamentos(db, empresa_id, a, b)
+        resultado.append((ano_mes(a), totais))
+    return resultado
+
+
+def quantidade_mes(
+    db: Session,
+    empresa_id: int,
+    mes: date,
+    tipo: str | None = None,
+    status: str | None = None,
+) -> int:
+    """Nº de lançamentos (competência) do mês, lido do resumo mensal."""
+    R = ResumoFinanceiroMensal
+    q = select(func.coalesce(func.sum(R.qtd_competencia), 0)).where(
+        R.empresa_id == empresa_id,
+        R.ano_mes == ano_mes(mes),
+    )
+    if tipo:
+        q = q.where(R.tipo == tipo)
+    if status:
+        q = q.where(R.status == status)
+    return int(db.scalar(q))
@@ -0,0 +1,195 @@
+# app/services/financeiro_analise.py
+"""
+Análise por categoria (relatórios): total de cada categoria no mês,
+top receitas/despesas e a série dos últimos ANALISE_MESES meses.
+
+Tudo sai de uma consulta agrupada no resumo mensal (que tem a categoria
+na chave, ver financeiro_resumo.py): o custo depende do nº de categorias
+x meses, não do nº de lançamentos. Valores por competência.
+
+O resultado fica em cache por (empresa, mês), junto com a versão dos
+dados da empresa (versao_dados) com que foi calculado: qualquer escrita
+incrementa a versão e a próxima leitura recalcula. Cada worker tem o seu
+cache; como a versão vem do banco, nenhum serve dado antigo.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.financeiro import CategoriaFinanceira, ResumoFinanceiroMensal
+from app.services.financeiro_resumo import ano_mes
+
+ZERO = Decimal("0.00")
+SEM_CATEGORIA = "Sem categoria"
+
+
+@dataclass(frozen=True)
+class TotalCategoria:
+    categoria_id: int  # 0 = sem categoria
+    nome: str
+    tipo: str
+    total: Decimal  # no mês
+    quantidade: int
+    anterior: Decimal  # no mês anterior
+    serie: tuple[Decimal, ...]  # um valor por mês da análise (o último é o mês)
+
+    @property
+    def variacao(self) -> Decimal | None:
+        """% sobre o mês anterior (None sem movimento no mês anterior)."""
+        if not self.anterior:
+            return None
+        return ((self.total - self.anterior) / self.anterior * 100).quantize(Decimal("0.1"))
+
+
+@dataclass(frozen=True)
+class AnaliseCategorias:
+    meses: tuple[str, ...]  # "YYYY-MM", do mais antigo ao mês pedido
+    categorias: tuple[TotalCategoria, ...]  # com movimento no período, maior total do mês primeiro
+    receitas: tuple[Decimal, ...]  # total por mês
+    despesas: tuple[Decimal, ...]
+
+    def top(self, tipo: str, n: int | None = None) -> list[TotalCategoria]:
+        n = settings.ANALISE_TOP_N if n is None else n
+        return [c for c in self.categorias if c.tipo == tipo and c.total > 0][:n]
+
+
+class CacheAnalise:
+    """LRU de (empresa, mês) -> (versão dos dados, análise)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple, tuple[int, AnaliseCategorias]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, versao: int) -> AnaliseCategorias | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] != versao:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: tuple, versao: int, analise: AnaliseCategorias) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            atual = self._data.get(key)
+            if atual is not None and atual[0] > versao:
+                return  # outra requisição já guardou uma versão mais nova
+            self._data[key] = (versao, analise)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "tamanho": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+cache_analise = CacheAnalise(maxsize=settings.ANALISE_CACHE_MAXSIZE)
+
+
+def _meses_ate(mes: date, n: int) -> list[str]:
+    indice = mes.year * 12 + mes.month - 1
+    return [f"{i // 12}-{i % 12 + 1:02d}" for i in range(indice - n + 1, indice + 1)]
+
+
+def calcular(db: Session, empresa_id: int, mes: date) -> AnaliseCategorias:
+    """Uma consulta: resumo dos últimos ANALISE_MESES meses agrupado por mês, tipo e categoria."""
+    meses = _meses_ate(mes, max(settings.ANALISE_MESES, 2))
+    posicao = {ym: i for i, ym in enumerate(meses)}
+    R, C = ResumoFinanceiroMensal, CategoriaFinanceira
+
+    rows = db.execute(
+        select(
+            R.ano_mes,
+            R.tipo,
+            R.categoria_id,
+            C.nome,
+            func.sum(R.total_competencia),
+            func.sum(R.qtd_competencia),
+        )
+        .outerjoin(C, C.id == R.categoria_id)
+        .where(
+            R.empresa_id == empresa_id,
+            R.ano_mes >= meses[0],
+            R.ano_mes <= meses[-1],
+        )
+        .group_by(R.ano_mes, R.tipo, R.categoria_id, C.nome)
+        # linhas só de caixa (pagos no mês, lançados em outro) não entram
+        .having(func.sum(R.qtd_competencia) > 0)
+    ).all()
+
+    # (tipo, categoria_id) -> [nome, série, quantidade no mês]
+    por_categoria: dict[tuple[str, int], list] = {}
+    receitas = [ZERO] * len(meses)
+    despesas = [ZERO] * len(meses)
+    for ym, tipo, categoria_id, nome, total, qtd in rows:
+        i = posicao[ym]
+        total = Decimal(str(total or 0)).quantize(ZERO)
+        if categoria_id == 0:
+            nome = SEM_CATEGORIA
+        item = por_categoria.setdefault(
+            (tipo, categoria_id), [nome, [ZERO] * len(meses), 0]
+        )
+        item[1][i] += total
+        if i == len(meses) - 1:
+            item[2] += int(qtd)
+        if tipo == "RECEITA":
+            receitas[i] += total
+        else:
+            despesas[i] += total
+
+    categorias = [
+        TotalCategoria(
+            categoria_id=categoria_id,
+            nome=nome,
+            tipo=tipo,
+            total=serie[-1],
+            quantidade=qtd,
+            anterior=serie[-2],
+            serie=tuple(serie),
+        )
+        for (tipo, categoria_id), (nome, serie, qtd) in por_categoria.items()
+    ]
+    categorias.sort(key=lambda c: (-c.total, -sum(c.serie), c.nome))
+
+    return AnaliseCategorias(
+        meses=tuple(meses),
+        categorias=tuple(categorias),
+        receitas=tuple(receitas),
+        despesas=tuple(despesas),
+    )
+
+
+def analise_categorias(db: Session, empresa_id: int, mes: date, versao: int) -> AnaliseCategorias:
+    """`calcular` com cache; `versao` é a versão atual dos dados da empresa (versao_dados.obter)."""
+    chave = (empresa_id, ano_mes(mes))
+    analise = cache_analise.get(chave, versao)
+    if analise is None:
+        analise = calcular(db, empresa_id, mes)
+        cache_analise.set(chave, versao, analise)
+    return analise
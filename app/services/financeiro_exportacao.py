@@ -0,0 +1,212 @@
+# app/services/financeiro_exportacao.py
+"""
+Exportação de lançamentos e relatórios em CSV ou XLSX, em streaming.
+
+As linhas vêm do banco em blocos de EXPORT_YIELD_PER (`yield_per`: cursor
+no servidor no PostgreSQL, fetchmany no SQLite), então a memória não
+depende do tamanho do período exportado.
+
+- CSV: cada bloco vira bytes e é enviado na hora; o download começa com
+  o cabeçalho, antes de o banco terminar. Formato do Excel em português:
+  ";" como separador, vírgula decimal, datas dd/mm/aaaa e BOM UTF-8. O
+  CSV de lançamentos pode ser reimportado (ver importacao_extrato.py).
+- XLSX: workbook write-only do openpyxl (cada linha vai para um arquivo
+  temporário em disco, não para a memória), montado em thread e enviado
+  em pedaços depois de fechado (o .xlsx é um zip: só fica pronto no fim).
+"""
+from __future__ import annotations
+
+import csv
+import io
+import tempfile
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, Iterable, Sequence
+
+import anyio
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.financeiro import CategoriaFinanceira, LancamentoFinanceiro
+from app.services.financeiro_agregacao import TotaisPeriodo
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+_PEDACO = 64 * 1024
+_FORMATO_VALOR = "#,##0.00"
+_FORMATO_DATA = "dd/mm/yyyy"
+# célula de texto começando com estes caracteres vira fórmula no Excel
+_INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+CABECALHO_LANCAMENTOS = (
+    "ID",
+    "Data lançamento",
+    "Vencimento",
+    "Pagamento",
+    "Tipo",
+    "Status",
+    "Categoria",
+    "Descrição",
+    "Valor",
+    "Forma de pagamento",
+    "Observação",
+)
+
+CABECALHO_RELATORIO = (
+    "Mês",
+    "Receitas",
+    "Despesas",
+    "Resultado",
+    "Entradas (pagas)",
+    "Saídas (pagas)",
+    "Caixa líquido",
+)
+
+
+def select_lancamentos(
+    empresa_id: int,
+    inicio: date,
+    fim: date,
+    tipo: str | None = None,
+    status: str | None = None,
+):
+    """Lançamentos por competência, na ordem do índice (empresa, data, id)."""
+    L, C = LancamentoFinanceiro, CategoriaFinanceira
+    stmt = (
+        select(
+            L.id,
+            L.data_lancamento,
+            L.data_vencimento,
+            L.data_pagamento,
+            L.tipo,
+            L.status,
+            C.nome,
+            L.descricao,
+            L.valor,
+            L.forma_pagamento,
+            L.observacao,
+        )
+        .outerjoin(C, C.id == L.categoria_id)
+        .where(
+            L.empresa_id == empresa_id,
+            L.data_lancamento >= inicio,
+            L.data_lancamento <= fim,
+        )
+        .order_by(L.data_lancamento, L.id)
+        .execution_options(yield_per=settings.EXPORT_YIELD_PER)
+    )
+    if tipo:
+        stmt = stmt.where(L.tipo == tipo)
+    if status:
+        stmt = stmt.where(L.status == status)
+    return stmt
+
+
+async def blocos(db: AsyncSession, stmt) -> AsyncIterator[Sequence]:
+    """Linhas do SELECT em blocos de EXPORT_YIELD_PER, sem carregar o resultado inteiro."""
+    result = await db.stream(stmt)
+    async for bloco in result.partitions():
+        yield bloco
+
+
+def linhas_relatorio(meses: list[tuple[str, TotaisPeriodo]]) -> list[tuple]:
+    """DRE + fluxo de caixa por mês, mais a linha de total."""
+    linhas = []
+    total = [Decimal("0.00")] * 6
+    for ym, t in meses:
+        valores = (t.receitas, t.despesas, t.resultado, t.caixa_in, t.caixa_out, t.caixa_liquido)
+        total = [a + b for a, b in zip(total, valores)]
+        linhas.append((f"{ym[5:]}/{ym[:4]}", *valores))
+    linhas.append(("Total", *total))
+    return linhas
+
+
+# =========================================================
+# CSV
+# =========================================================
+def _celula_csv(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, Decimal):
+        return f"{v:.2f}".replace(".", ",")
+    if isinstance(v, date):
+        return v.strftime("%d/%m/%Y")
+    v = str(v)
+    if v.startswith(_INICIO_FORMULA):
+        return "'" + v
+    return v
+
+
+async def csv_stream(cabecalho: Sequence[str], linhas: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=";", lineterminator="\r\n")
+
+    # BOM: o Excel só lê o arquivo como UTF-8 (acentos) com ele
+    writer.writerow(cabecalho)
+    yield ("\ufeff" + buf.getvalue()).encode("utf-8")
+
+    async for bloco in linhas:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows([_celula_csv(v) for v in row] for row in bloco)
+        yield buf.getvalue().encode("utf-8")
+
+
+# =========================================================
+# XLSX
+# =========================================================
+class PlanilhaExportacao:
+    """Workbook write-only: `adicionar` grava as linhas em disco; `fechar` devolve o .xlsx."""
+
+    def __init__(self, titulo: str, cabecalho: Sequence[str]):
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(titulo)
+        self._ws.append(list(cabecalho))
+
+    def _celula(self, v):
+        if isinstance(v, Decimal):
+            cell = WriteOnlyCell(self._ws, value=v)
+            cell.number_format = _FORMATO_VALOR
+            return cell
+        if isinstance(v, date):
+            cell = WriteOnlyCell(self._ws, value=v)
+            cell.number_format = _FORMATO_DATA
+            return cell
+        if isinstance(v, str) and v.startswith(_INICIO_FORMULA):
+            return "'" + v
+        return v
+
+    def adicionar(self, linhas: Iterable[Sequence]) -> None:
+        for row in linhas:
+            self._ws.append([self._celula(v) for v in row])
+
+    def fechar(self):
+        arq = tempfile.TemporaryFile()
+        self._wb.save(arq)
+        arq.seek(0)
+        return arq
+
+
+async def xlsx_stream(titulo: str, cabecalho: Sequence[str], linhas: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    planilha = PlanilhaExportacao(titulo, cabecalho)
+    # openpyxl é CPU: fora do event loop, um bloco por vez
+    async for bloco in linhas:
+        await anyio.to_thread.run_sync(planilha.adicionar, bloco)
+    arq = await anyio.to_thread.run_sync(planilha.fechar)
+    try:
+        while pedaco := await anyio.to_thread.run_sync(arq.read, _PEDACO):
+            yield pedaco
+    finally:
+        arq.close()
+
+
+def stream(formato: str, titulo: str, cabecalho: Sequence[str], linhas: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    if formato == "xlsx":
+        return xlsx_stream(titulo, cabecalho, linhas)
+    return csv_stream(cabecalho, linhas)
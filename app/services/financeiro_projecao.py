@@ -0,0 +1,135 @@
+# app/services/financeiro_projecao.py
+"""
+Projeção do saldo de caixa para os próximos meses.
+
+Saldo atual (pagos: receitas - despesas, do resumo mensal) mais os
+lançamentos PENDENTES pelo vencimento, agrupados por dia ou semana, com
+o saldo acumulado calculado no banco (SUM ... OVER, soma corrente) em uma
+única consulta. Pendentes já vencidos contam no primeiro período (ainda
+devem entrar ou sair). Pendentes sem vencimento ficam de fora.
+
+Os lançamentos são agrupados primeiro por data de vencimento, pelo índice
+(empresa_id, status, data_vencimento); a conversão para dia/semana e a
+soma corrente rodam só sobre esses totais diários.
+"""
+from __future__ import annotations
+
+from calendar import monthrange
+from datetime import date
+from decimal import Decimal
+from typing import Literal
+
+from sqlalchemy import Date, case, cast, func, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.models.financeiro import LancamentoFinanceiro, ResumoFinanceiroMensal
+
+ZERO = Decimal("0.00")
+
+Granularidade = Literal["dia", "semana"]
+
+
+def _dec(v) -> Decimal:
+    return Decimal(str(v or 0)).quantize(ZERO)
+
+
+def somar_meses(d: date, meses: int) -> date:
+    ano, mes = divmod(d.month - 1 + meses, 12)
+    ano += d.year
+    mes += 1
+    return date(ano, mes, min(d.day, monthrange(ano, mes)[1]))
+
+
+def _inicio_semana(db: Session, col):
+    """Segunda-feira da semana de `col`."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc("week", col), Date)
+    # SQLite: avança até o domingo (ou fica, se já for) e volta 6 dias
+    return type_coerce(func.date(col, "weekday 0", "-6 days"), Date)
+
+
+def projecao(
+    db: Session,
+    empresa_id: int,
+    hoje: date,
+    meses: int,
+    granularidade: Granularidade = "dia",
+) -> schemas.ProjecaoCaixa:
+    L, R = LancamentoFinanceiro, ResumoFinanceiroMensal
+    fim = somar_meses(hoje, meses)
+
+    saldo_atual = (
+        select(func.coalesce(func.sum(case((R.tipo == "RECEITA", R.total_caixa), else_=-R.total_caixa)), 0))
+        .where(R.empresa_id == empresa_id)
+        .scalar_subquery()
+    )
+
+    # 1) por dia de vencimento (GROUP BY direto na coluna, na ordem do índice)
+    por_dia = (
+        select(
+            L.data_vencimento.label("vencimento"),
+            func.sum(case((L.tipo == "RECEITA", L.valor), else_=0)).label("entradas"),
+            func.sum(case((L.tipo == "DESPESA", L.valor), else_=0)).label("saidas"),
+            func.count().label("quantidade"),
+        )
+        .where(
+            L.empresa_id == empresa_id,
+            L.status == "PENDENTE",
+            L.data_vencimento <= fim,
+        )
+        .group_by(L.data_vencimento)
+        .subquery()
+    )
+
+    # 2) dia -> período (vencidos entram em `hoje`); só sobre as linhas já
+    # agrupadas, e em subconsulta para o GROUP BY / OVER usarem a coluna
+    d = por_dia.c
+    periodo = case((d.vencimento < hoje, hoje), else_=d.vencimento)
+    if granularidade == "semana":
+        periodo = _inicio_semana(db, periodo)
+    por_periodo = select(periodo.label("periodo"), d.entradas, d.saidas, d.quantidade).subquery()
+
+    # 3) totais do período + saldo acumulado (soma corrente)
+    p = por_periodo.c
+    rows = db.execute(
+        select(
+            p.periodo,
+            func.sum(p.entradas),
+            func.sum(p.saidas),
+            func.sum(p.quantidade),
+            saldo_atual + func.sum(func.sum(p.entradas - p.saidas)).over(order_by=p.periodo),
+            saldo_atual,
+        )
+        .group_by(p.periodo)
+        .order_by(p.periodo)
+    ).all()
+
+    if rows:
+        inicial = _dec(rows[0][5])
+    else:
+        inicial = _dec(db.scalar(select(saldo_atual)))
+
+    pontos = [
+        schemas.PontoProjecao(
+            data=r[0], entradas=_dec(r[1]), saidas=_dec(r[2]), quantidade=int(r[3]), saldo=_dec(r[4])
+        )
+        for r in rows
+    ]
+
+    menor = min(pontos, key=lambda pt: pt.saldo, default=None)
+    if menor is None or menor.saldo >= inicial:
+        menor_saldo, menor_saldo_em = inicial, hoje
+    else:
+        menor_saldo, menor_saldo_em = menor.saldo, menor.data
+
+    return schemas.ProjecaoCaixa(
+        granularidade=granularidade,
+        inicio=hoje,
+        fim=fim,
+        saldo_atual=inicial,
+        saldo_final=pontos[-1].saldo if pontos else inicial,
+        menor_saldo=menor_saldo,
+        menor_saldo_em=menor_saldo_em,
+        pontos=pontos,
+    )
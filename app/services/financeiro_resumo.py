@@ -0,0 +1,237 @@
+# app/services/financeiro_resumo.py
+"""
+Resumo mensal (rollup) de lançamentos financeiros.
+
+`financeiro_resumo_mensal` guarda, por (empresa, ano_mes, tipo, status,
+categoria):
+- total/quantidade por competência (data_lancamento no mês);
+- total de caixa (lançamentos PAGOS com data_pagamento no mês).
+Lançamento sem categoria entra com categoria_id 0.
+
+Toda escrita em LancamentoFinanceiro aplica o delta correspondente na
+mesma transação (upsert com incremento), então dashboard e relatórios
+leem poucas linhas por mês (até 4 por categoria usada) em vez de
+agregar os lançamentos. Os registrar_* também incrementam a versão dos
+dados da empresa (app/services/versao_dados.py).
+
+Reconstrução completa (ex.: após carga manual no banco):
+    python -m app.services.financeiro_resumo [--empresa-id ID]
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert, session_scope
+from app.models.financeiro import LancamentoFinanceiro, ResumoFinanceiroMensal
+from app.services import versao_dados
+
+_CHAVE = ["empresa_id", "ano_mes", "tipo", "status", "categoria_id"]
+
+
+class EstadoLancamento(NamedTuple):
+    """Campos do lançamento que afetam o resumo (foto antes/depois de alterar)."""
+
+    empresa_id: int
+    tipo: str
+    status: str
+    valor: Decimal
+    data_lancamento: date | None
+    data_pagamento: date | None
+    categoria_id: int | None
+
+
+def estado(lanc: LancamentoFinanceiro) -> EstadoLancamento:
+    return EstadoLancamento(
+        empresa_id=lanc.empresa_id,
+        tipo=lanc.tipo,
+        status=lanc.status,
+        valor=Decimal(str(lanc.valor or 0)),
+        data_lancamento=lanc.data_lancamento,
+        data_pagamento=lanc.data_pagamento,
+        categoria_id=lanc.categoria_id,
+    )
+
+
+def ano_mes(d: date) -> str:
+    return f"{d.year}-{d.month:02d}"
+
+
+def _acumular(deltas: dict, e: EstadoLancamento, sinal: int) -> None:
+    categoria_id = e.categoria_id or 0
+    if e.data_lancamento:
+        d = deltas[(e.empresa_id, ano_mes(e.data_lancamento), e.tipo, e.status, categoria_id)]
+        d[0] += sinal * e.valor
+        d[1] += sinal
+    if e.status == "PAGO" and e.data_pagamento:
+        d = deltas[(e.empresa_id, ano_mes(e.data_pagamento), e.tipo, "PAGO", categoria_id)]
+        d[2] += sinal * e.valor
+
+
+def _novos_deltas() -> dict:
+    # chave -> [total_competencia, qtd_competencia, total_caixa]
+    return defaultdict(lambda: [Decimal("0"), 0, Decimal("0")])
+
+
+def _gravar(db: Session, deltas: dict) -> None:
+    params = [
+        {
+            "empresa_id": k[0],
+            "ano_mes": k[1],
+            "tipo": k[2],
+            "status": k[3],
+            "categoria_id": k[4],
+            "total_competencia": v[0],
+            "qtd_competencia": v[1],
+            "total_caixa": v[2],
+        }
+        for k, v in deltas.items()
+        if v[0] or v[1] or v[2]
+    ]
+    if not params:
+        return
+
+    ins = dialect_insert(db, ResumoFinanceiroMensal)
+    t = ResumoFinanceiroMensal.__table__
+    stmt = ins.on_conflict_do_update(
+        index_elements=_CHAVE,
+        set_={
+            "total_competencia": t.c.total_competencia + ins.excluded.total_competencia,
+            "qtd_competencia": t.c.qtd_competencia + ins.excluded.qtd_competencia,
+            "total_caixa": t.c.total_caixa + ins.excluded.total_caixa,
+        },
+    )
+    db.execute(stmt, params)
+
+
+def registrar_criacao(db: Session, *lancs: LancamentoFinanceiro) -> None:
+    deltas = _novos_deltas()
+    for lanc in lancs:
+        _acumular(deltas, estado(lanc), +1)
+    _gravar(db, deltas)
+    versao_dados.incrementar(db, *(lanc.empresa_id for lanc in lancs))
+
+
+def registrar_exclusao(db: Session, *lancs: LancamentoFinanceiro) -> None:
+    deltas = _novos_deltas()
+    for lanc in lancs:
+        _acumular(deltas, estado(lanc), -1)
+    _gravar(db, deltas)
+    versao_dados.incrementar(db, *(lanc.empresa_id for lanc in lancs))
+
+
+def registrar_alteracao(db: Session, antes: EstadoLancamento, lanc: LancamentoFinanceiro) -> None:
+    deltas = _novos_deltas()
+    _acumular(deltas, antes, -1)
+    _acumular(deltas, estado(lanc), +1)
+    _gravar(db, deltas)
+    versao_dados.incrementar(db, lanc.empresa_id)
+
+
+def registrar_mudancas(db: Session, antes: list[EstadoLancamento], depois: list[EstadoLancamento]) -> None:
+    """
+    Várias escritas de uma vez (API em lote): sai cada estado de `antes`
+    (alterados/excluídos), entra cada um de `depois` (alterados/criados).
+    Um upsert e um incremento de versão para o lote inteiro.
+    """
+    deltas = _novos_deltas()
+    for e in antes:
+        _acumular(deltas, e, -1)
+    for e in depois:
+        _acumular(deltas, e, +1)
+    _gravar(db, deltas)
+    versao_dados.incrementar(db, *(e.empresa_id for e in (*antes, *depois)))
+
+
+def registrar_exclusao_categoria(db: Session, empresa_id: int, categoria_id: int) -> None:
+    """
+    Antes de excluir a categoria: os lançamentos dela ficam sem categoria
+    e as linhas do resumo passam para categoria_id 0 (somadas às que já
+    existem). Chamar na mesma transação do delete.
+    """
+    L, R = LancamentoFinanceiro, ResumoFinanceiroMensal
+    db.execute(
+        update(L)
+        .where(L.empresa_id == empresa_id, L.categoria_id == categoria_id)
+        .values(categoria_id=None),
+        execution_options={"synchronize_session": False},
+    )
+
+    deltas = _novos_deltas()
+    for r in db.execute(
+        select(R.ano_mes, R.tipo, R.status, R.total_competencia, R.qtd_competencia, R.total_caixa)
+        .where(R.empresa_id == empresa_id, R.categoria_id == categoria_id)
+    ):
+        deltas[(empresa_id, r[0], r[1], r[2], 0)] = [r[3], r[4], r[5]]
+    db.execute(delete(R).where(R.empresa_id == empresa_id, R.categoria_id == categoria_id))
+    _gravar(db, deltas)
+    versao_dados.incrementar(db, empresa_id)
+
+
+# =========================================================
+# RECONSTRUÇÃO
+# =========================================================
+def _expr_ano_mes(db: Session, col):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(col, "YYYY-MM")
+    return func.strftime("%Y-%m", col)
+
+
+def reconstruir(db: Session, empresa_id: int | None = None) -> int:
+    """Recalcula o resumo a partir dos lançamentos. Retorna o nº de linhas gravadas."""
+    L = LancamentoFinanceiro
+    filtro = [L.empresa_id == empresa_id] if empresa_id is not None else []
+
+    apagar = delete(ResumoFinanceiroMensal)
+    if empresa_id is not None:
+        apagar = apagar.where(ResumoFinanceiroMensal.empresa_id == empresa_id)
+    db.execute(apagar)
+
+    deltas = _novos_deltas()
+
+    categoria = func.coalesce(L.categoria_id, 0)
+
+    mes_comp = _expr_ano_mes(db, L.data_lancamento)
+    for r in db.execute(
+        select(
+            L.empresa_id, mes_comp.label("ano_mes"), L.tipo, L.status, categoria, func.sum(L.valor), func.count()
+        )
+        .where(L.data_lancamento.isnot(None), *filtro)
+        .group_by(L.empresa_id, mes_comp, L.tipo, L.status, categoria)
+    ):
+        d = deltas[(r[0], r[1], r[2], r[3], r[4])]
+        d[0] += Decimal(str(r[5] or 0))
+        d[1] += r[6]
+
+    mes_caixa = _expr_ano_mes(db, L.data_pagamento)
+    for r in db.execute(
+        select(L.empresa_id, mes_caixa.label("ano_mes"), L.tipo, categoria, func.sum(L.valor))
+        .where(L.status == "PAGO", L.data_pagamento.isnot(None), *filtro)
+        .group_by(L.empresa_id, mes_caixa, L.tipo, categoria)
+    ):
+        deltas[(r[0], r[1], r[2], "PAGO", r[3])][2] += Decimal(str(r[4] or 0))
+
+    _gravar(db, deltas)
+    # carga manual no banco não passou pelos registrar_*: invalida o cache HTTP
+    empresas = {k[0] for k in deltas}
+    if empresa_id is not None:
+        empresas.add(empresa_id)
+    versao_dados.incrementar(db, *empresas)
+    db.commit()
+    return len(deltas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstrói financeiro_resumo_mensal.")
+    parser.add_argument("--empresa-id", type=int, default=None)
+    args = parser.parse_args()
+
+    with session_scope() as db:
+        n = reconstruir(db, args.empresa_id)
+    print(f"✅ Resumo financeiro reconstruído ({n} linhas).")
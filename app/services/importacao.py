@@ -0,0 +1,269 @@
+# app/services/importacao.py
+"""
+Importação de funcionários autorizados a partir de planilha XLSX, sempre
+na empresa do usuário que enviou o arquivo (linhas de outras empresas são
+rejeitadas).
+
+A planilha é aberta no modo read-only do openpyxl e lida em blocos de
+tamanho fixo, então a memória usada depende do tamanho do bloco e não do
+tamanho do arquivo.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import zipfile
+from itertools import islice
+from typing import Any, BinaryIO, Iterator
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models import Empresa, FuncionarioAutorizado
+
+COLUNAS_OBRIGATORIAS = ["empresa_nome", "funcionario_nome", "funcionario_cpf"]
+
+_COPY_BUFFER = 1024 * 1024  # 1 MB
+
+
+class PlanilhaInvalida(ValueError):
+    """Arquivo ilegível ou sem as colunas obrigatórias."""
+
+
+def _norm(s: Any) -> str:
+    return str(s or "").strip()
+
+
+def _cpf_digits(cpf: str) -> str:
+    # remove tudo que não é número
+    return "".join(ch for ch in cpf if ch.isdigit())
+
+
+def salvar_upload(fileobj: BinaryIO, diretorio: str, suffix: str = ".xlsx") -> str:
+    """Copia o upload para um arquivo em `diretorio` (em blocos) e retorna o caminho."""
+    os.makedirs(diretorio, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="ds_import_", suffix=suffix, dir=diretorio)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(fileobj, out, _COPY_BUFFER)
+    return path
+
+
+class PlanilhaImportacao:
+    """
+    Planilha aberta em modo streaming.
+
+    Uso:
+        with PlanilhaImportacao(path) as planilha:
+            for bloco in planilha.blocos(1000):
+                ...
+    """
+
+    def __init__(self, path: str):
+        try:
+            self._wb = load_workbook(path, read_only=True, data_only=True)
+        except (InvalidFileException, zipfile.BadZipFile, KeyError, OSError):
+            raise PlanilhaInvalida("Arquivo .xlsx inválido ou corrompido.")
+
+        self._ws = self._wb.active
+        primeira = next(self._ws.iter_rows(min_row=1, max_row=1, values_only=True), None)
+        headers = [_norm(c).lower() for c in (primeira or ())]
+
+        missing = [h for h in COLUNAS_OBRIGATORIAS if h not in headers]
+        if missing:
+            self.close()
+            raise PlanilhaInvalida(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+
+        self.idx = {h: i for i, h in reversed(list(enumerate(headers))) if h}
+
+    def __enter__(self) -> "PlanilhaImportacao":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # no modo read-only o openpyxl mantém o arquivo aberto até o close()
+        self._wb.close()
+
+    def blocos(self, chunk_size: int, min_row: int = 2) -> Iterator[list[tuple[int, tuple]]]:
+        """Gera listas de (numero_da_linha, valores) com até `chunk_size` linhas."""
+        rows = enumerate(self._ws.iter_rows(min_row=min_row, values_only=True), start=min_row)
+        while True:
+            bloco = list(islice(rows, chunk_size))
+            if not bloco:
+                return
+            yield bloco
+
+    def linha(self, row: tuple) -> dict:
+        def col(nome: str) -> str:
+            i = self.idx.get(nome)
+            if i is None or i >= len(row):
+                return ""
+            return _norm(row[i])
+
+        ativo_raw = col("ativo") or "true"
+        return {
+            "empresa_nome": col("empresa_nome"),
+            "empresa_cnpj": col("empresa_cnpj"),
+            "funcionario_nome": col("funcionario_nome"),
+            "funcionario_cpf": _cpf_digits(col("funcionario_cpf")),
+            "funcionario_email": col("funcionario_email"),
+            "ativo": ativo_raw.lower() not in ("0", "false", "nao", "não", "n", "inativo"),
+        }
+
+
+def novas_stats() -> dict:
+    return {
+        "empresas_criadas": 0,
+        "empresas_atualizadas": 0,
+        "funcionarios_criados": 0,
+        "funcionarios_atualizados": 0,
+        "erros": [],
+    }
+
+
+def _atualizar_empresa(db: Session, empresa, linhas: list[dict], stats: dict) -> None:
+    """CNPJ da empresa do job: o último não vazio do bloco, se mudou."""
+    cnpj = next((d["empresa_cnpj"] for d in reversed(linhas) if d["empresa_cnpj"]), "")
+    if cnpj and empresa.cnpj != cnpj:
+        db.execute(update(Empresa).where(Empresa.id == empresa.id).values(cnpj=cnpj))
+        stats["empresas_atualizadas"] += 1
+
+
+def _upsert_funcionarios(db: Session, linhas: list[dict], empresa_id: int, stats: dict) -> None:
+    """Upsert de FuncionarioAutorizado por (empresa_id + cpf) para todo o bloco."""
+    cpfs = {dados["funcionario_cpf"] for dados in linhas}
+    existentes = db.execute(
+        select(
+            FuncionarioAutorizado.id,
+            FuncionarioAutorizado.empresa_id,
+            FuncionarioAutorizado.cpf,
+            FuncionarioAutorizado.nome,
+            FuncionarioAutorizado.email,
+            FuncionarioAutorizado.ativo,
+        )
+        .where(
+            FuncionarioAutorizado.empresa_id == empresa_id,
+            FuncionarioAutorizado.cpf.in_(cpfs),
+        )
+    ).all()
+
+    # estado atual por (empresa_id, cpf) (único, ver a migration 0010)
+    atuais = {(f.empresa_id, f.cpf): f._asdict() for f in existentes}
+
+    inserts: dict[tuple[int, str], dict] = {}
+    updates: dict[int, dict] = {}
+
+    for dados in linhas:
+        key = (empresa_id, dados["funcionario_cpf"])
+        func_email = dados["funcionario_email"]
+
+        if key in inserts:
+            # CPF repetido na planilha: a última linha prevalece
+            novo = inserts[key]
+            novo["nome"] = dados["funcionario_nome"]
+            novo["email"] = func_email or novo["email"]
+            novo["ativo"] = dados["ativo"]
+            continue
+
+        atual = atuais.get(key)
+        if atual is None:
+            inserts[key] = {
+                "nome": dados["funcionario_nome"],
+                "cpf": dados["funcionario_cpf"],
+                "email": func_email or None,
+                "ativo": dados["ativo"],
+                "empresa_id": empresa_id,
+            }
+            continue
+
+        changed = False
+        if atual["nome"] != dados["funcionario_nome"]:
+            atual["nome"] = dados["funcionario_nome"]
+            changed = True
+        if func_email and atual["email"] != func_email:
+            atual["email"] = func_email
+            changed = True
+        if atual["ativo"] != dados["ativo"]:
+            atual["ativo"] = dados["ativo"]
+            changed = True
+        if changed:
+            updates[atual["id"]] = {k: atual[k] for k in ("id", "nome", "email", "ativo")}
+            stats["funcionarios_atualizados"] += 1
+
+    # executemany: o SQLAlchemy agrupa em lotes (insertmanyvalues / UPDATE por PK)
+    if inserts:
+        F = FuncionarioAutorizado
+        # ON CONFLICT (empresa_id, cpf) DO NOTHING: outra importação pode ter
+        # criado o funcionário depois da leitura acima; esses viram update
+        criados = {
+            (r.empresa_id, r.cpf)
+            for r in db.execute(
+                dialect_insert(db, F)
+                .on_conflict_do_nothing(index_elements=["empresa_id", "cpf"])
+                .returning(F.empresa_id, F.cpf),
+                list(inserts.values()),
+            )
+        }
+        stats["funcionarios_criados"] += len(criados)
+
+        concorrentes = [
+            {"b_empresa_id": k[0], "b_cpf": k[1], "b_nome": v["nome"], "b_email": v["email"], "b_ativo": v["ativo"]}
+            for k, v in inserts.items()
+            if k not in criados
+        ]
+        if concorrentes:
+            # UPDATE do Core (executemany por empresa_id + cpf, não por PK)
+            t = F.__table__
+            db.execute(
+                update(t)
+                .where(t.c.empresa_id == bindparam("b_empresa_id"), t.c.cpf == bindparam("b_cpf"))
+                .values(
+                    nome=bindparam("b_nome"),
+                    email=func.coalesce(bindparam("b_email"), t.c.email),
+                    ativo=bindparam("b_ativo"),
+                ),
+                concorrentes,
+            )
+            stats["funcionarios_atualizados"] += len(concorrentes)
+    if updates:
+        db.execute(update(FuncionarioAutorizado), list(updates.values()))
+
+
+def processar_bloco(
+    db: Session,
+    planilha: PlanilhaImportacao,
+    bloco: list[tuple[int, tuple]],
+    stats: dict,
+    empresa_id: int,
+) -> None:
+    """
+    Processa o bloco inteiro com um número fixo de queries (não uma por linha).
+
+    Só grava na empresa do job (a do usuário que enviou a planilha): linha
+    com outra empresa_nome vira erro; nenhuma empresa é criada ou alterada
+    além do CNPJ da própria.
+    """
+    empresa = db.execute(select(Empresa.id, Empresa.nome, Empresa.cnpj).where(Empresa.id == empresa_id)).one()
+    linhas: list[dict] = []
+    for row_i, row in bloco:
+        dados = planilha.linha(row)
+        if not dados["empresa_nome"] or not dados["funcionario_nome"] or not dados["funcionario_cpf"]:
+            stats["erros"].append(f"Linha {row_i}: empresa_nome/funcionario_nome/funcionario_cpf são obrigatórios.")
+            continue
+        if dados["empresa_nome"].casefold() != empresa.nome.casefold():
+            stats["erros"].append(
+                f"Linha {row_i}: empresa \"{dados['empresa_nome']}\" não é a sua empresa ({empresa.nome})."
+            )
+            continue
+        linhas.append(dados)
+
+    if not linhas:
+        return
+
+    _atualizar_empresa(db, empresa, linhas, stats)
+    _upsert_funcionarios(db, linhas, empresa.id, stats)
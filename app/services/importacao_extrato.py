@@ -0,0 +1,433 @@
+# app/services/importacao_extrato.py
+"""
+Importação de extratos bancários (OFX ou CSV) como lançamentos financeiros.
+
+- O arquivo é lido em streaming (CSV linha a linha, OFX tag a tag) e
+  gravado em blocos de IMPORT_CHUNK_SIZE transações: um INSERT em lote
+  (executemany) por bloco, com o resumo mensal e a versão dos dados na
+  mesma transação. Memória limitada pelo bloco, não pelo arquivo.
+- Transação de extrato já está liquidada: status PAGO, data_lancamento e
+  data_pagamento = data do extrato.
+- Tipo: coluna `tipo` do CSV (C/D, crédito/débito, receita/despesa), senão
+  o sinal do valor (negativo = DESPESA). O valor é gravado positivo.
+- Categoria (regras por empresa, ver RegrasCategoria): coluna `categoria`
+  do CSV, senão a categoria do mesmo tipo cujo nome aparece na descrição.
+- Deduplicação: cada transação vira um hash (OFX: conta + FITID; CSV:
+  data + valor + descrição + nº da ocorrência no arquivo), com índice
+  único por empresa. O INSERT ... ON CONFLICT DO NOTHING pula o que já foi
+  importado: reenviar o extrato, ou um período sobreposto, não duplica.
+  Lançamentos digitados no painel não têm hash e não entram na comparação.
+
+CSV: cabeçalho na 1ª linha com data, descricao (ou historico) e valor;
+tipo e categoria opcionais. Separador ";" ou ",", UTF-8 ou Windows-1252.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import hashlib
+import html
+import os
+import re
+import unicodedata
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Iterator, NamedTuple, TextIO
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import dialect_insert, fila_escrita, session_scope
+from app.models.financeiro import CategoriaFinanceira, LancamentoFinanceiro
+from app.services import financeiro_resumo as resumo_fin
+
+EXTENSOES = (".ofx", ".qfx", ".csv")
+
+_AMOSTRA = 64 * 1024
+_FORMATOS_DATA = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d/%m/%y")
+
+_COLUNAS_CSV = {
+    "data": ("data", "data lancamento", "data movimento", "date"),
+    "descricao": ("descricao", "historico", "memo", "description"),
+    "valor": ("valor", "valor (r$)", "amount"),
+    "tipo": ("tipo", "natureza", "d/c"),
+    "categoria": ("categoria",),
+}
+_OBRIGATORIAS_CSV = ("data", "descricao", "valor")
+
+_TIPOS = {
+    "c": "RECEITA", "credito": "RECEITA", "credit": "RECEITA", "receita": "RECEITA",
+    "d": "DESPESA", "debito": "DESPESA", "debit": "DESPESA", "despesa": "DESPESA",
+}
+
+
+class ExtratoInvalido(ValueError):
+    """Arquivo ilegível, formato não suportado ou sem as colunas obrigatórias."""
+
+
+class Transacao(NamedTuple):
+    linha: int  # linha do CSV / nº da transação no OFX (para as mensagens de erro)
+    data: date
+    descricao: str
+    valor: Decimal  # com sinal: negativo = saída
+    tipo: str | None  # quando o arquivo informa
+    categoria: str | None  # nome, quando o arquivo informa
+    id_banco: str | None  # OFX: conta + FITID
+
+
+def _chave(s: str) -> str:
+    """Minúsculas, sem acento e sem espaços repetidos (comparação de nomes)."""
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return " ".join(s.lower().split())
+
+
+def _data(s: str) -> date:
+    s = s.strip()
+    # caminho rápido para os dois formatos comuns (strptime custa ~25 µs por linha)
+    try:
+        if len(s) == 10 and s[2] == "/" and s[5] == "/":
+            return date(int(s[6:]), int(s[3:5]), int(s[:2]))
+        if len(s) == 10 and s[4] == "-" and s[7] == "-":
+            return date.fromisoformat(s)
+    except ValueError:
+        pass
+    for fmt in _FORMATOS_DATA:
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida ({s!r})")
+
+
+def _valor(s: str) -> Decimal:
+    bruto = s
+    s = s.strip().replace("R$", "").replace(" ", "")
+    if "," in s:
+        # formato brasileiro: 1.234,56
+        s = s.replace(".", "").replace(",", ".")
+    try:
+        v = Decimal(s)
+    except InvalidOperation:
+        raise ValueError(f"valor inválido ({bruto!r})")
+    if not v.is_finite():
+        raise ValueError(f"valor inválido ({bruto!r})")
+    return v.quantize(Decimal("0.01"))
+
+
+def _abrir_texto(path: str) -> TextIO:
+    """UTF-8 (com ou sem BOM) se o começo do arquivo for UTF-8 válido, senão Windows-1252."""
+    with open(path, "rb") as f:
+        amostra = f.read(_AMOSTRA)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        encoding = "cp1252"
+    return open(path, encoding=encoding, errors="replace", newline="")
+
+
+class ExtratoCSV:
+    def __init__(self, path: str):
+        try:
+            self._f = _abrir_texto(path)
+        except OSError:
+            raise ExtratoInvalido("Arquivo .csv ilegível.")
+
+        cabecalho = self._f.readline()
+        delimitador = ";" if cabecalho.count(";") >= cabecalho.count(",") else ","
+        headers = [_chave(h) for h in next(csv.reader([cabecalho], delimiter=delimitador), [])]
+
+        self.idx: dict[str, int] = {}
+        for campo, nomes in _COLUNAS_CSV.items():
+            i = next((i for i, h in enumerate(headers) if h in nomes), None)
+            if i is not None:
+                self.idx[campo] = i
+
+        missing = [c for c in _OBRIGATORIAS_CSV if c not in self.idx]
+        if missing:
+            self.close()
+            raise ExtratoInvalido(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+
+        self._reader = csv.reader(self._f, delimiter=delimitador)
+
+    def __enter__(self) -> "ExtratoCSV":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def transacoes(self) -> Iterator[Transacao | str]:
+        """Gera as transações do arquivo; linha inválida vira uma mensagem de erro (str)."""
+        for row in self._reader:
+            n = self._reader.line_num + 1  # + cabeçalho
+            if not any(c.strip() for c in row):
+                continue
+
+            def col(nome: str) -> str:
+                i = self.idx.get(nome)
+                if i is None or i >= len(row):
+                    return ""
+                return row[i].strip()
+
+            descricao = col("descricao")
+            if not descricao:
+                yield f"Linha {n}: descrição vazia."
+                continue
+            try:
+                yield Transacao(
+                    linha=n,
+                    data=_data(col("data")),
+                    descricao=descricao,
+                    valor=_valor(col("valor")),
+                    tipo=_TIPOS.get(_chave(col("tipo"))),
+                    categoria=col("categoria") or None,
+                    id_banco=None,
+                )
+            except ValueError as e:
+                yield f"Linha {n}: {e}."
+
+
+# tag OFX: <TAG>valor ou </TAG> (OFX 1.x é SGML, sem fechar as tags de valor)
+_TAG_OFX = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def _tags_ofx(f: TextIO) -> Iterator[tuple[bool, str, str]]:
+    """(fechando, TAG, valor) lidos em pedaços de _AMOSTRA caracteres."""
+    resto = ""
+    while True:
+        pedaco = f.read(_AMOSTRA)
+        buf = resto + pedaco
+        if pedaco:
+            # a última tag do pedaço pode estar incompleta: fica para o próximo
+            fim = buf.rfind("<")
+            if fim <= 0:
+                resto = buf
+                continue
+        else:
+            fim = len(buf)
+        for m in _TAG_OFX.finditer(buf, 0, fim):
+            yield m.group(1) == "/", m.group(2).upper(), m.group(3).strip()
+        if not pedaco:
+            return
+        resto = buf[fim:]
+
+
+class ExtratoOFX:
+    def __init__(self, path: str):
+        try:
+            self._f = _abrir_texto(path)
+            inicio = self._f.read(_AMOSTRA)
+            self._f.seek(0)
+        except OSError:
+            raise ExtratoInvalido("Arquivo .ofx ilegível.")
+        if "OFX" not in inicio.upper():
+            self.close()
+            raise ExtratoInvalido("Arquivo .ofx inválido (cabeçalho OFX não encontrado).")
+
+    def __enter__(self) -> "ExtratoOFX":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._f.close()
+
+    @staticmethod
+    def _transacao(n: int, conta: str, campos: dict) -> Transacao | str:
+        try:
+            data = datetime.strptime(campos.get("DTPOSTED", "")[:8], "%Y%m%d").date()
+            valor = _valor(campos.get("TRNAMT", ""))
+        except ValueError:
+            return f"Transação {n}: DTPOSTED/TRNAMT ausente ou inválido."
+        descricao = html.unescape(campos.get("MEMO") or campos.get("NAME") or "")
+        if not descricao:
+            return f"Transação {n}: sem MEMO/NAME."
+        fitid = campos.get("FITID")
+        return Transacao(
+            linha=n,
+            data=data,
+            descricao=descricao,
+            valor=valor,
+            tipo=None,  # o sinal de TRNAMT já diz (TRNTYPE tem PAYMENT, XFER, ...)
+            categoria=None,
+            id_banco=f"{conta}:{fitid}" if fitid else None,
+        )
+
+    def transacoes(self) -> Iterator[Transacao | str]:
+        conta = ""
+        campos: dict | None = None
+        n = 0
+        for fechando, tag, valor in _tags_ofx(self._f):
+            if tag == "STMTTRN":
+                if campos is not None:
+                    n += 1
+                    yield self._transacao(n, conta, campos)
+                campos = None if fechando else {}
+            elif tag == "ACCTID" and not fechando:
+                conta = valor
+            elif campos is not None and not fechando and valor:
+                campos[tag] = valor
+        if campos is not None:
+            n += 1
+            yield self._transacao(n, conta, campos)
+
+
+def abrir_extrato(path: str, nome_arquivo: str) -> ExtratoCSV | ExtratoOFX:
+    ext = os.path.splitext(nome_arquivo.lower())[1]
+    if ext == ".csv":
+        return ExtratoCSV(path)
+    if ext in (".ofx", ".qfx"):
+        return ExtratoOFX(path)
+    raise ExtratoInvalido("Envie um extrato .ofx ou .csv.")
+
+
+class RegrasCategoria:
+    """
+    Categoria de cada transação, a partir das categorias da empresa:
+    1. coluna `categoria` do CSV igual ao nome de uma categoria do mesmo tipo;
+    2. nome de uma categoria do mesmo tipo contido na descrição, como
+       palavra inteira ("Aluguel" casa "PAG ALUGUEL SALA 2"); havendo mais
+       de uma, a que aparece primeiro, e no mesmo ponto a de nome mais longo.
+    Comparação sem acento e sem diferenciar maiúsculas.
+    """
+
+    def __init__(self, categorias):
+        self._por_nome: dict[tuple[str, str], int] = {}
+        por_tipo: dict[str, dict[str, int]] = {}
+        for c in categorias:
+            nome = _chave(c.nome or "")
+            if not nome:
+                continue
+            self._por_nome.setdefault((c.tipo, nome), c.id)
+            por_tipo.setdefault(c.tipo, {}).setdefault(nome, c.id)
+
+        # uma regex por tipo: uma busca por transação, qualquer que seja o nº de categorias
+        self._busca = {
+            tipo: (
+                re.compile(
+                    r"(?<!\w)(" + "|".join(re.escape(n) for n in sorted(nomes, key=len, reverse=True)) + r")(?!\w)"
+                ),
+                nomes,
+            )
+            for tipo, nomes in por_tipo.items()
+        }
+
+    def categoria_id(self, tipo: str, descricao: str, categoria: str | None = None) -> int | None:
+        """`descricao` já normalizada (_chave)."""
+        if categoria:
+            cid = self._por_nome.get((tipo, _chave(categoria)))
+            if cid is not None:
+                return cid
+        busca = self._busca.get(tipo)
+        if busca is None:
+            return None
+        regex, nomes = busca
+        m = regex.search(descricao)
+        return nomes[m.group(1)] if m else None
+
+
+def hash_transacao(t: Transacao, descricao: str, ocorrencia: int = 1) -> str:
+    """`descricao` já normalizada (_chave)."""
+    if t.id_banco:
+        base = f"ofx|{t.id_banco}"
+    else:
+        # a mesma compra duas vezes no dia é legítima: a ocorrência diferencia
+        base = f"{t.data.isoformat()}|{t.valor}|{descricao}|{ocorrencia}"
+    return hashlib.blake2b(base.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def novas_stats() -> dict:
+    return {"linhas": 0, "importados": 0, "duplicados": 0, "erros": [], "erros_total": 0}
+
+
+def _gravar_bloco(
+    db: Session,
+    empresa_id: int,
+    regras: RegrasCategoria,
+    bloco: list[Transacao],
+    ocorrencias: Counter,
+    stats: dict,
+) -> None:
+    params = []
+    for t in bloco:
+        tipo = t.tipo or ("DESPESA" if t.valor < 0 else "RECEITA")
+        descricao = _chave(t.descricao)
+        chave = (t.data, t.valor, descricao)
+        ocorrencias[chave] += 1
+        params.append(
+            {
+                "empresa_id": empresa_id,
+                "tipo": tipo,
+                "categoria_id": regras.categoria_id(tipo, descricao, t.categoria),
+                "descricao": t.descricao,
+                "valor": abs(t.valor),
+                "data_lancamento": t.data,
+                "data_pagamento": t.data,
+                "status": "PAGO",
+                "hash_importacao": hash_transacao(t, descricao, ocorrencias[chave]),
+            }
+        )
+
+    # INSERT do Core (pela Table, não pela entidade): o ORM, com ON CONFLICT
+    # + RETURNING, recompila e executa em lotes pequenos; aqui é um
+    # executemany agrupado em INSERTs de várias linhas (insertmanyvalues)
+    t = LancamentoFinanceiro.__table__
+    stmt = (
+        dialect_insert(db, t)
+        .on_conflict_do_nothing(index_elements=["empresa_id", "hash_importacao"])
+        # só as linhas realmente inseridas voltam, com os campos que o resumo usa
+        .returning(
+            t.c.empresa_id, t.c.tipo, t.c.status, t.c.valor, t.c.data_lancamento, t.c.data_pagamento, t.c.categoria_id
+        )
+    )
+    with fila_escrita(db):
+        criados = db.execute(stmt, params).all()
+        if criados:
+            resumo_fin.registrar_criacao(db, *criados)
+        db.commit()
+
+    stats["importados"] += len(criados)
+    stats["duplicados"] += len(params) - len(criados)
+
+
+def importar_extrato(path: str, nome_arquivo: str, empresa_id: int) -> dict:
+    """
+    Importa o extrato inteiro (roda em thread, com sessão própria). Cada
+    bloco é commitado: se falhar no meio, reenviar o arquivo completa o
+    que faltou sem duplicar o que já entrou.
+    """
+    stats = novas_stats()
+    ocorrencias: Counter = Counter()
+    C = CategoriaFinanceira
+
+    with abrir_extrato(path, nome_arquivo) as extrato, session_scope() as db:
+        regras = RegrasCategoria(
+            db.execute(select(C.id, C.nome, C.tipo).where(C.empresa_id == empresa_id)).all()
+        )
+
+        itens = extrato.transacoes()
+        while True:
+            lote = list(islice(itens, settings.IMPORT_CHUNK_SIZE))
+            if not lote:
+                break
+            stats["linhas"] += len(lote)
+
+            bloco = []
+            for item in lote:
+                if isinstance(item, str):
+                    if len(stats["erros"]) < settings.IMPORT_MAX_ERROS:
+                        stats["erros"].append(item)
+                    stats["erros_total"] += 1
+                else:
+                    bloco.append(item)
+            if bloco:
+                _gravar_bloco(db, empresa_id, regras, bloco, ocorrencias, stats)
+
+    return stats
@@ -0,0 +1,227 @@
+# app/services/importacao_jobs.py
+"""
+Fila de importação em background (sem broker externo).
+
+- O upload vira uma linha em `importacao_jobs` e o arquivo fica em
+  IMPORT_UPLOAD_DIR; a requisição HTTP retorna logo com o id do job.
+- Um pool de threads do próprio processo executa os jobs.
+- Cada bloco de linhas é commitado junto com o progresso do job, então um
+  job interrompido (restart do worker) continua do último bloco gravado.
+- A posse do job é um "lease": quem processa atualiza `heartbeat_em` a cada
+  bloco; job PROCESSANDO sem heartbeat há IMPORT_JOB_LEASE_SECONDS é
+  considerado abandonado e pode ser retomado por qualquer worker.
+- Cada vez que um worker assume o job conta uma tentativa; passando de
+  IMPORT_JOB_MAX_TENTATIVAS (arquivo que derruba o processamento sempre)
+  o job termina em ERRO em vez de ser retomado para sempre.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import fila_escrita, session_scope
+from app.models.importacao import ImportacaoJob
+from app.services.importacao import PlanilhaImportacao, PlanilhaInvalida, novas_stats, processar_bloco
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMPORT_WORKERS,
+    thread_name_prefix="importacao",
+)
+
+_CONTADORES = (
+    "empresas_criadas",
+    "empresas_atualizadas",
+    "funcionarios_criados",
+    "funcionarios_atualizados",
+)
+
+
+def criar_job(db: Session, empresa_id: int, arquivo_nome: str, arquivo_path: str) -> ImportacaoJob:
+    job = ImportacaoJob(
+        empresa_id=empresa_id,
+        arquivo_nome=arquivo_nome,
+        arquivo_path=arquivo_path,
+        status="PENDENTE",
+    )
+    with fila_escrita(db):
+        db.add(job)
+        db.commit()
+    return job
+
+
+def enfileirar(job_id: int) -> None:
+    _executor.submit(executar_job, job_id)
+
+
+def job_abandonado(job: ImportacaoJob) -> bool:
+    if job.status != "PROCESSANDO" or job.heartbeat_em is None:
+        return False
+    return job.heartbeat_em < datetime.utcnow() - timedelta(seconds=settings.IMPORT_JOB_LEASE_SECONDS)
+
+
+def progresso(job: ImportacaoJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "arquivo": job.arquivo_nome,
+        "linhas_processadas": job.linhas_processadas,
+        **{c: getattr(job, c) for c in _CONTADORES},
+        "erros": json.loads(job.erros or "[]"),
+        "erros_total": job.erros_total,
+        "mensagem": job.mensagem,
+        "tentativas": job.tentativas,
+        "criado_em": job.criado_em.isoformat() if job.criado_em else None,
+        "concluido_em": job.concluido_em.isoformat() if job.concluido_em else None,
+    }
+
+
+def _assumir_job(db: Session, job_id: int) -> bool:
+    """UPDATE condicional: só um worker consegue assumir o job."""
+    agora = datetime.utcnow()
+    limite = agora - timedelta(seconds=settings.IMPORT_JOB_LEASE_SECONDS)
+    with fila_escrita(db):
+        res = db.execute(
+            update(ImportacaoJob)
+            .where(
+                ImportacaoJob.id == job_id,
+                or_(
+                    ImportacaoJob.status == "PENDENTE",
+                    and_(ImportacaoJob.status == "PROCESSANDO", ImportacaoJob.heartbeat_em < limite),
+                ),
+            )
+            .values(status="PROCESSANDO", heartbeat_em=agora, tentativas=ImportacaoJob.tentativas + 1)
+        )
+        db.commit()
+    return res.rowcount == 1
+
+
+def _registrar_bloco(job: ImportacaoJob, ultima_linha: int, qtd_linhas: int, stats: dict) -> None:
+    job.ultima_linha = ultima_linha
+    job.linhas_processadas += qtd_linhas
+    for c in _CONTADORES:
+        setattr(job, c, getattr(job, c) + stats[c])
+
+    if stats["erros"]:
+        erros = json.loads(job.erros or "[]")
+        espaco = max(settings.IMPORT_MAX_ERROS - len(erros), 0)
+        erros.extend(stats["erros"][:espaco])
+        job.erros = json.dumps(erros, ensure_ascii=False)
+        job.erros_total += len(stats["erros"])
+
+    job.heartbeat_em = datetime.utcnow()
+
+
+def _finalizar(db: Session, job: ImportacaoJob, status: str, mensagem: str | None = None) -> None:
+    job.status = status
+    job.mensagem = mensagem
+    job.concluido_em = datetime.utcnow()
+    with fila_escrita(db):
+        db.commit()
+
+    try:
+        os.remove(job.arquivo_path)
+    except OSError:
+        pass
+
+
+def _liberar_identity_map(db: Session, manter: ImportacaoJob) -> None:
+    """Solta do identity map tudo o que o bloco carregou (só o job fica)."""
+    for obj in list(db.identity_map.values()):
+        if obj is not manter:
+            db.expunge(obj)
+
+
+def executar_job(job_id: int) -> None:
+    """
+    Processa (ou retoma) um job. Roda nas threads do pool, nunca no event loop.
+
+    Cada job usa a sua própria sessão/conexão do pool, então importações
+    simultâneas rodam em paralelo (até IMPORT_WORKERS).
+    """
+    with session_scope() as db:
+        job = None
+        try:
+            if not _assumir_job(db, job_id):
+                return
+
+            job = db.get(ImportacaoJob, job_id)
+            if job.tentativas > settings.IMPORT_JOB_MAX_TENTATIVAS:
+                _finalizar(
+                    db, job, "ERRO", job.mensagem or "Importação interrompida: limite de tentativas atingido."
+                )
+                return
+            if job.empresa_id is None:
+                # criado antes da migration 0008: não há empresa para gravar
+                _finalizar(db, job, "ERRO", "Importação sem empresa associada; envie a planilha novamente.")
+                return
+            try:
+                with PlanilhaImportacao(job.arquivo_path) as planilha:
+                    for bloco in planilha.blocos(settings.IMPORT_CHUNK_SIZE, min_row=job.ultima_linha + 1):
+                        stats = novas_stats()
+                        # lock por bloco (não pelo job todo): escritas do painel
+                        # entram entre um bloco e outro
+                        with fila_escrita(db):
+                            processar_bloco(db, planilha, bloco, stats, job.empresa_id)
+                            _registrar_bloco(job, bloco[-1][0], len(bloco), stats)
+                            # dados do bloco + progresso do job no mesmo commit
+                            db.commit()
+                        _liberar_identity_map(db, manter=job)
+            except PlanilhaInvalida as e:
+                db.rollback()
+                _finalizar(db, job, "ERRO", str(e))
+                return
+            except FileNotFoundError:
+                db.rollback()
+                _finalizar(db, job, "ERRO", "Arquivo da importação não encontrado.")
+                return
+
+            _finalizar(db, job, "CONCLUIDO")
+
+        except Exception as e:
+            logger.exception("Falha no job de importação %s", job_id)
+            db.rollback()
+            if job is None:
+                return
+            try:
+                mensagem = f"Falha inesperada na tentativa {job.tentativas}: {type(e).__name__}: {e}"[:500]
+                if job.tentativas >= settings.IMPORT_JOB_MAX_TENTATIVAS:
+                    _finalizar(db, job, "ERRO", mensagem)
+                else:
+                    # fica PROCESSANDO; após o lease expirar é retomado do último bloco
+                    job.mensagem = mensagem
+                    with fila_escrita(db):
+                        db.commit()
+            except Exception:
+                logger.exception("Não foi possível registrar a falha do job %s", job_id)
+                db.rollback()
+
+
+def retomar_jobs() -> None:
+    """Na subida do app: reenfileira jobs pendentes ou abandonados."""
+    limite = datetime.utcnow() - timedelta(seconds=settings.IMPORT_JOB_LEASE_SECONDS)
+    with session_scope() as db:
+        ids = db.scalars(
+            select(ImportacaoJob.id).where(
+                or_(
+                    ImportacaoJob.status == "PENDENTE",
+                    and_(ImportacaoJob.status == "PROCESSANDO", ImportacaoJob.heartbeat_em < limite),
+                )
+            )
+        ).all()
+
+    for job_id in ids:
+        enfileirar(job_id)
+
+
+def encerrar() -> None:
+    # não espera: jobs em andamento são retomados pelo lease no próximo boot
+    _executor.shutdown(wait=False, cancel_futures=True)
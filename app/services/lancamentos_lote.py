@@ -0,0 +1,165 @@
+# app/services/lancamentos_lote.py
+"""
+Operações em lote sobre lançamentos (POST /api/financeiro/lancamentos:batch).
+
+Fases:
+1. validação: uma consulta carrega todos os lançamentos citados (da
+   empresa; FOR UPDATE no PostgreSQL) e outra as categorias usadas. Cada
+   operação é conferida em ordem (id existe e não foi excluído antes no
+   próprio lote, categoria é da empresa); inválida vira erro no resultado
+   e não chega ao banco;
+2. aplicação, das válidas (ou de nenhuma, se `atomico` e houve erro), em
+   uma transação: um INSERT em lote (executemany), um UPDATE em lote por
+   PK, um DELETE ... IN e um único ajuste do resumo mensal e da versão
+   dos dados.
+
+No PostgreSQL o número de comandos não cresce com o tamanho do lote (no
+SQLite o INSERT com RETURNING em ordem sai linha a linha, no próprio
+processo). O commit fica com quem chama (a rota, dentro de
+fila_escrita_async).
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.models.financeiro import CategoriaFinanceira, LancamentoFinanceiro
+from app.services import financeiro_resumo as resumo_fin
+
+_NAO_ENCONTRADO = "Lançamento não encontrado."
+_CATEGORIA_INVALIDA = "Categoria não encontrada."
+_CANCELADA = "Não aplicada: lote atômico com operação inválida."
+
+_COLUNAS = [c.key for c in LancamentoFinanceiro.__table__.columns]
+# colunas regravadas no UPDATE (mesmas chaves em todas as linhas: um executemany só)
+_COLUNAS_UPDATE = [c for c in _COLUNAS if c not in ("empresa_id", "hash_importacao")]
+
+
+def _estado(dados: dict) -> resumo_fin.EstadoLancamento:
+    return resumo_fin.EstadoLancamento(*(dados[c] for c in resumo_fin.EstadoLancamento._fields))
+
+
+def _carregar(db: Session, empresa_id: int, operacoes: list) -> tuple[dict[int, dict], set[int]]:
+    ids = {op.id for op in operacoes if op.op != "criar"}
+    categoria_ids = {
+        op.dados.categoria_id
+        for op in operacoes
+        if op.op in ("criar", "alterar") and op.dados.categoria_id
+    }
+
+    lancs = {}
+    if ids:
+        t = LancamentoFinanceiro.__table__
+        lancs = {
+            row.id: row._asdict()
+            for row in db.execute(
+                select(t).where(t.c.id.in_(ids), t.c.empresa_id == empresa_id).with_for_update()
+            )
+        }
+
+    categorias = set()
+    if categoria_ids:
+        categorias = set(
+            db.scalars(
+                select(CategoriaFinanceira.id).where(
+                    CategoriaFinanceira.id.in_(categoria_ids),
+                    CategoriaFinanceira.empresa_id == empresa_id,
+                )
+            )
+        )
+    return lancs, categorias
+
+
+def _validar(op, lancs: dict, categorias: set, excluidos: set) -> str | None:
+    if op.op != "criar" and (op.id not in lancs or op.id in excluidos):
+        return _NAO_ENCONTRADO
+    if op.op in ("criar", "alterar"):
+        cat = op.dados.categoria_id
+        if cat and cat not in categorias:
+            return _CATEGORIA_INVALIDA
+    return None
+
+
+def aplicar(db: Session, empresa_id: int, lote: schemas.LoteLancamentos) -> schemas.ResultadoLote:
+    operacoes = lote.operacoes
+    lancs, categorias = _carregar(db, empresa_id, operacoes)
+
+    erros: list[str | None] = []
+    excluidos: set[int] = set()
+    for op in operacoes:
+        erro = _validar(op, lancs, categorias, excluidos)
+        erros.append(erro)
+        if erro is None and op.op == "excluir":
+            excluidos.add(op.id)
+
+    falhas = sum(1 for e in erros if e)
+    if lote.atomico and falhas:
+        return schemas.ResultadoLote(
+            aplicado=False,
+            sucesso=0,
+            falhas=falhas,
+            resultados=[
+                schemas.ResultadoOperacao(
+                    indice=i, op=op.op, ref=op.ref, ok=False, id=getattr(op, "id", None), erro=erro or _CANCELADA
+                )
+                for i, (op, erro) in enumerate(zip(operacoes, erros))
+            ],
+        )
+
+    # as operações são aplicadas em ordem sobre cópias em memória; o banco
+    # recebe só o estado final de cada lançamento
+    antes: dict[int, resumo_fin.EstadoLancamento] = {}
+    atuais: dict[int, dict] = {}
+    novos: dict[int, dict] = {}  # índice da operação -> linha a inserir
+    for i, (op, erro) in enumerate(zip(operacoes, erros)):
+        if erro:
+            continue
+        if op.op == "criar":
+            novos[i] = {**dict.fromkeys(_COLUNAS), **op.dados.model_dump(), "empresa_id": empresa_id}
+            continue
+
+        if op.id not in antes:
+            antes[op.id] = _estado(lancs[op.id])
+            atuais[op.id] = dict(lancs[op.id])
+        lanc = atuais[op.id]
+        if op.op == "alterar":
+            lanc.update(op.dados.model_dump(exclude_unset=True))
+        elif op.op == "marcar_pago":
+            lanc["status"] = "PAGO"
+            lanc["data_pagamento"] = op.data_pagamento or lanc["data_pagamento"] or date.today()
+        elif op.op == "excluir":
+            del atuais[op.id]
+
+    if novos:
+        t = LancamentoFinanceiro.__table__
+        linhas = [{c: v for c, v in n.items() if c != "id"} for n in novos.values()]
+        # executemany agrupado; sort_by_parameter_order: ids na ordem das linhas
+        ids = db.scalars(insert(t).returning(t.c.id, sort_by_parameter_order=True), linhas).all()
+        for n, novo_id in zip(novos.values(), ids):
+            n["id"] = novo_id
+    if atuais:
+        db.execute(update(LancamentoFinanceiro), [{c: d[c] for c in _COLUNAS_UPDATE} for d in atuais.values()])
+    if excluidos:
+        db.execute(delete(LancamentoFinanceiro).where(LancamentoFinanceiro.id.in_(excluidos)))
+
+    resumo_fin.registrar_mudancas(
+        db,
+        list(antes.values()),
+        [_estado(d) for d in atuais.values()] + [_estado(n) for n in novos.values()],
+    )
+
+    resultados = []
+    for i, (op, erro) in enumerate(zip(operacoes, erros)):
+        lanc_id = novos[i]["id"] if i in novos else getattr(op, "id", None)
+        resultados.append(
+            schemas.ResultadoOperacao(indice=i, op=op.op, ref=op.ref, ok=erro is None, id=lanc_id, erro=erro)
+        )
+    return schemas.ResultadoLote(
+        aplicado=True,
+        sucesso=len(operacoes) - falhas,
+        falhas=falhas,
+        resultados=resultados,
+    )
@@ -0,0 +1,42 @@
+# app/services/versao_dados.py
+"""
+Versão dos dados financeiros de cada empresa.
+
+`empresas.versao_dados` é incrementada na mesma transação de toda escrita
+em lançamentos (via financeiro_resumo.registrar_*) e categorias. As
+páginas de dashboard/relatórios usam (versão, dados_alterados_em) como
+ETag/Last-Modified: sem escrita nova, o navegador recebe 304 sem que a
+página seja consultada nem renderizada.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models import Empresa
+
+
+class VersaoDados(NamedTuple):
+    versao: int
+    alterado_em: datetime | None
+
+
+def incrementar(db: Session, *empresa_ids: int) -> None:
+    ids = sorted(set(empresa_ids))  # ordem fixa: sem deadlock entre escritas de várias empresas
+    if not ids:
+        return
+    db.execute(
+        update(Empresa)
+        .where(Empresa.id.in_(ids))
+        .values(versao_dados=Empresa.versao_dados + 1, dados_alterados_em=datetime.utcnow())
+    )
+
+
+def obter(db: Session, empresa_id: int) -> VersaoDados:
+    row = db.execute(
+        select(Empresa.versao_dados, Empresa.dados_alterados_em).where(Empresa.id == empresa_id)
+    ).first()
+    return VersaoDados(row[0], row[1]) if row else VersaoDados(0, None)
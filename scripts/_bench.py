@@ -0,0 +1,333 @@
+# scripts/_bench.py
+"""
+Apoio dos benchmarks (scripts/bench_*.py).
+
+Rodam contra DATABASE_URL, que precisa apontar para um banco descartável:
+o schema é recriado (alembic upgrade head) e os dados do teste são
+gerados pelo próprio script. Para não apagar um banco de verdade, só
+aceita banco vazio ou já usado por um benchmark (tabela bench_marcador).
+
+    DATABASE_URL=sqlite:///./bench.db python -m scripts.bench_importacao
+
+Os resultados saem na tela e são acrescentados em bench_output.txt, na
+raiz do projeto (fora do git).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+SAIDA = RAIZ / "bench_output.txt"
+MARCADOR = "bench_marcador"
+
+if not os.getenv("DATABASE_URL"):
+    sys.exit("Defina DATABASE_URL com um banco descartável (ver scripts/_bench.py).")
+
+
+def preparar_banco() -> None:
+    """Recria o schema no banco de DATABASE_URL e cria a empresa 1 (usada pelo /auth/register)."""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import MetaData, inspect, text
+
+    from app.database import SessionLocal, engine
+    from app.models import Empresa
+
+    tabelas = inspect(engine).get_table_names()
+    if tabelas and MARCADOR not in tabelas:
+        sys.exit(f"{engine.url.render_as_string()} não está vazio e não é de benchmark; use outro banco.")
+
+    meta = MetaData()
+    meta.reflect(engine)
+    meta.drop_all(engine)
+    engine.dispose()
+
+    config = Config(str(RAIZ / "alembic.ini"))
+    config.set_main_option("script_location", str(RAIZ / "alembic"))
+    command.upgrade(config, "head")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE {MARCADOR} (id INTEGER)"))
+    with SessionLocal() as db:
+        db.add(Empresa(id=1, nome="Empresa Bench", ativo=True))
+        db.commit()
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("SELECT setval('empresas_id_seq', (SELECT MAX(id) FROM empresas))"))
+
+
+def popular_lancamentos(
+    quantidade: int,
+    empresas: int = 10,
+    inicio: date = date(2022, 1, 1),
+    dias: int = 1400,
+    hoje: date | None = None,
+) -> None:
+    """
+    `quantidade` lançamentos aleatórios (semente fixa) espalhados por
+    `empresas` empresas e `dias` dias a partir de `inicio`; 60% pagos.
+    Com `hoje`, ficam pendentes os que vencem depois de hoje e 2% dos
+    vencidos (atrasados). Cada empresa tem uma categoria de receita e uma
+    de despesa. Termina reconstruindo o resumo mensal e com ANALYZE.
+    """
+    from sqlalchemy import insert, text
+
+    from app.database import SessionLocal, engine
+    from app.models import Empresa
+    from app.models.financeiro import CategoriaFinanceira, LancamentoFinanceiro
+    from app.services.financeiro_resumo import reconstruir
+
+    aleatorio = random.Random(1)
+    with SessionLocal() as db:
+        if empresas > 1:
+            db.execute(insert(Empresa), [dict(id=n, nome=f"Empresa Bench {n}") for n in range(2, empresas + 1)])
+        db.execute(
+            insert(CategoriaFinanceira),
+            [
+                dict(id=2 * n - 1 + i, empresa_id=n, nome=nome, tipo=tipo)
+                for n in range(1, empresas + 1)
+                for i, (nome, tipo) in enumerate((("Consultas", "RECEITA"), ("Aluguel", "DESPESA")))
+            ],
+        )
+        for bloco in range(0, quantidade, 10_000):
+            linhas = []
+            for i in range(bloco, min(bloco + 10_000, quantidade)):
+                empresa_id = aleatorio.randint(1, empresas)
+                receita = aleatorio.random() < 0.5
+                data = inicio + timedelta(days=aleatorio.randint(0, dias))
+                vencimento = data + timedelta(days=30)
+                if hoje is None:
+                    pago = aleatorio.random() < 0.6
+                else:
+                    pago = vencimento <= hoje and aleatorio.random() >= 0.02
+                linhas.append(
+                    dict(
+                        empresa_id=empresa_id,
+                        categoria_id=2 * empresa_id - (1 if receita else 0),
+                        tipo="RECEITA" if receita else "DESPESA",
+                        descricao=f"lançamento {i}",
+                        valor=Decimal(aleatorio.randint(100, 100_000)) / 100,
+                        data_lancamento=data,
+                        data_vencimento=vencimento,
+                        data_pagamento=data + timedelta(days=aleatorio.randint(0, 40)) if pago else None,
+                        status="PAGO" if pago else "PENDENTE",
+                    )
+                )
+            db.execute(insert(LancamentoFinanceiro), linhas)
+            db.commit()
+        reconstruir(db)
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for tabela in ("empresas", "financeiro_categorias"):
+                conn.execute(text(f"SELECT setval('{tabela}_id_seq', (SELECT MAX(id) FROM {tabela}))"))
+    analisar()
+
+
+def analisar() -> None:
+    """Atualiza as estatísticas do planner depois da carga de dados."""
+    from sqlalchemy import text
+
+    from app.database import engine
+
+    if engine.dialect.name == "postgresql":
+        # VACUUM não roda dentro de transação; atualiza também o visibility map
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+
+def registrar(titulo: str, linhas: list[str]) -> None:
+    from app.database import engine
+
+    cabecalho = (
+        f"== {titulo} | {datetime.now():%Y-%m-%d %H:%M} | {engine.dialect.name} | "
+        f"python {sys.version.split()[0]} | {os.cpu_count()} CPU"
+    )
+    texto = "\n".join([cabecalho, *linhas, ""])
+    print(texto)
+    with open(SAIDA, "a", encoding="utf-8") as f:
+        f.write(texto + "\n")
+
+
+def percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return float("nan")
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def latencias(valores_ms: list[float]) -> str:
+    return (
+        f"n={len(valores_ms)} p50={percentil(valores_ms, 50):.0f}ms "
+        f"p99={percentil(valores_ms, 99):.0f}ms max={max(valores_ms, default=float('nan')):.0f}ms"
+    )
+
+
+def media_ms(fn, repeticoes: int) -> float:
+    fn()  # aquecimento (cache do banco e das consultas compiladas)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        fn()
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+# =========================================================
+# SERVIDOR HTTP (uvicorn num processo separado)
+# =========================================================
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def servidor(**env):
+    """uvicorn com um worker servindo app.main; `env` sobrepõe as settings."""
+    from app.database import engine
+
+    # conexões deste processo fechadas: no SQLite trocar o journal_mode exige o arquivo só para si
+    engine.dispose()
+    porta = _porta_livre()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=RAIZ,
+        env={**os.environ, **{k: str(v) for k, v in env.items()}},
+    )
+    url = f"http://127.0.0.1:{porta}"
+    try:
+        import httpx
+
+        limite = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{url}/api/hello").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if processo.poll() is not None or time.monotonic() > limite:
+                sys.exit("uvicorn não subiu; veja a saída acima.")
+            time.sleep(0.2)
+        yield url
+    finally:
+        processo.terminate()
+        processo.wait(timeout=30)
+
+
+def cadastrar(url: str, n: int, senha: str = "senha-bench") -> list[str]:
+    """Cadastra `n` usuários pelo /auth/register; devolve os e-mails."""
+    import httpx
+
+    emails = []
+    with httpx.Client(base_url=url, timeout=120) as client:
+        for i in range(n):
+            email = f"bench{i}@bench.com"
+            r = client.post(
+                "/auth/register",
+                json={"nome": f"Bench {i}", "cpf": f"{i + 1:011d}", "email": email, "senha": senha},
+            )
+            r.raise_for_status()
+            emails.append(email)
+    return emails
+
+
+class ConexaoHttp:
+    """
+    Cliente HTTP/1.1 keep-alive mínimo (uma conexão, uma requisição por
+    vez, sem seguir redirect). Bem mais leve que o httpx: rodando na mesma máquina, o gerador
+    de carga tira menos CPU do servidor medido.
+    """
+
+    def __init__(self, url: str, headers: dict[str, str] | None = None):
+        self.host, _, porta = url.removeprefix("http://").partition(":")
+        self.porta = int(porta or 80)
+        extras = "".join(f"{k}: {v}\r\n" for k, v in (headers or {}).items())
+        self._cabecalho = f"Host: {self.host}\r\n{extras}\r\n"
+        self._leitor: asyncio.StreamReader | None = None
+        self._escritor: asyncio.StreamWriter | None = None
+
+    async def get(self, caminho: str) -> int:
+        return await self.enviar("GET", caminho)
+
+    async def post_form(self, caminho: str, dados: dict) -> int:
+        from urllib.parse import urlencode
+
+        return await self.enviar("POST", caminho, urlencode(dados).encode(), "application/x-www-form-urlencoded")
+
+    async def enviar(self, metodo: str, caminho: str, corpo: bytes = b"", tipo: str | None = None) -> int:
+        """Envia a requisição, lê a resposta inteira e devolve o status."""
+        cabecalho = f"{metodo} {caminho} HTTP/1.1\r\n"
+        if corpo:
+            cabecalho += f"Content-Type: {tipo}\r\nContent-Length: {len(corpo)}\r\n"
+        try:
+            if self._escritor is None:
+                self._leitor, self._escritor = await asyncio.open_connection(self.host, self.porta)
+            self._escritor.write((cabecalho + self._cabecalho).encode() + corpo)
+            return await self._ler_resposta()
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            self.fechar()
+            raise
+
+    async def _ler_resposta(self) -> int:
+        leitor = self._leitor
+        status = int((await leitor.readline()).split()[1])
+        tamanho, chunked, fechar = 0, False, False
+        while (linha := await leitor.readline()) not in (b"\r\n", b""):
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            nome, valor = nome.strip().lower(), valor.strip().lower()
+            if nome == "content-length":
+                tamanho = int(valor)
+            elif nome == "transfer-encoding":
+                chunked = "chunked" in valor
+            elif nome == "connection":
+                fechar = valor == "close"
+        if chunked:
+            while (pedaco := int((await leitor.readline()).split(b";")[0], 16)) > 0:
+                await leitor.readexactly(pedaco + 2)
+            await leitor.readline()
+        else:
+            await leitor.readexactly(tamanho)
+        if fechar:
+            self.fechar()
+        return status
+
+    def fechar(self) -> None:
+        if self._escritor is not None:
+            self._escritor.close()
+        self._leitor = self._escritor = None
+
+
+async def carga(criar_requisicao, concorrencia: int, duracao: float) -> list[tuple[float, int]]:
+    """
+    `concorrencia` tarefas, cada uma com a sua `requisicao = criar_requisicao()`,
+    chamando `await requisicao()` (que devolve o status HTTP) em laço por
+    `duracao` segundos. Devolve (latência em ms, status) de cada chamada;
+    falha de conexão conta como status 0.
+    """
+    resultados: list[tuple[float, int]] = []
+    fim = time.monotonic() + duracao
+
+    async def laco():
+        requisicao = criar_requisicao()
+        while time.monotonic() < fim:
+            inicio = time.perf_counter()
+            try:
+                status = await requisicao()
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                status = 0
+            resultados.append(((time.perf_counter() - inicio) * 1000, status))
+
+    await asyncio.gather(*(laco() for _ in range(concorrencia)))
+    return resultados
@@ -0,0 +1,102 @@
+# scripts/bench_agregacao.py
+"""
+Totais do período (dashboard/relatórios): as duas consultas GROUP BY de
+antes contra a agregação de uma passada (totais_lancamentos) e a soma do
+resumo mensal (totais_resumo). Mostra também o plano de cada consulta.
+
+    DATABASE_URL=... python -m scripts.bench_agregacao [--lancamentos 200000] [--repeticoes 50]
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date
+
+from scripts import _bench
+
+EMPRESA = 3
+
+
+def _antigo(db, inicio: date, fim: date) -> None:
+    """As duas consultas que financeiro_relatorios fazia (competência e caixa)."""
+    from sqlalchemy import func, select
+
+    from app.models.financeiro import LancamentoFinanceiro as L
+
+    db.execute(
+        select(L.tipo, func.coalesce(func.sum(L.valor), 0))
+        .where(L.empresa_id == EMPRESA, L.data_lancamento >= inicio, L.data_lancamento <= fim)
+        .group_by(L.tipo)
+    ).all()
+    db.execute(
+        select(L.tipo, func.coalesce(func.sum(L.valor), 0))
+        .where(
+            L.empresa_id == EMPRESA,
+            L.status == "PAGO",
+            L.data_pagamento.isnot(None),
+            L.data_pagamento >= inicio,
+            L.data_pagamento <= fim,
+        )
+        .group_by(L.tipo)
+    ).all()
+
+
+def _planos(consulta) -> list[str]:
+    """Plano (EXPLAIN) de cada SELECT executado por `consulta(db)`."""
+    from sqlalchemy import event
+
+    from app.database import SessionLocal, engine
+
+    capturados = []
+
+    def ouvir(conn, cursor, statement, parameters, context, executemany):
+        capturados.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", ouvir)
+    try:
+        with SessionLocal() as db:
+            consulta(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", ouvir)
+
+    prefixo = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        return [
+            "\n".join(str(r[-1]) for r in conn.exec_driver_sql(prefixo + sql, params))
+            for sql, params in capturados
+        ]
+
+
+def main() -> None:
+    from app.database import SessionLocal
+    from app.services.financeiro_agregacao import totais_lancamentos, totais_resumo
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lancamentos", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    _bench.preparar_banco()
+    _bench.popular_lancamentos(args.lancamentos)
+
+    mes = (date(2024, 3, 1), date(2024, 3, 31))
+    parcial = (date(2024, 3, 10), date(2024, 4, 20))
+    variantes = [
+        ("duas consultas GROUP BY (antes)", _antigo, [mes, parcial]),
+        ("agregação de uma passada", lambda db, a, b: totais_lancamentos(db, EMPRESA, a, b), [mes, parcial]),
+        ("resumo mensal (mês inteiro)", lambda db, a, b: totais_resumo(db, EMPRESA, a, b), [mes]),
+    ]
+
+    resultado = [f"{args.lancamentos} lançamentos / 10 empresas, empresa {EMPRESA}, média de {args.repeticoes}"]
+    planos = []
+    with SessionLocal() as db:
+        for nome, fn, periodos in variantes:
+            for inicio, fim in periodos:
+                ms = _bench.media_ms(lambda: fn(db, inicio, fim), args.repeticoes)
+                resultado.append(f"  {nome:<32} {inicio} a {fim}  {ms:7.1f} ms")
+            planos.append(f"-- {nome}")
+            planos += _planos(lambda db: fn(db, *periodos[-1]))
+    _bench.registrar("agregação do período (user-009)", resultado + ["planos:", *planos])
+
+
+if __name__ == "__main__":
+    main()
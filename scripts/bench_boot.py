@@ -0,0 +1,121 @@
+# scripts/bench_boot.py
+"""
+Tempo de boot de um worker: importar app.main e rodar o lifespan até o
+ponto em que ele passaria a atender, num processo novo a cada rodada.
+
+Compara o boot atual (só confere a revisão do alembic) com o de antes
+das migrations (create_all + índices faltantes na importação e checagem
+do resumo mensal no lifespan, reproduzidos em _boot_antigo). Conta os
+statements e o tempo gasto neles (o total inclui importar o app, que é
+igual nos dois); --rtt-ms soma uma espera por statement para simular a
+latência de um banco gerenciado.
+
+    DATABASE_URL=... python -m scripts.bench_boot [--rodadas 8] [--rtt-ms 0 2]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from scripts import _bench
+
+
+def _boot_antigo() -> None:
+    """O que app/main.py fazia a cada boot antes das migrations."""
+    from sqlalchemy import exists, select
+
+    from app.database import Base, engine, session_scope
+    from app.models import LancamentoFinanceiro, ResumoFinanceiroMensal
+
+    Base.metadata.create_all(bind=engine)
+    # criar_indices_faltantes(): create_all não cria índice novo em tabela existente
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # reconstruir_se_vazio(): no lifespan
+    with session_scope() as db:
+        db.scalar(select(exists().where(ResumoFinanceiroMensal.id.isnot(None))))
+        db.scalar(select(exists().where(LancamentoFinanceiro.id.isnot(None))))
+
+
+def _filho(modo: str, rtt_ms: float) -> None:
+    """Um boot, num processo novo; imprime {"ms", "banco_ms", "statements"}."""
+    import asyncio
+    import time
+
+    inicio = time.perf_counter()
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    statements = 0
+    banco = 0.0
+    comeco = 0.0
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def antes(*_):
+        nonlocal statements, comeco
+        statements += 1
+        comeco = time.perf_counter()
+        if rtt_ms:
+            time.sleep(rtt_ms / 1000)
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def depois(*_):
+        nonlocal banco
+        banco += time.perf_counter() - comeco
+
+    from app.main import app
+
+    if modo == "antigo":
+        _boot_antigo()
+
+    pronto = 0.0
+
+    async def subir():
+        nonlocal pronto
+        async with app.router.lifespan_context(app):
+            pronto = time.perf_counter()
+
+    asyncio.run(subir())
+    print(json.dumps({"ms": (pronto - inicio) * 1000, "banco_ms": banco * 1000, "statements": statements}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rodadas", type=int, default=8)
+    parser.add_argument("--rtt-ms", type=float, nargs="+", default=[0, 2])
+    parser.add_argument("--filho", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.filho:
+        _filho(args.filho, args.rtt_ms[0])
+        return
+
+    _bench.preparar_banco()
+    resultado = [f"média de {args.rodadas} boots (import + lifespan)"]
+    for rtt in args.rtt_ms:
+        for modo, nome in (("antigo", "create_all + índices (antes)"), ("atual", "só checagem da revisão")):
+            medidas = []
+            for _ in range(args.rodadas):
+                saida = subprocess.run(
+                    [sys.executable, "-m", "scripts.bench_boot", "--filho", modo, "--rtt-ms", str(rtt)],
+                    cwd=_bench.RAIZ,
+                    env=os.environ,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                medidas.append(json.loads(saida.strip().splitlines()[-1]))
+            ms = sum(m["ms"] for m in medidas) / len(medidas)
+            banco_ms = sum(m["banco_ms"] for m in medidas) / len(medidas)
+            resultado.append(
+                f"  rtt={rtt:g}ms  {nome:<30} total {ms:6.0f} ms  no banco {banco_ms:6.1f} ms  "
+                f"{medidas[0]['statements']:4d} statements"
+            )
+    _bench.registrar("boot do worker (user-012)", resultado)
+
+
+if __name__ == "__main__":
+    main()
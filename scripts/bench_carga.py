@@ -0,0 +1,79 @@
+# scripts/bench_carga.py
+"""
+Carga HTTP nas rotas async: requisições/s e latência de /api/me (token
+Bearer) e do dashboard do painel (cookie) em cada concorrência.
+
+Sobe o app (uvicorn, 1 worker) com o cache de autenticação desligado,
+para toda requisição ir ao banco. O gerador de carga (_bench.ConexaoHttp,
+uma conexão keep-alive por cliente) roda na mesma máquina e, com poucos
+CPUs, ainda disputa processador com o servidor.
+
+    DATABASE_URL=... python -m scripts.bench_carga [--concorrencia 40 200] [--duracao 15]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+
+from scripts import _bench
+
+SENHA = "senha-bench"
+ROTAS = {
+    "/api/me": "/api/me",
+    "dashboard": "/painel/financeiro?ym=2024-03",
+}
+
+
+async def _credenciais(url: str, email: str) -> dict[str, str]:
+    """Cabeçalhos com o token da API e o cookie do painel."""
+    import httpx
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        token = (await client.post("/auth/login", data={"username": email, "password": SENHA})).json()["access_token"]
+        await client.post("/painel/login", data={"email": email, "senha": SENHA})
+        assert "ds_token" in client.cookies, "login no painel falhou"
+        return {"Authorization": f"Bearer {token}", "Cookie": f"ds_token={client.cookies['ds_token']}"}
+
+
+async def _rodada(url: str, headers: dict, caminho: str, concorrencia: int, duracao: float) -> list[tuple[float, int]]:
+    conexoes: list[_bench.ConexaoHttp] = []
+
+    def criar():
+        conexao = _bench.ConexaoHttp(url, headers)
+        conexoes.append(conexao)
+        return lambda: conexao.get(caminho)
+
+    try:
+        return await _bench.carga(criar, concorrencia, duracao)
+    finally:
+        for conexao in conexoes:
+            conexao.fechar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[40, 200])
+    parser.add_argument("--duracao", type=float, default=15)
+    parser.add_argument("--lancamentos", type=int, default=20_000)
+    args = parser.parse_args()
+
+    _bench.preparar_banco()
+    _bench.popular_lancamentos(args.lancamentos)
+    resultado = [f"{args.lancamentos} lançamentos, {args.duracao:.0f}s por rodada, AUTH_CACHE_TTL_SECONDS=0"]
+    with _bench.servidor(AUTH_CACHE_TTL_SECONDS=0) as url:
+        (email,) = _bench.cadastrar(url, 1, SENHA)
+        headers = asyncio.run(_credenciais(url, email))
+        for rota, caminho in ROTAS.items():
+            for concorrencia in args.concorrencia:
+                feitas = asyncio.run(_rodada(url, headers, caminho, concorrencia, args.duracao))
+                status = Counter(s for _, s in feitas)
+                resultado.append(
+                    f"  {rota:<10} c={concorrencia:<4} {len(feitas) / args.duracao:6.0f} req/s  "
+                    f"{_bench.latencias([ms for ms, _ in feitas])}  status={dict(sorted(status.items()))}"
+                )
+    _bench.registrar("carga nas rotas async (user-014)", resultado)
+
+
+if __name__ == "__main__":
+    main()
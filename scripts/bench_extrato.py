@@ -0,0 +1,105 @@
+# scripts/bench_extrato.py
+"""
+Vazão da importação de extrato (CSV) em lançamentos, pelo endpoint do
+painel (TestClient, no próprio processo): importa o arquivo, reenvia (tudo
+duplicado) e, para comparar, cria `--amostra-form` linhas uma a uma pelo
+formulário de lançamento. Mostra também o crescimento do pico de memória
+(ru_maxrss) durante a importação.
+
+    DATABASE_URL=... python -m scripts.bench_extrato [--linhas 50000] [--amostra-form 1000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import time
+from datetime import date, timedelta
+
+from scripts import _bench
+
+SENHA = "senha-bench"
+
+
+def gerar_csv(linhas: int) -> tuple[bytes, list[dict]]:
+    """Extrato com 70% de pagamentos a 25 fornecedores e 30% de PIX recebidos."""
+    aleatorio = random.Random(1)
+    texto = ["data;descricao;valor"]
+    formularios = []
+    for i in range(linhas):
+        dia = date(2026, 1, 1) + timedelta(days=i % 300)
+        valor = aleatorio.randint(100, 500_000) / 100
+        despesa = aleatorio.random() < 0.7
+        descricao = f"PAG FORNECEDOR {i % 25} NF {i}" if despesa else f"PIX RECEBIDO {i}"
+        valor_br = f"{valor:.2f}".replace(".", ",")
+        texto.append(f"{dia:%d/%m/%Y};{descricao};{'-' if despesa else ''}{valor_br}")
+        formularios.append(
+            dict(
+                tipo="DESPESA" if despesa else "RECEITA",
+                descricao=descricao,
+                valor=valor_br,
+                data_lancamento=f"{dia:%Y-%m-%d}",
+                data_pagamento=f"{dia:%Y-%m-%d}",
+                status="PAGO",
+                ym="2026-01",
+            )
+        )
+    return ("\n".join(texto) + "\n").encode(), formularios
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=50_000)
+    parser.add_argument("--amostra-form", type=int, default=1000, help="linhas criadas pelo formulário (0 = pula)")
+    args = parser.parse_args()
+
+    _bench.preparar_banco()
+    arquivo, formularios = gerar_csv(args.linhas)
+    resultado = [f"{args.linhas} linhas, {len(arquivo) / 1e6:.1f} MB"]
+
+    with TestClient(app) as client:
+        client.post(
+            "/auth/register",
+            json={"nome": "Bench", "cpf": "00000000001", "email": "bench@bench.com", "senha": SENHA},
+        ).raise_for_status()
+        client.post("/painel/login", data={"email": "bench@bench.com", "senha": SENHA}, follow_redirects=False)
+        for i in range(25):
+            client.post("/painel/financeiro/categorias/criar", data={"nome": f"Fornecedor {i}", "tipo": "DESPESA"})
+
+        rss = _rss_mb()
+        for rodada in ("importar", "reenviar"):
+            inicio = time.perf_counter()
+            r = client.post(
+                "/painel/financeiro/lancamentos/importar",
+                data={"ym": "2026-01"},
+                files={"arquivo": ("extrato.csv", arquivo)},
+                follow_redirects=False,
+            )
+            segundos = time.perf_counter() - inicio
+            contagem = r.headers["location"].split("&", 1)[1]
+            resultado.append(
+                f"  {rodada:<9} {segundos:6.2f}s {args.linhas / segundos:8.0f} linhas/s  ({contagem})"
+            )
+        resultado.append(f"  pico de memória +{_rss_mb() - rss:.0f} MB")
+
+        if args.amostra_form:
+            inicio = time.perf_counter()
+            for dados in formularios[: args.amostra_form]:
+                client.post("/painel/financeiro/lancamentos/criar", data=dados, follow_redirects=False)
+            segundos = time.perf_counter() - inicio
+            resultado.append(
+                f"  formulário ({args.amostra_form} linhas, uma por requisição) {args.amostra_form / segundos:6.0f} linhas/s"
+            )
+    _bench.registrar("importação de extrato (user-021)", resultado)
+
+
+if __name__ == "__main__":
+    main()
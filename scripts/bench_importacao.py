@@ -0,0 +1,76 @@
+# scripts/bench_importacao.py
+"""
+Vazão da importação de funcionários (linhas/s), pelo mesmo caminho do
+job em background: blocos de IMPORT_CHUNK_SIZE, um commit por bloco.
+
+Para cada tamanho importa a planilha três vezes: tudo novo (insert), a
+mesma planilha de novo (nada muda) e com os nomes alterados (update).
+
+    DATABASE_URL=... python -m scripts.bench_importacao [linhas ...]   # padrão: 10000 100000
+"""
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from scripts import _bench
+
+
+def gerar_planilha(path: Path, linhas: int, sufixo: str = "") -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["empresa_nome", "empresa_cnpj", "funcionario_nome", "funcionario_cpf", "funcionario_email", "ativo"])
+    for i in range(linhas):
+        ws.append(["Empresa Bench", "", f"Funcionário {i}{sufixo}", f"{i:011d}", f"f{i}@bench.com", "sim"])
+    wb.save(path)
+
+
+def importar(path: Path) -> tuple[float, dict]:
+    from app.database import session_scope
+    from app.models.importacao import ImportacaoJob
+    from app.services import importacao_jobs
+
+    # o job apaga o arquivo ao terminar
+    upload = path.with_name(f"upload_{path.name}")
+    shutil.copyfile(path, upload)
+    with session_scope() as db:
+        job_id = importacao_jobs.criar_job(db, 1, upload.name, str(upload)).id
+
+    inicio = time.perf_counter()
+    importacao_jobs.executar_job(job_id)
+    segundos = time.perf_counter() - inicio
+
+    with session_scope() as db:
+        job = db.get(ImportacaoJob, job_id)
+        assert job.status == "CONCLUIDO", (job.status, job.mensagem)
+        return segundos, importacao_jobs.progresso(job)
+
+
+def main(tamanhos: list[int]) -> None:
+    from app.core.config import settings
+
+    resultado = [f"bloco={settings.IMPORT_CHUNK_SIZE}"]
+    with tempfile.TemporaryDirectory() as tmp:
+        for linhas in tamanhos:
+            _bench.preparar_banco()
+            path = Path(tmp) / f"funcionarios_{linhas}.xlsx"
+            alterada = Path(tmp) / f"funcionarios_{linhas}_alterada.xlsx"
+            gerar_planilha(path, linhas)
+            gerar_planilha(alterada, linhas, sufixo=" (2)")
+            for rodada, planilha in (("insert", path), ("igual", path), ("update", alterada)):
+                segundos, job = importar(planilha)
+                resultado.append(
+                    f"{linhas:>7} linhas {rodada:<8} {segundos:7.1f}s {linhas / segundos:8.0f} linhas/s  "
+                    f"(criados={job['funcionarios_criados']} atualizados={job['funcionarios_atualizados']} "
+                    f"erros={job['erros_total']})"
+                )
+    _bench.registrar("importação de funcionários (user-002)", resultado)
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,89 @@
+# scripts/bench_login_storm.py
+"""
+Latência de uma rota sem senha (/api/hello) durante uma rajada de logins.
+
+Sobe o app (uvicorn, 1 worker) e mede /api/hello (uma chamada a cada
+10 ms) sozinho e durante `--logins` /auth/login disparados juntos, até o
+último responder. Roda duas vezes: com o pool de processos do bcrypt
+(PASSWORD_HASH_WORKERS das settings) e com PASSWORD_HASH_WORKERS=0, que
+faz o bcrypt no processo do app, como antes do pool.
+
+    DATABASE_URL=... python -m scripts.bench_login_storm [--logins 60]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from scripts import _bench
+
+SENHA = "senha-bench"
+
+
+async def _sonda(client, ate: asyncio.Event) -> list[float]:
+    """GET /api/hello a cada 10 ms até `ate`; latências em ms."""
+    valores = []
+    while not ate.is_set():
+        inicio = time.perf_counter()
+        await client.get("/api/hello")
+        valores.append((time.perf_counter() - inicio) * 1000)
+        await asyncio.sleep(0.01)
+    return valores
+
+
+async def _rodada(url: str, email: str, logins: int) -> dict:
+    import httpx
+
+    limites = httpx.Limits(max_connections=logins + 10)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limites) as client:
+        async def login():
+            inicio = time.perf_counter()
+            r = await client.post("/auth/login", data={"username": email, "password": SENHA})
+            return (time.perf_counter() - inicio) * 1000, r.status_code
+
+        parar = asyncio.Event()
+        sonda = asyncio.create_task(_sonda(client, parar))
+        await asyncio.sleep(3)
+        parar.set()
+        sozinho = await sonda
+
+        parar = asyncio.Event()
+        sonda = asyncio.create_task(_sonda(client, parar))
+        feitos = await asyncio.gather(*(login() for _ in range(logins)))
+        parar.set()
+        com_logins = await sonda
+    return {"sozinho": sozinho, "com_logins": com_logins, "logins": feitos}
+
+
+def main() -> None:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=60, help="clientes fazendo login ao mesmo tempo")
+    args = parser.parse_args()
+
+    resultado = [
+        f"BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS} PASSWORD_HASH_MAX_PENDING={settings.PASSWORD_HASH_MAX_PENDING} "
+        f"logins simultâneos={args.logins}"
+    ]
+    for workers in (settings.PASSWORD_HASH_WORKERS, 0):
+        _bench.preparar_banco()
+        with _bench.servidor(PASSWORD_HASH_WORKERS=workers) as url:
+            (email,) = _bench.cadastrar(url, 1, SENHA)
+            r = asyncio.run(_rodada(url, email, args.logins))
+
+        status = Counter(s for _, s in r["logins"])
+        resultado += [
+            f"PASSWORD_HASH_WORKERS={workers}",
+            f"  /api/hello sozinho     {_bench.latencias(r['sozinho'])}",
+            f"  /api/hello com logins  {_bench.latencias(r['com_logins'])}",
+            f"  /auth/login            {_bench.latencias([ms for ms, s in r['logins'] if s == 200])} "
+            f"status={dict(sorted(status.items()))}",
+        ]
+    _bench.registrar("rajada de logins (user-006)", resultado)
+
+
+if __name__ == "__main__":
+    main()
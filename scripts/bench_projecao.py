@@ -0,0 +1,90 @@
+# scripts/bench_projecao.py
+"""
+Projeção de caixa (/api/financeiro/projecao) com muitos lançamentos: a
+consulta com soma corrente no banco (projecao) contra buscar os
+pendentes e acumular em Python, e a consulta sem o índice
+(empresa_id, status, data_vencimento) da migration 0006.
+
+Uma empresa com `--lancamentos` lançamentos de 2021 a meados de 2027:
+pendentes os que vencem depois de hoje e 2% dos vencidos.
+
+    DATABASE_URL=... python -m scripts.bench_projecao [--lancamentos 1000000] [--repeticoes 5]
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, timedelta
+from decimal import Decimal
+
+from scripts import _bench
+
+CASOS = [(3, "dia"), (3, "semana"), (12, "dia"), (24, "semana")]
+INDICE = "ix_financeiro_lancamentos_empresa_status_venc"
+
+
+def _loop_python(db, hoje: date, meses: int, granularidade: str) -> list[tuple[date, Decimal]]:
+    """A alternativa sem janela: busca os pendentes ordenados e acumula aqui."""
+    from sqlalchemy import select
+
+    from app.models.financeiro import LancamentoFinanceiro as L
+    from app.services.financeiro_projecao import somar_meses
+
+    fim = somar_meses(hoje, meses)
+    periodos: dict[date, list[Decimal]] = {}
+    for vencimento, tipo, valor in db.execute(
+        select(L.data_vencimento, L.tipo, L.valor)
+        .where(L.empresa_id == 1, L.status == "PENDENTE", L.data_vencimento <= fim)
+        .order_by(L.data_vencimento)
+    ):
+        dia = max(vencimento, hoje)
+        if granularidade == "semana":
+            dia -= timedelta(days=dia.weekday())
+        totais = periodos.setdefault(dia, [Decimal(0), Decimal(0)])
+        totais[0 if tipo == "RECEITA" else 1] += valor
+
+    saldo, pontos = Decimal(0), []
+    for dia in sorted(periodos):
+        saldo += periodos[dia][0] - periodos[dia][1]
+        pontos.append((dia, saldo))
+    return pontos
+
+
+def main() -> None:
+    from sqlalchemy import func, select, text
+
+    from app.database import SessionLocal
+    from app.models.financeiro import LancamentoFinanceiro as L
+    from app.services.financeiro_projecao import projecao
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lancamentos", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    hoje = date.today()
+    _bench.preparar_banco()
+    _bench.popular_lancamentos(args.lancamentos, empresas=1, inicio=date(2021, 1, 1), dias=2372, hoje=hoje)
+
+    with SessionLocal() as db:
+        pendentes = db.scalar(select(func.count()).where(L.status == "PENDENTE"))
+        resultado = [f"{args.lancamentos} lançamentos, {pendentes} pendentes, hoje={hoje}, média de {args.repeticoes}"]
+        for meses, granularidade in CASOS:
+            pontos = len(projecao(db, 1, hoje, meses, granularidade).pontos)
+            janela = _bench.media_ms(lambda: projecao(db, 1, hoje, meses, granularidade), args.repeticoes)
+            loop = _bench.media_ms(lambda: _loop_python(db, hoje, meses, granularidade), args.repeticoes)
+            resultado.append(
+                f"  {meses:2d} meses/{granularidade:<6} {pontos:4d} pontos  "
+                f"SQL com janela {janela:7.1f} ms  busca + loop Python {loop:7.1f} ms"
+            )
+
+        db.execute(text(f"DROP INDEX {INDICE}"))
+        db.commit()
+        _bench.analisar()
+        for meses, granularidade in CASOS[:1] + CASOS[-1:]:
+            janela = _bench.media_ms(lambda: projecao(db, 1, hoje, meses, granularidade), args.repeticoes)
+            resultado.append(f"  {meses:2d} meses/{granularidade:<6} sem {INDICE}: {janela:7.1f} ms")
+    _bench.registrar("projeção de caixa (user-025)", resultado)
+
+
+if __name__ == "__main__":
+    main()
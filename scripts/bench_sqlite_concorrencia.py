@@ -0,0 +1,110 @@
+# scripts/bench_sqlite_concorrencia.py
+"""
+SQLite com leitores e escritores ao mesmo tempo (só SQLite).
+
+Sobe o app (uvicorn, 1 worker) e, durante `--duracao` segundos, roda
+`--leitores` clientes na lista de lançamentos e `--escritores` clientes
+criando lançamentos pelo formulário do painel; depois repete com uma
+importação de planilha (`--linhas`) rodando em background.
+
+Cada cenário roda com os PRAGMAs padrão (WAL, synchronous=NORMAL) e com
+journal_mode=DELETE / synchronous=FULL, o modo de antes: sem WAL a
+leitura espera a escrita terminar. Respostas 5xx aparecem no status
+(ex.: "database is locked").
+
+    DATABASE_URL=sqlite:///./bench.db python -m scripts.bench_sqlite_concorrencia [--duracao 15]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from scripts import _bench
+from scripts.bench_importacao import gerar_planilha
+
+SENHA = "senha-bench"
+MODOS = {
+    "WAL/NORMAL": {},
+    "DELETE/FULL": {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL"},
+}
+NOVO_LANCAMENTO = {
+    "tipo": "DESPESA",
+    "categoria_id": "2",
+    "descricao": "bench",
+    "valor": "10,00",
+    "data_lancamento": "2024-03-15",
+    "status": "PENDENTE",
+    "ym": "2024-03",
+}
+
+
+async def _rodada(url: str, email: str, args, planilha: Path | None) -> tuple[list, list]:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+        await client.post("/painel/login", data={"email": email, "senha": SENHA})
+        headers = {"Cookie": f"ds_token={client.cookies['ds_token']}"}
+        if planilha is not None:
+            with open(planilha, "rb") as f:
+                r = await client.post("/painel/importacao", files={"file": (planilha.name, f)})
+            assert r.status_code == 202, r.text
+
+    def leitor():
+        conexao = _bench.ConexaoHttp(url, headers)
+        return lambda: conexao.get("/painel/financeiro/lancamentos?ym=2024-03")
+
+    def escritor():
+        conexao = _bench.ConexaoHttp(url, headers)
+        return lambda: conexao.post_form("/painel/financeiro/lancamentos/criar", NOVO_LANCAMENTO)
+
+    return await asyncio.gather(
+        _bench.carga(leitor, args.leitores, args.duracao),
+        _bench.carga(escritor, args.escritores, args.duracao),
+    )
+
+
+def _linha(nome: str, feitas: list, duracao: float) -> str:
+    status = Counter(s for _, s in feitas)
+    return (
+        f"    {nome:<8} {len(feitas) / duracao:5.0f} req/s  {_bench.latencias([ms for ms, _ in feitas])}  "
+        f"status={dict(sorted(status.items()))}"
+    )
+
+
+def main() -> None:
+    from app.database import IS_SQLITE
+
+    if not IS_SQLITE:
+        raise SystemExit("Benchmark só para SQLite (DATABASE_URL=sqlite:///...).")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leitores", type=int, default=20)
+    parser.add_argument("--escritores", type=int, default=10)
+    parser.add_argument("--duracao", type=float, default=15)
+    parser.add_argument("--linhas", type=int, default=100_000, help="linhas da planilha importada em background")
+    args = parser.parse_args()
+
+    resultado = [f"{args.leitores} leitores / {args.escritores} escritores, {args.duracao:.0f}s por cenário"]
+    with tempfile.TemporaryDirectory() as tmp:
+        planilha = Path(tmp) / "funcionarios.xlsx"
+        gerar_planilha(planilha, args.linhas)
+        for modo, env in MODOS.items():
+            for importando in (False, True):
+                _bench.preparar_banco()
+                _bench.popular_lancamentos(20_000)
+                with _bench.servidor(**env) as url:
+                    (email,) = _bench.cadastrar(url, 1, SENHA)
+                    leituras, escritas = asyncio.run(_rodada(url, email, args, planilha if importando else None))
+                resultado += [
+                    f"  {modo} {'com importação de ' + str(args.linhas) + ' linhas' if importando else 'sem importação'}",
+                    _linha("leituras", leituras, args.duracao),
+                    _linha("escritas", escritas, args.duracao),
+                ]
+    _bench.registrar("SQLite: leitores x escritores (user-015)", resultado)
+
+
+if __name__ == "__main__":
+    main()
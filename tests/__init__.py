@@ -0,0 +1,2 @@
+# tests/__init__.py
+# pip install -r requirements-dev.txt && python -m pytest -q tests
@@ -0,0 +1,101 @@
+# tests/test_importacao.py
+"""
+Importação de planilha: o job só grava na empresa de quem enviou o
+arquivo. Linhas com outra empresa_nome viram erro e não criam, reativam
+nem alteram outras empresas.
+"""
+from __future__ import annotations
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Empresa, FuncionarioAutorizado
+from app.services.importacao import PlanilhaImportacao, novas_stats, processar_bloco
+
+CABECALHO = ("empresa_nome", "empresa_cnpj", "funcionario_nome", "funcionario_cpf", "funcionario_email", "ativo")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as sessao:
+        sessao.add_all([
+            Empresa(id=1, nome="Clinica A", cnpj="100", ativo=True),
+            Empresa(id=2, nome="Vitima", cnpj="111", ativo=False),
+        ])
+        sessao.add(FuncionarioAutorizado(nome="Maria", cpf="22222222222", empresa_id=2, ativo=True))
+        sessao.commit()
+        yield sessao
+    engine.dispose()
+
+
+def _importar(db: Session, tmp_path, linhas: list[tuple], empresa_id: int) -> dict:
+    wb = Workbook()
+    ws = wb.active
+    ws.append(CABECALHO)
+    for linha in linhas:
+        ws.append(linha)
+    path = tmp_path / "planilha.xlsx"
+    wb.save(path)
+
+    stats = novas_stats()
+    with PlanilhaImportacao(str(path)) as planilha:
+        for bloco in planilha.blocos(1000):
+            processar_bloco(db, planilha, bloco, stats, empresa_id)
+    db.commit()
+    return stats
+
+
+def _funcionarios(db: Session, empresa_id: int) -> list[tuple[str, str]]:
+    return db.execute(
+        select(FuncionarioAutorizado.nome, FuncionarioAutorizado.cpf)
+        .where(FuncionarioAutorizado.empresa_id == empresa_id)
+        .order_by(FuncionarioAutorizado.cpf)
+    ).all()
+
+
+def test_linhas_de_outra_empresa_sao_rejeitadas(db, tmp_path):
+    stats = _importar(
+        db,
+        tmp_path,
+        [
+            ("Vitima", "999", "Intruso", "333.333.333-33", "", "sim"),
+            ("Nova Empresa", "555", "Fulano", "44444444444", "", "sim"),
+            ("Clinica A", "", "Ana", "111.111.111-11", "ana@a.com", "sim"),
+        ],
+        empresa_id=1,
+    )
+
+    assert stats["erros"] == [
+        'Linha 2: empresa "Vitima" não é a sua empresa (Clinica A).',
+        'Linha 3: empresa "Nova Empresa" não é a sua empresa (Clinica A).',
+    ]
+    assert stats["empresas_criadas"] == 0
+    assert stats["funcionarios_criados"] == 1
+
+    vitima = db.get(Empresa, 2)
+    db.refresh(vitima)
+    assert (vitima.cnpj, vitima.ativo) == ("111", False)
+    assert _funcionarios(db, 2) == [("Maria", "22222222222")]
+    assert db.scalar(select(Empresa.id).where(Empresa.nome == "Nova Empresa")) is None
+
+    assert _funcionarios(db, 1) == [("Ana", "11111111111")]
+
+
+def test_empresa_do_usuario_tem_o_cnpj_atualizado(db, tmp_path):
+    stats = _importar(
+        db,
+        tmp_path,
+        [("clinica a", "200", "Ana", "11111111111", "", "sim")],
+        empresa_id=1,
+    )
+
+    assert stats["erros"] == []
+    assert stats["empresas_atualizadas"] == 1
+    assert db.scalar(select(Empresa.cnpj).where(Empresa.id == 1)) == "200"
+    assert _funcionarios(db, 1) == [("Ana", "11111111111")]
@@ -0,0 +1,180 @@
+# tests/test_query_plans.py
+"""
+Regressão dos planos de consulta do financeiro: lista, dashboard e
+relatórios precisam usar os índices compostos empresa + período (ver
+app/models/financeiro.py) e a lista não pode ordenar em memória.
+
+As consultas são as reais: os SELECTs emitidos pelas funções do app são
+capturados (before_cursor_execute) e passados para o EXPLAIN do banco.
+
+- SQLite: sempre, em banco na memória.
+- PostgreSQL: só com TEST_POSTGRES_URL apontando para um banco vazio
+  (as tabelas são criadas e removidas pelo teste). Com poucas linhas o
+  planner prefere seq scan e sort; o EXPLAIN roda com enable_seqscan e
+  enable_sort = off: ainda aparecer um Sort quer dizer que nenhum índice
+  entrega a ordem pedida.
+"""
+from __future__ import annotations
+
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, _normalizar_url
+from app.models import Empresa
+from app.models.financeiro import CategoriaFinanceira, LancamentoFinanceiro
+from app.routers.web_financeiro import _select_pagina
+from app.services.financeiro_agregacao import totais_periodo, totais_por_mes
+from app.services.financeiro_resumo import reconstruir
+
+INDICE_DATA = "ix_financeiro_lancamentos_empresa_data"
+INDICE_PAGTO = "ix_financeiro_lancamentos_empresa_status_pagto"
+
+L = LancamentoFinanceiro
+
+
+def _popular(engine) -> None:
+    inicio = date(2026, 1, 1)
+    linhas = []
+    for i in range(4000):
+        data = inicio + timedelta(days=i % 365)
+        pago = i % 3 != 0
+        linhas.append(
+            dict(
+                empresa_id=1 + i % 4,
+                categoria_id=1 + i % 2,
+                tipo="RECEITA" if i % 2 else "DESPESA",
+                descricao=f"lançamento {i}",
+                valor=Decimal(i % 500) + Decimal("0.50"),
+                data_lancamento=data,
+                data_vencimento=data + timedelta(days=10),
+                status="PAGO" if pago else "PENDENTE",
+                data_pagamento=data + timedelta(days=5) if pago else None,
+            )
+        )
+    with Session(engine) as db:
+        db.execute(insert(Empresa), [dict(id=n, nome=f"E{n}") for n in range(1, 5)])
+        db.execute(
+            insert(CategoriaFinanceira),
+            [dict(id=1, empresa_id=1, nome="Consultas", tipo="RECEITA"),
+             dict(id=2, empresa_id=1, nome="Aluguel", tipo="DESPESA")],
+        )
+        db.execute(insert(L), linhas)
+        db.commit()
+        reconstruir(db)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+def _explain_sqlite(conn, sql, params) -> str:
+    return "\n".join(r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def _explain_postgresql(conn, sql, params) -> str:
+    conn.exec_driver_sql("SET enable_seqscan = off")
+    conn.exec_driver_sql("SET enable_sort = off")
+    return "\n".join(r[0] for r in conn.exec_driver_sql("EXPLAIN " + sql, params))
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def banco(request):
+    if request.param == "sqlite":
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+    else:
+        url = os.getenv("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL não configurada")
+        engine = create_engine(_normalizar_url(url))
+
+    Base.metadata.create_all(engine)
+    try:
+        _popular(engine)
+        yield engine
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def planos(engine, consulta) -> list[str]:
+    """EXPLAIN de cada SELECT que `consulta(db)` executa."""
+    capturados = []
+
+    def ouvir(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            capturados.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", ouvir)
+    try:
+        with Session(engine) as db:
+            consulta(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", ouvir)
+
+    assert capturados
+    explain = _explain_sqlite if engine.dialect.name == "sqlite" else _explain_postgresql
+    with engine.connect() as conn:
+        return [explain(conn, sql, params) for sql, params in capturados]
+
+
+def _sem_ordenacao(engine, plano: str) -> None:
+    if engine.dialect.name == "sqlite":
+        assert "USE TEMP B-TREE" not in plano, plano
+    else:
+        assert "Sort" not in plano, plano
+
+
+def _filtro_mes(empresa_id: int, inicio: date, fim: date) -> list:
+    return [L.empresa_id == empresa_id, L.data_lancamento >= inicio, L.data_lancamento <= fim]
+
+
+@pytest.mark.parametrize(
+    "extra, pos",
+    [
+        ([], None),
+        ([], (date(2026, 3, 15), 900)),
+        ([L.tipo == "RECEITA"], None),
+        ([L.status == "PENDENTE"], (date(2026, 3, 15), 900)),
+    ],
+    ids=["primeira-pagina", "cursor", "tipo", "status-cursor"],
+)
+def test_lista_usa_indice_empresa_data_sem_ordenar(banco, extra, pos):
+    filtro = _filtro_mes(1, date(2026, 3, 1), date(2026, 3, 31)) + extra
+    (plano,) = planos(banco, lambda db: db.execute(_select_pagina(filtro, pos, 50)).all())
+
+    assert INDICE_DATA in plano, plano
+    _sem_ordenacao(banco, plano)
+
+
+def test_totais_periodo_parcial_usa_os_dois_indices(banco):
+    # período que não fecha meses inteiros: agregação direta nos lançamentos
+    (plano,) = planos(banco, lambda db: totais_periodo(db, 1, date(2026, 3, 10), date(2026, 4, 20)))
+
+    assert INDICE_DATA in plano, plano
+    assert INDICE_PAGTO in plano, plano
+
+
+def test_totais_periodo_mes_inteiro_le_o_resumo(banco):
+    (plano,) = planos(banco, lambda db: totais_periodo(db, 1, date(2026, 3, 1), date(2026, 3, 31)))
+
+    assert "financeiro_resumo_mensal" in plano, plano
+    assert "financeiro_lancamentos" not in plano, plano
+    if banco.dialect.name == "sqlite":
+        assert "USING INDEX" in plano, plano
+    else:
+        assert "Index" in plano, plano
+
+
+def test_relatorio_por_mes_usa_indices(banco):
+    # exportação do relatório: bordas nos lançamentos, meses do meio no resumo
+    resultado = planos(banco, lambda db: totais_por_mes(db, 1, date(2026, 2, 10), date(2026, 6, 20)))
+
+    nos_lancamentos = [p for p in resultado if "financeiro_lancamentos" in p]
+    assert len(nos_lancamentos) == 2, resultado
+    for plano in nos_lancamentos:
+        assert INDICE_DATA in plano, plano
+        assert INDICE_PAGTO in plano, plano
@@ -0,0 +1,133 @@
+# tests/test_replica.py
+"""
+Roteamento das leituras entre primário e réplica (app/core/replica.py),
+com dois arquivos SQLite: cada um guarda uma marca diferente e a rota de
+leitura devolve a marca do banco que respondeu.
+
+- quem acabou de gravar (cookie de escrita recente) lê do primário;
+- cliente novo lê da réplica;
+- réplica atrasada além de DB_READ_MAX_LAG_SECONDS, ou fora do ar,
+  manda as leituras para o primário.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.core.config import settings
+from app.core.replica import COOKIE_ESCRITA_RECENTE, EscritaRecenteMiddleware, MonitorAtraso
+
+
+def _engine(path):
+    # NullPool: cada TestClient roda num event loop próprio
+    return create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+
+def _criar_banco(path, marca: str) -> None:
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE origem (marca TEXT NOT NULL)")
+        conn.execute("INSERT INTO origem VALUES (?)", (marca,))
+    conn.close()
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(EscritaRecenteMiddleware)
+
+    @app.post("/gravar")
+    async def gravar(db: AsyncSession = Depends(database.get_async_db)):
+        async with database.fila_escrita_async(db):
+            await db.execute(text("UPDATE origem SET marca = marca"))
+            await db.commit()
+        return {}
+
+    @app.get("/ler")
+    async def ler(db: AsyncSession = Depends(database.get_async_read_db)):
+        return {"marca": await db.scalar(text("SELECT marca FROM origem"))}
+
+    return app
+
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch) -> MonitorAtraso:
+    _criar_banco(tmp_path / "primario.db", "primario")
+    _criar_banco(tmp_path / "replica.db", "replica")
+    primario = _engine(tmp_path / "primario.db")
+    replica = _engine(tmp_path / "replica.db")
+
+    # intervalo 0: o atraso é checado a cada leitura
+    monitor = MonitorAtraso(replica, max_atraso=settings.DB_READ_MAX_LAG_SECONDS, intervalo=0)
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(bind=primario, expire_on_commit=False))
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", async_sessionmaker(bind=replica, expire_on_commit=False))
+    monkeypatch.setattr(database, "monitor_replica", monitor)
+    return monitor
+
+
+def _marca(client: TestClient) -> str:
+    resposta = client.get("/ler")
+    assert resposta.status_code == 200
+    return resposta.json()["marca"]
+
+
+def test_cliente_novo_le_da_replica(monitor):
+    client = TestClient(_app())
+
+    assert _marca(client) == "replica"
+    assert (monitor.leituras_replica, monitor.leituras_primario) == (1, 0)
+
+
+def test_quem_gravou_le_do_primario_enquanto_tem_o_cookie(monitor):
+    app = _app()
+    autor = TestClient(app)
+    outro = TestClient(app)
+
+    resposta = autor.post("/gravar")
+    assert resposta.status_code == 200
+    assert COOKIE_ESCRITA_RECENTE in resposta.cookies
+
+    assert _marca(autor) == "primario"
+    assert _marca(outro) == "replica"
+
+    # cookie expirado (DB_READ_STICKY_SECONDS): volta para a réplica
+    autor.cookies.delete(COOKIE_ESCRITA_RECENTE)
+    assert _marca(autor) == "replica"
+    assert (monitor.leituras_replica, monitor.leituras_primario) == (2, 1)
+
+
+def test_replica_atrasada_le_do_primario(monitor, monkeypatch):
+    client = TestClient(_app())
+    atraso = {"s": settings.DB_READ_MAX_LAG_SECONDS + 1}
+
+    # SQLite não replica: o valor do atraso vem do teste
+    async def checar():
+        monitor.atraso, monitor.disponivel = atraso["s"], True
+
+    monkeypatch.setattr(monitor, "_checar", checar)
+
+    assert _marca(client) == "primario"
+
+    atraso["s"] = settings.DB_READ_MAX_LAG_SECONDS
+    assert _marca(client) == "replica"
+    assert (monitor.leituras_replica, monitor.leituras_primario) == (1, 1)
+
+
+def test_replica_fora_do_ar_le_do_primario(monitor, tmp_path):
+    client = TestClient(_app())
+    replica = monitor.engine
+    # diretório inexistente: o SQLite não consegue abrir o arquivo
+    monitor.engine = _engine(tmp_path / "nao_existe" / "replica.db")
+
+    assert _marca(client) == "primario"
+    assert monitor.stats()["disponivel"] is False
+
+    monitor.engine = replica
+    assert _marca(client) == "replica"
+    assert monitor.stats()["disponivel"] is True